@@ -0,0 +1 @@
+"""Benchmarks dos caminhos quentes da cotação (execute com `python -m benchmarks`)."""
@@ -0,0 +1,285 @@
+"""Suíte de benchmarks com portão de regressão.
+
+Mede cotação única (à vista e financiada), lotes de 1k/10k/100k clientes,
+cache de clima (acerto e falta, contra o servidor HTTP local), renderização
+do dashboard e a partida a frio da CLI. Os resultados são gravados em JSON e
+comparados com um baseline; a execução falha (código 1) quando algum caso
+fica mais lento que o baseline além de `--max-lentidao`.
+
+    python -m benchmarks                         # roda tudo e compara com benchmarks/baseline.json
+    python -m benchmarks --casos cotacao,cache   # filtra por prefixo
+    python -m benchmarks --salvar-baseline       # regrava o baseline desta máquina
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PADRAO = os.path.join(RAIZ, "benchmarks", "baseline.json")
+MAX_LENTIDAO_PADRAO = 0.30   # falha se ficar 30% mais lento que o baseline
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+IRR = dict(zip(MESES, [5.5, 5.8, 5.2, 4.9, 5.1, 5.3, 5.6, 6.0, 6.2, 6.1, 6.0, 5.7]))
+TEMP = {m: 27.0 for m in MESES}
+CIDADES = ["Fortaleza, CE", "Recife, PE", "Natal, RN", "Salvador, BA", "Curitiba, PR",
+           "Porto Alegre, RS", "Belo Horizonte, MG", "Manaus, AM"]
+
+# nome -> função(contexto) que prepara o caso e retorna (executar, chamadas_por_rodada, rodadas, itens_por_chamada)
+CASOS = {}
+
+
+def caso(nome):
+    def registrar(funcao):
+        CASOS[nome] = funcao
+        return funcao
+    return registrar
+
+
+class Contexto:
+    """Recursos compartilhados pelos casos: diretório temporário, servidor stub e opções."""
+
+    def __init__(self, pilha, workers=1):
+        self.pilha = pilha
+        self.workers = workers
+        self.tmp = pilha.enter_context(tempfile.TemporaryDirectory(prefix="bench_solar_"))
+        self._stub = None
+
+    def stub(self):
+        """Servidor local com as cidades de CIDADES e geodata apontando para ele (cache em tmp)."""
+        if self._stub is None:
+            from src import geodata
+            from src._testing import configurar_geodata, iniciar_stub
+
+            stub, parar = iniciar_stub()
+            self.pilha.callback(parar)
+            for k, cidade in enumerate(CIDADES):
+                stub.cidades[cidade] = (-3.0 - 3.1 * k, -38.0 + 1.7 * k)
+            originais = {n: getattr(geodata, n) for n in
+                         ("CACHE_DIR", "NOMINATIM_DOMAIN", "NOMINATIM_SCHEME", "NASA_POWER_URL", "RETRY_ESPERA_S",
+                          "_LIMITE_NOMINATIM", "MUNICIPIOS_CSV")}
+            self.pilha.callback(lambda: [setattr(geodata, n, v) for n, v in originais.items()])
+            configurar_geodata(geodata, stub, os.path.join(self.tmp, "cache"))
+            self._stub = stub
+        return self._stub
+
+
+@caso("cotacao_unica")
+def _cotacao_unica(ctx):
+    from src.engineering import calcular_tudo
+    return (lambda: calcular_tudo(450.0, 50, IRR, TEMP)), 200, 5, 1
+
+
+@caso("cotacao_financiada")
+def _cotacao_financiada(ctx):
+    from src.engineering import calcular_tudo
+    return (lambda: calcular_tudo(450.0, 50, IRR, TEMP, financiar=True, fin_dados=(14.5, 60))), 200, 5, 1
+
+
+def _caso_lote(n):
+    def preparar(ctx):
+        from src.lote import processar_lote
+
+        entrada = os.path.join(ctx.tmp, f"lote_{n}.csv")
+        saida = os.path.join(ctx.tmp, f"lote_{n}_saida.csv")
+        with open(entrada, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["cidade", "consumo_medio", "taxa_minima", "financiar", "taxa_juros", "meses"])
+            for k in range(n):
+                fin = k % 3 == 0
+                escritor.writerow([CIDADES[k % len(CIDADES)], 150 + (k * 37) % 1800, (30, 50, 100)[k % 3],
+                                   "sim" if fin else "nao", 14.5 if fin else "", 60 if fin else ""])
+
+        def executar():
+            processar_lote(entrada, saida, workers=ctx.workers, obter_clima=lambda cidade: (IRR, TEMP))
+        return executar, 1, 3 if n < 100_000 else 1, n
+    return preparar
+
+
+for _n, _nome in ((1_000, "lote_1k"), (10_000, "lote_10k"), (100_000, "lote_100k")):
+    caso(_nome)(_caso_lote(_n))
+
+
+@caso("cache_acerto")
+def _cache_acerto(ctx):
+    from src.geodata import get_data
+    ctx.stub()
+    get_data(CIDADES[0])   # aquece geocodificação e clima
+    return (lambda: get_data(CIDADES[0])), 200, 5, 1
+
+
+@caso("cache_falta")
+def _cache_falta(ctx):
+    from src.geodata import get_data
+    ctx.stub()
+    get_data(CIDADES[1])   # geocodificação em cache; cada chamada baixa o clima do stub
+    return (lambda: get_data(CIDADES[1], refresh_cache=True)), 20, 5, 1
+
+
+def _dados_dashboard():
+    from src.engineering import calcular_tudo
+    qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com = calcular_tudo(450.0, 50, IRR, TEMP)
+    return dict(cidade="Fortaleza, CE", sistema_wp=pot, conta_antiga=ant, custo_novo=novo, saldo=saldo,
+                total_sem=tot_sem, total_com=tot_com, parc=parc, financiado=False)
+
+
+@caso("dashboard_pyplot")
+def _dashboard_pyplot(ctx):
+    import matplotlib
+    matplotlib.use("Agg")
+    from src.viz import plotar_dashboard_final
+    dados = _dados_dashboard()
+    out_dir = os.path.join(ctx.tmp, "dash")
+    return (lambda: plotar_dashboard_final(show=False, out_dir=out_dir, **dados)), 2, 3, 1
+
+
+@caso("dashboard_template")
+def _dashboard_template(ctx):
+    from src.viz import RenderizadorDashboard
+    dados = _dados_dashboard()
+    out_dir = os.path.join(ctx.tmp, "dash")
+    renderizador = RenderizadorDashboard()
+    return (lambda: renderizador.renderizar(out_dir=out_dir, **dados)), 3, 3, 1
+
+
+@caso("cli_partida_fria")
+def _cli_partida_fria(ctx):
+    def executar():
+        subprocess.run([sys.executable, "-m", "src.cli", "--help"], cwd=RAIZ, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return executar, 1, 5, 1
+
+
+def _medir(executar, chamadas, rodadas):
+    """Segundos por chamada em cada rodada (após uma chamada de aquecimento)."""
+    executar()
+    tempos = []
+    for _ in range(rodadas):
+        t0 = time.perf_counter()
+        for _ in range(chamadas):
+            executar()
+        tempos.append((time.perf_counter() - t0) / chamadas)
+    return tempos
+
+
+def selecionar(filtros=None):
+    """Nomes de casos cujo nome começa com algum dos filtros (todos quando vazio)."""
+    if not filtros:
+        return list(CASOS)
+    return [nome for nome in CASOS if any(nome.startswith(f) for f in filtros)]
+
+
+def executar_casos(nomes, workers=1, rodadas=None):
+    """Executa os casos e retorna o dicionário de resultados serializável em JSON."""
+    resultados = {}
+    with contextlib.ExitStack() as pilha:
+        # Os caminhos medidos imprimem mensagens de progresso; não fazem parte da medição
+        pilha.enter_context(contextlib.redirect_stdout(pilha.enter_context(open(os.devnull, "w"))))
+        ctx = Contexto(pilha, workers=workers)
+        for nome in nomes:
+            executar, chamadas, n_rodadas, itens = CASOS[nome](ctx)
+            tempos = _medir(executar, chamadas, rodadas or n_rodadas)
+            resultados[nome] = {
+                "min_s": min(tempos),
+                "mediana_s": statistics.median(tempos),
+                "rodadas": len(tempos),
+                "chamadas_por_rodada": chamadas,
+                "itens": itens,
+            }
+    return {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workers": workers,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, baseline, max_lentidao=MAX_LENTIDAO_PADRAO):
+    """Compara resultados pelo melhor tempo (min_s).
+
+    Retorna lista de dicts (caso, atual_s, baseline_s, razao, status) com
+    status "ok", "regressao" ou "novo" (sem baseline).
+    """
+    linhas = []
+    base = (baseline or {}).get("resultados", {})
+    for nome, r in atual["resultados"].items():
+        ref = base.get(nome)
+        if ref is None or not ref.get("min_s"):
+            linhas.append({"caso": nome, "atual_s": r["min_s"], "baseline_s": None, "razao": None, "status": "novo"})
+            continue
+        razao = r["min_s"] / ref["min_s"]
+        status = "regressao" if razao > 1.0 + max_lentidao else "ok"
+        linhas.append({"caso": nome, "atual_s": r["min_s"], "baseline_s": ref["min_s"], "razao": razao, "status": status})
+    return linhas
+
+
+def _formatar(segundos):
+    if segundos is None:
+        return "-"
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:.1f} µs"
+    if segundos < 1.0:
+        return f"{segundos * 1e3:.2f} ms"
+    return f"{segundos:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks do Simulador Solar")
+    parser.add_argument("--casos", help=f"Prefixos separados por vírgula (disponíveis: {', '.join(CASOS)})")
+    parser.add_argument("--saida", help="Grava os resultados neste JSON")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="JSON de referência para comparação")
+    parser.add_argument("--max-lentidao", type=float, default=MAX_LENTIDAO_PADRAO,
+                        help="Lentidão máxima tolerada em fração (0.3 = 30%%)")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados como novo baseline")
+    parser.add_argument("--workers", type=int, default=1, help="Processos nos casos de lote (padrão 1)")
+    parser.add_argument("--rodadas", type=int, default=None, help="Sobrescreve o número de rodadas de cada caso")
+    args = parser.parse_args(argv)
+
+    nomes = selecionar([f.strip() for f in args.casos.split(",")] if args.casos else None)
+    if not nomes:
+        parser.error("nenhum caso corresponde a --casos")
+    atual = executar_casos(nomes, workers=args.workers, rodadas=args.rodadas)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=2)
+
+    baseline = None
+    if not args.salvar_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    linhas = comparar(atual, baseline, args.max_lentidao)
+    print(f"{'caso':<22}{'atual':>12}{'baseline':>12}{'razão':>8}  status")
+    for l in linhas:
+        razao = "-" if l["razao"] is None else f"{l['razao']:.2f}x"
+        print(f"{l['caso']:<22}{_formatar(l['atual_s']):>12}{_formatar(l['baseline_s']):>12}{razao:>8}  {l['status']}")
+
+    if args.salvar_baseline:
+        anterior = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                anterior = json.load(f).get("resultados", {})
+        atual["resultados"] = {**anterior, **atual["resultados"]}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=2)
+        print(f"Baseline gravado em {args.baseline}")
+        return 0
+
+    regressoes = [l for l in linhas if l["status"] == "regressao"]
+    if regressoes:
+        print(f"❌ {len(regressoes)} caso(s) acima da lentidão máxima de {args.max_lentidao:.0%}")
+        return 1
+    return 0
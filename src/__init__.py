@@ -1,6 +1,8 @@
 """Pacote projeto_solar
 
-Exporta interfaces principais para uso externo.
+Exporta interfaces principais para uso externo. Os submódulos são
+importados sob demanda (PEP 562), de modo que `import src.finance` ou
+`python -m src.cli --help` não carregam numpy, matplotlib, requests ou geopy.
 """
 
 __all__ = [
@@ -13,7 +15,27 @@ __all__ = [
 
 __version__ = "0.1.0"
 
-from .geodata import get_data, clear_cache
-from .engineering import calcular_tudo
-from .viz import plotar_dashboard_final
-from . import config
\ No newline at end of file
+# nome exportado -> (submódulo, atributo; None = o próprio submódulo)
+_EXPORTS = {
+	"get_data": ("geodata", "get_data"),
+	"clear_cache": ("geodata", "clear_cache"),
+	"calcular_tudo": ("engineering", "calcular_tudo"),
+	"plotar_dashboard_final": ("viz", "plotar_dashboard_final"),
+	"config": ("config", None),
+}
+
+
+def __getattr__(name):
+	if name not in _EXPORTS:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	from importlib import import_module
+	modulo, atributo = _EXPORTS[name]
+	valor = import_module(f".{modulo}", __name__)
+	if atributo is not None:
+		valor = getattr(valor, atributo)
+	globals()[name] = valor
+	return valor
+
+
+def __dir__():
+	return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,102 @@
+"""Servidor HTTP local que imita Nominatim (/search) e NASA POWER (/api/...).
+
+Usado pelos testes (tests/conftest.py) e pelos benchmarks de cache
+(benchmarks/suite.py); fica em src para que nenhum dos dois dependa do outro.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+
+
+class StubHTTP:
+    """Estado do servidor: coordenadas conhecidas, atrasos, falhas e contadores."""
+
+    def __init__(self):
+        self.cidades = {}         # nome exato -> (lat, lon)
+        self.atraso_nasa = 0.0
+        self.falhas_nasa = 0      # próximas N respostas NASA com HTTP 500
+        self.respostas = {}       # caminho -> corpo JSON fixo (ex.: séries mensais)
+        self.chamadas = {"search": [], "nasa": []}
+        self.lock = threading.Lock()
+        self.url = None
+
+    def clima(self, lat, lon):
+        irr = {m: round(5.0 + abs(lat) / 100.0, 4) for m in MESES}
+        temp = {m: round(26.0 + abs(lon) / 100.0, 4) for m in MESES}
+        return {"properties": {"parameter": {"ALLSKY_SFC_SW_DWN": irr, "T2M": temp}}}
+
+
+def _handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = -1   # cabeçalho e corpo no mesmo segmento TCP (evita o atraso de ACK de ~40 ms)
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, status, corpo):
+            dados = json.dumps(corpo).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            qs = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == "/search":
+                with stub.lock:
+                    stub.chamadas["search"].append(qs.get("q"))
+                coords = stub.cidades.get(qs.get("q"))
+                corpo = [] if coords is None else [{"lat": str(coords[0]), "lon": str(coords[1]), "display_name": qs["q"], "place_id": 1}]
+                return self._json(200, corpo)
+            if url.path.startswith("/api/"):
+                with stub.lock:
+                    stub.chamadas["nasa"].append((url.path, float(qs["latitude"]), float(qs["longitude"])))
+                    falhar = stub.falhas_nasa > 0
+                    stub.falhas_nasa -= 1 if falhar else 0
+                time.sleep(stub.atraso_nasa)
+                if falhar:
+                    return self._json(500, {"erro": "falha simulada"})
+                if url.path in stub.respostas:
+                    return self._json(200, stub.respostas[url.path])
+                return self._json(200, stub.clima(float(qs["latitude"]), float(qs["longitude"])))
+            self._json(404, {})
+
+    return Handler
+
+
+def iniciar_stub(stub=None):
+    """Sobe o servidor em uma porta livre de 127.0.0.1; retorna (stub, parar)."""
+    stub = stub or StubHTTP()
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _handler(stub))
+    servidor.daemon_threads = True
+    stub.url = f"127.0.0.1:{servidor.server_address[1]}"
+    t = threading.Thread(target=servidor.serve_forever, daemon=True)
+    t.start()
+
+    def parar():
+        servidor.shutdown()
+        servidor.server_close()
+
+    return stub, parar
+
+
+def configurar_geodata(geodata, stub, diretorio_cache, definir=setattr):
+    """Aponta geodata para o stub (sem o índice local de municípios) e para um cache em `diretorio_cache`.
+
+    `definir(obj, nome, valor)` permite usar monkeypatch.setattr nos testes.
+    """
+    definir(geodata, "CACHE_DIR", str(diretorio_cache))
+    definir(geodata, "NOMINATIM_DOMAIN", stub.url)
+    definir(geodata, "NOMINATIM_SCHEME", "http")
+    definir(geodata, "NASA_POWER_URL", f"http://{stub.url}/api/temporal/climatology/point")
+    definir(geodata, "NASA_POWER_MENSAL_URL", f"http://{stub.url}/api/temporal/monthly/point")
+    definir(geodata, "RETRY_ESPERA_S", 0.01)
+    definir(geodata, "_LIMITE_NOMINATIM", geodata._LimitadorTaxa(1000.0))
+    definir(geodata, "MUNICIPIOS_CSV", None)   # geocodificação sempre pelo stub
@@ -0,0 +1,189 @@
+"""Armazenamento de cache em arquivo único (SQLite em modo WAL).
+
+Substitui os vários arquivos JSON em `.cache/`: cada entrada é uma linha
+(namespace, chave) com valor JSON, instante da coleta (`ts`), TTL opcional e
+último acesso. Gravações são upserts atômicos, seguros entre processos; o
+tamanho é limitado por despejo LRU e há uma camada LRU em memória na frente.
+Leituras (inclusive as servidas pela memória) só anotam o instante do acesso;
+os instantes vão para o banco em lote, junto das gravações e antes do despejo.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRADAS = 50_000   # linhas no banco antes do despejo LRU
+MEMO_MAX = 1024         # entradas na camada em memória
+_DESPEJO_A_CADA = 64    # verifica o tamanho a cada N gravações
+_ACESSOS_MAX = 256      # acessos pendentes que forçam a gravação do lote
+NS_META = "meta"        # marcadores internos (ex.: migração do JSON), fora do despejo LRU
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    ns      TEXT NOT NULL,
+    chave   TEXT NOT NULL,
+    valor   TEXT NOT NULL,
+    ts      REAL NOT NULL,
+    ttl     REAL,
+    acesso  REAL NOT NULL,
+    PRIMARY KEY (ns, chave)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_acesso ON cache (acesso);
+"""
+
+
+class CacheStore:
+    """Cache chave/valor persistente em SQLite com LRU em memória.
+
+    Uma conexão por thread (e por processo, após fork). Os valores devem ser
+    serializáveis em JSON.
+    """
+
+    def __init__(self, path: str, max_entradas: int = MAX_ENTRADAS, memo_max: int = MEMO_MAX):
+        self.path = path
+        self.max_entradas = max_entradas
+        self.memo_max = memo_max
+        self._local = threading.local()
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._gravacoes = 0
+        self._acessos = {}     # (ns, chave) -> último acesso ainda não gravado no banco
+        diretorio = os.path.dirname(os.path.abspath(path))
+        os.makedirs(diretorio, exist_ok=True)
+        self._conexao()
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None or self._local.pid != os.getpid():
+            con = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA busy_timeout=30000")
+            con.executescript(_ESQUEMA)
+            self._local.con = con
+            self._local.pid = os.getpid()
+        return con
+
+    # Camada em memória
+    def _memo_get(self, k):
+        with self._lock:
+            item = self._memo.get(k)
+            if item is not None:
+                self._memo.move_to_end(k)
+                self._acessos[k] = time.time()
+            return item
+
+    def _anotar_acesso(self, k):
+        with self._lock:
+            self._acessos[k] = time.time()
+            return len(self._acessos) >= _ACESSOS_MAX
+
+    def _gravar_acessos(self, con=None):
+        """Grava em uma transação os instantes de acesso pendentes (alimentam o despejo LRU)."""
+        with self._lock:
+            if not self._acessos:
+                return
+            pendentes, self._acessos = self._acessos, {}
+        con = con or self._conexao()
+        con.execute("BEGIN")
+        try:
+            con.executemany("UPDATE cache SET acesso = MAX(acesso, ?) WHERE ns = ? AND chave = ?",
+                            [(t, ns, chave) for (ns, chave), t in pendentes.items()])
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+    def _memo_set(self, k, item):
+        with self._lock:
+            self._memo[k] = item
+            self._memo.move_to_end(k)
+            while len(self._memo) > self.memo_max:
+                self._memo.popitem(last=False)
+
+    def _memo_del(self, k):
+        with self._lock:
+            self._memo.pop(k, None)
+
+    def get(self, ns: str, chave: str) -> Optional[Tuple[Any, float]]:
+        """Retorna (valor, ts) ou None. Não aplica TTL: quem chama decide se está vencido."""
+        k = (ns, chave)
+        item = self._memo_get(k)
+        if item is not None:
+            if len(self._acessos) >= _ACESSOS_MAX:
+                self._gravar_acessos()
+            return item
+        con = self._conexao()
+        row = con.execute("SELECT valor, ts FROM cache WHERE ns = ? AND chave = ?", k).fetchone()
+        if row is None:
+            return None
+        item = (json.loads(row[0]), row[1])
+        self._memo_set(k, item)
+        if self._anotar_acesso(k):
+            self._gravar_acessos(con)
+        return item
+
+    def set(self, ns: str, chave: str, valor: Any, ts: Optional[float] = None, ttl: Optional[float] = None):
+        """Insere ou atualiza a entrada (upsert atômico)."""
+        ts = time.time() if ts is None else float(ts)
+        con = self._conexao()
+        self._gravar_acessos(con)
+        con.execute(
+            "INSERT INTO cache (ns, chave, valor, ts, ttl, acesso) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (ns, chave) DO UPDATE SET valor = excluded.valor, ts = excluded.ts, "
+            "ttl = excluded.ttl, acesso = excluded.acesso",
+            (ns, chave, json.dumps(valor), ts, ttl, time.time()),
+        )
+        self._memo_set((ns, chave), (valor, ts))
+        with self._lock:   # set é chamado de várias threads (get_data_many, revalidação, servidor)
+            self._gravacoes += 1
+            despejar = self._gravacoes % _DESPEJO_A_CADA == 0
+        if despejar:
+            self.despejar()
+
+    def delete(self, ns: str, chave: str) -> bool:
+        self._memo_del((ns, chave))
+        cur = self._conexao().execute("DELETE FROM cache WHERE ns = ? AND chave = ?", (ns, chave))
+        return cur.rowcount > 0
+
+    def despejar(self) -> int:
+        """Remove as entradas menos usadas recentemente acima de `max_entradas` (exceto as de NS_META)."""
+        con = self._conexao()
+        self._gravar_acessos(con)
+        total = con.execute("SELECT COUNT(*) FROM cache WHERE ns != ?", (NS_META,)).fetchone()[0]
+        excesso = total - self.max_entradas
+        if excesso <= 0:
+            return 0
+        con.execute(
+            "DELETE FROM cache WHERE (ns, chave) IN "
+            "(SELECT ns, chave FROM cache WHERE ns != ? ORDER BY acesso LIMIT ?)",
+            (NS_META, excesso),
+        )
+        with self._lock:
+            self._memo.clear()
+        logger.info("Cache: %d entradas despejadas (LRU)", excesso)
+        return excesso
+
+    def remover_vencidos(self, agora: Optional[float] = None) -> int:
+        """Remove entradas cujo TTL próprio já expirou (manutenção explícita)."""
+        agora = time.time() if agora is None else agora
+        cur = self._conexao().execute("DELETE FROM cache WHERE ttl > 0 AND ts + ttl < ?", (agora,))
+        with self._lock:
+            self._memo.clear()
+        return cur.rowcount
+
+    def __len__(self):
+        return self._conexao().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            self._gravar_acessos(con)
+            con.close()
+            self._local.con = None
@@ -0,0 +1,174 @@
+"""Catálogo de hardware e busca do projeto mais barato.
+
+Módulos e inversores são lidos de CSVs locais (data/catalogo/modulos.csv e
+inversores.csv) para vetores NumPy ordenados por potência. `buscar_projeto`
+avalia de uma vez todas as combinações módulo x inversor x módulos por
+string, respeitando a tensão máxima de entrada (Voc no frio), a janela de
+MPPT (Vmp no calor e no frio), a corrente por MPPT e a faixa de razão
+DC/AC, e devolve o projeto de menor custo. Os inversores fora da faixa de
+potência útil são descartados por busca binária; dos pares restantes, só os
+de menor custo possível (n_min módulos) têm os arranjos avaliados, em
+rodadas, até que nenhum par restante possa ser mais barato.
+"""
+import csv
+import logging
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "catalogo")
+MAX_MODULOS_STRING = 30
+CANDIDATOS_POR_RODADA = 4096    # pares módulo x inversor avaliados por rodada (cresce 8x se preciso)
+
+CAMPOS_MODULO = ("potencia_w", "voc_v", "vmp_v", "isc_a", "imp_a", "coef_v_pct_c", "area_m2", "peso_kg", "preco_r")
+CAMPOS_INVERSOR = ("potencia_ac_w", "vdc_max_v", "mppt_min_v", "mppt_max_v", "n_mppt", "idc_max_a", "preco_r")
+
+
+class Projeto(NamedTuple):
+    """Projeto escolhido: SKUs, arranjo (strings x módulos por string) e custos."""
+    modulo: str
+    inversor: str
+    qtd_modulos: int
+    modulos_por_string: int
+    strings: int
+    pot_dc_wp: float
+    pot_ac_w: float
+    razao_dc_ac: float
+    custo_hardware: float
+    capex: float
+    area_m2: float
+    peso_kg: float
+
+
+def _ler_tabela(caminho, campos):
+    """(skus, dict campo -> array float) de um CSV de datasheets, ordenado pelo primeiro campo."""
+    skus, colunas = [], {c: [] for c in campos}
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        for linha in csv.DictReader(f):
+            skus.append(linha["sku"].strip())
+            for c in campos:
+                colunas[c].append(float(linha[c]))
+    arrays = {c: np.asarray(v, dtype=float) for c, v in colunas.items()}
+    ordem = np.argsort(arrays[campos[0]], kind="stable")
+    return np.asarray(skus, dtype=object)[ordem], {c: a[ordem] for c, a in arrays.items()}
+
+
+class Catalogo:
+    """Módulos e inversores em vetores ordenados por potência, com índice por SKU."""
+
+    def __init__(self, modulos_skus, modulos, inversores_skus, inversores):
+        self.modulos_skus = modulos_skus
+        self.modulos = modulos
+        self.inversores_skus = inversores_skus
+        self.inversores = inversores
+        self._pos_modulo = {sku: k for k, sku in enumerate(modulos_skus)}
+        self._pos_inversor = {sku: k for k, sku in enumerate(inversores_skus)}
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_PADRAO):
+        """Lê modulos.csv e inversores.csv de `diretorio`."""
+        m_skus, modulos = _ler_tabela(os.path.join(diretorio, "modulos.csv"), CAMPOS_MODULO)
+        i_skus, inversores = _ler_tabela(os.path.join(diretorio, "inversores.csv"), CAMPOS_INVERSOR)
+        logger.info("Catálogo %s: %d módulos, %d inversores", diretorio, len(m_skus), len(i_skus))
+        return cls(m_skus, modulos, i_skus, inversores)
+
+    def modulo(self, sku):
+        """Datasheet do módulo `sku` como dict."""
+        k = self._pos_modulo[sku]
+        return {"sku": sku, **{c: float(v[k]) for c, v in self.modulos.items()}}
+
+    def inversor(self, sku):
+        """Datasheet do inversor `sku` como dict."""
+        k = self._pos_inversor[sku]
+        return {"sku": sku, **{c: float(v[k]) for c, v in self.inversores.items()}}
+
+    def faixa_inversores(self, pot_ac_min, pot_ac_max):
+        """Fatia (início, fim) dos inversores com potência AC em [min, max]."""
+        pac = self.inversores["potencia_ac_w"]
+        return int(np.searchsorted(pac, pot_ac_min, side="left")), int(np.searchsorted(pac, pot_ac_max, side="right"))
+
+
+def buscar_projeto(catalogo, pot_alvo_wp, razao_max=None, razao_min=None, temp_min_c=None, temp_celula_max_c=None,
+                   max_modulos_string=MAX_MODULOS_STRING):
+    """Projeto de menor custo com potência DC >= pot_alvo_wp; None se nada atende às restrições.
+
+    Todas as strings têm o mesmo comprimento e são distribuídas entre as
+    entradas MPPT do inversor (um inversor por projeto).
+    """
+    razao_max = config.RAZAO_DC_AC_MAX if razao_max is None else razao_max
+    razao_min = config.RAZAO_DC_AC_MIN if razao_min is None else razao_min
+    temp_min_c = config.TEMP_MINIMA_C if temp_min_c is None else temp_min_c
+    temp_celula_max_c = config.TEMP_CELULA_MAX_C if temp_celula_max_c is None else temp_celula_max_c
+    pot_alvo_wp = float(pot_alvo_wp)
+
+    m = catalogo.modulos
+    s = np.arange(1, int(max_modulos_string) + 1, dtype=float)
+    # Maior potência DC útil: alvo + uma string a mais do maior módulo
+    pot_dc_max = pot_alvo_wp + m["potencia_w"].max() * s[-1]
+    ini, fim = catalogo.faixa_inversores(pot_alvo_wp / razao_max, pot_dc_max / razao_min)
+    if fim <= ini:
+        return None
+    inv = {c: v[None, ini:fim] for c, v in catalogo.inversores.items()}    # (1, I)
+
+    # Limites por par (módulo, inversor), matrizes (M, I)
+    fator_frio = 1.0 + m["coef_v_pct_c"] / 100.0 * (temp_min_c - 25.0)
+    fator_quente = 1.0 + m["coef_v_pct_c"] / 100.0 * (temp_celula_max_c - 25.0)
+    w = m["potencia_w"][:, None]
+    s_min = np.maximum(1.0, np.ceil(inv["mppt_min_v"] / (m["vmp_v"] * fator_quente)[:, None]))
+    s_max = np.minimum(s[-1], np.floor(np.minimum(inv["vdc_max_v"] / (m["voc_v"] * fator_frio)[:, None],
+                                                   inv["mppt_max_v"] / (m["vmp_v"] * fator_frio)[:, None])))
+    # Módulos suficientes para o alvo e para a razão DC/AC mínima do inversor
+    n_min = np.ceil(np.maximum(pot_alvo_wp, razao_min * inv["potencia_ac_w"]) / w)
+    qtd_max = np.floor(razao_max * inv["potencia_ac_w"] / w)
+    strings_max = inv["n_mppt"] * np.floor(inv["idc_max_a"] / m["isc_a"][:, None])
+
+    # Custo mínimo possível de cada par (n_min módulos); pares inviáveis ficam com infinito
+    limite = n_min * m["preco_r"][:, None] + inv["preco_r"]
+    inviavel = (s_min > s_max) | (n_min > qtd_max) | (strings_max < 1) | (n_min > strings_max * s_max)
+    limite[inviavel] = np.inf
+    limite = limite.ravel()
+
+    # Avalia os pares em ordem de custo mínimo; para quando nenhum par restante pode ser mais barato
+    k = min(limite.size, CANDIDATOS_POR_RODADA)
+    while True:
+        if k < limite.size:
+            ordem = np.argpartition(limite, k - 1)
+            pares, corte = ordem[:k], limite[ordem[k - 1]]
+        else:
+            pares, corte = np.arange(limite.size), np.inf
+        pares = pares[np.isfinite(limite[pares])]
+        n_str = np.ceil(n_min.flat[pares][:, None] / s)                                    # (k, S)
+        qtd = n_str * s
+        valido = ((n_str <= strings_max.flat[pares][:, None]) & (qtd <= qtd_max.flat[pares][:, None])
+                  & (s >= s_min.flat[pares][:, None]) & (s <= s_max.flat[pares][:, None]))
+        qtd[~valido] = np.inf
+        js = np.argmin(qtd, axis=1)
+        qtd_par = qtd[np.arange(pares.size), js]
+        im, ii = np.unravel_index(pares, n_min.shape)
+        custo = qtd_par * m["preco_r"][im] + catalogo.inversores["preco_r"][ini + ii]
+        melhor = None
+        if custo.size and np.isfinite(custo.min()):
+            j = int(np.argmin(custo))
+            melhor_custo = float(custo[j])
+            melhor = (int(im[j]), ini + int(ii[j]), int(s[js[j]]), int(qtd_par[j]), int(qtd_par[j] / s[js[j]]))
+        if (melhor is not None and melhor_custo <= corte) or not np.isfinite(corte):
+            break
+        k = min(limite.size, k * 8)
+
+    if melhor is None:
+        return None
+    im, ii, por_string, qtd, strings = melhor
+    pot_dc = qtd * float(m["potencia_w"][im])
+    pot_ac = float(catalogo.inversores["potencia_ac_w"][ii])
+    return Projeto(
+        modulo=catalogo.modulos_skus[im], inversor=catalogo.inversores_skus[ii],
+        qtd_modulos=qtd, modulos_por_string=por_string, strings=strings,
+        pot_dc_wp=pot_dc, pot_ac_w=pot_ac, razao_dc_ac=pot_dc / pot_ac,
+        custo_hardware=melhor_custo, capex=melhor_custo * config.FATOR_INSTALACAO,
+        area_m2=qtd * float(m["area_m2"][im]), peso_kg=qtd * float(m["peso_kg"][im]),
+    )
@@ -1,40 +1,262 @@
 import argparse
 import logging
-from .geodata import get_data, clear_cache
-from .engineering import calcular_tudo
-from .viz import plotar_dashboard_final
+import os
+import sys
 
 logger = logging.getLogger(__name__)
 
 
-def main():
+def _ttl_em_segundos(ttl_dias):
+    """Converte --cache-ttl-dias em segundos (None usa padrão do módulo)."""
+    if ttl_dias is None:
+        return None
+    try:
+        return max(0, int(ttl_dias * 86400))
+    except Exception:
+        return None
+
+
+def _configurar_grade(caminho):
+    """Aponta geodata para a grade climática offline informada em --grade-clima."""
+    if caminho:
+        from . import geodata
+        geodata.GRADE_CLIMA_PATH = caminho
+
+
+def main_grade(argv):
+    """Subcomando `grade`: constrói a grade climática offline a partir de exportações NASA POWER."""
+    parser = argparse.ArgumentParser(prog="python -m src.cli grade", description="Constrói a grade climática offline (NumPy mmap)")
+    parser.add_argument("--entrada", nargs="+", required=True, help="Arquivos ou diretórios com exportações POWER (JSON/CSV de climatologia)")
+    parser.add_argument("--saida", required=True, help="Caminho base da grade (gera <saida>.npy e <saida>.json)")
+    parser.add_argument("--passo", type=float, default=0.5, help="Resolução da grade em graus (padrão 0.5)")
+    args = parser.parse_args(argv)
+
+    from .gradeclima import construir_grade
+    grade = construir_grade(args.entrada, args.saida, passo=args.passo)
+    print(f"✅ Grade {grade.nlat}x{grade.nlon} gravada em {grade.caminho}")
+
+
+def main_batch(argv):
+    """Subcomando `batch`: processa uma planilha CSV inteira."""
+    from .lote import processar_lote, TAMANHO_CHUNK
+
+    parser = argparse.ArgumentParser(prog="python -m src.cli batch", description="Simulador Solar - processamento em lote")
+    parser.add_argument("--entrada", default="data/sample_inputs.csv", help="CSV de entrada (cidade, consumo_medio, taxa_minima, financiar, taxa_juros, meses)")
+    parser.add_argument("--saida", required=True, help="CSV de saída com o resumo de cada linha")
+    parser.add_argument("--workers", type=int, default=None, help="Processos do pool (padrão: nº de CPUs; 1 = sem pool)")
+    parser.add_argument("--chunk", type=int, default=TAMANHO_CHUNK, help=f"Linhas lidas por bloco (padrão {TAMANHO_CHUNK})")
+    parser.add_argument("--dashboards", help="Diretório para gerar um dashboard PNG por linha (opcional)")
+    parser.add_argument("--exportar", metavar="DIR", help="Diretório colunar com as séries mensais de cada linha (src.exportacao)")
+    parser.add_argument("--pdf", metavar="ARQ.pdf", help="Relatório PDF único com dashboard e datasheet de cada linha")
+    parser.add_argument("--pdfs", metavar="DIR", help="Diretório para gerar um relatório PDF por linha (opcional)")
+    parser.add_argument("--exportar-formato", choices=["npz", "parquet", "arrow"],
+                        help="Converte também o diretório de --exportar em DIR/resultados.<formato>")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignora cache e coleta dados novamente")
+    parser.add_argument("--no-cache-fallback", action="store_true", help="Não usa cache vencido se a coleta falhar")
+    parser.add_argument("--cache-ttl-dias", type=float, default=None, help="TTL do cache em dias (padrão 30). Use 0 para desativar TTL")
+    parser.add_argument("--nasa-retries", type=int, default=3, help="Número de tentativas para consultar a NASA (padrão 3)")
+    parser.add_argument("--nasa-timeout", type=int, default=15, help="Timeout (s) por tentativa ao consultar a NASA (padrão 15)")
+    parser.add_argument("--grade-clima", help="Grade climática offline (src.gradeclima); a NASA vira alternativa")
+    parser.add_argument("--tarifas", nargs="?", const="", metavar="DIR",
+                        help="Usa a tarifa da distribuidora de cada cidade (padrão data/tarifas)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG","INFO","WARNING","ERROR","CRITICAL"], help="Nível de log")
+    args = parser.parse_args(argv)
+    try:
+        logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
+    except Exception:
+        pass
+
+    _configurar_grade(args.grade_clima)
+    tarifas = None
+    if args.tarifas is not None:
+        from .tarifas import DIRETORIO_PADRAO, carregar_tabela
+        tarifas = carregar_tabela(args.tarifas or DIRETORIO_PADRAO)
+    stats = processar_lote(
+        args.entrada, args.saida,
+        workers=args.workers,
+        tamanho_chunk=max(1, args.chunk),
+        out_dir_dashboards=args.dashboards,
+        tarifas=tarifas,
+        exportar=args.exportar,
+        pdf=args.pdf,
+        out_dir_pdfs=args.pdfs,
+        refresh_cache=args.refresh_cache,
+        allow_stale_fallback=(not args.no_cache_fallback),
+        ttl_seconds=_ttl_em_segundos(args.cache_ttl_dias),
+        retries=max(0, args.nasa_retries),
+        nasa_timeout=max(1, args.nasa_timeout),
+    )
+    print(f"\n✅ Lote concluído: {stats['ok']} propostas, {stats['erros']} com erro, {stats['cidades']} cidades → {args.saida}")
+    if args.pdf:
+        print(f"✅ Relatório PDF: {args.pdf}")
+    if args.exportar and args.exportar_formato:
+        from .exportacao import FORMATOS
+        caminho = FORMATOS[args.exportar_formato](args.exportar, os.path.join(args.exportar, f"resultados.{args.exportar_formato}"))
+        print(f"✅ Séries exportadas: {caminho}")
+
+
+def main_serve(argv):
+    """Subcomando `serve`: servidor HTTP/JSON de cotações com caches quentes."""
+    from .servidor import PORTA_PADRAO, TTL_MEMORIA_S, WORKERS_IO, WORKERS_PNG
+
+    parser = argparse.ArgumentParser(prog="python -m src.cli serve", description="Servidor local de cotações (JSON e PNG)")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help=f"Porta (padrão {PORTA_PADRAO})")
+    parser.add_argument("--workers-io", type=int, default=WORKERS_IO, help=f"Conexões atendidas em paralelo (padrão {WORKERS_IO})")
+    parser.add_argument("--workers-png", type=int, default=WORKERS_PNG,
+                        help=f"Processos de renderização PNG (padrão {WORKERS_PNG}; 0 = no próprio processo)")
+    parser.add_argument("--ttl-memoria-h", type=float, default=TTL_MEMORIA_S / 3600,
+                        help="Idade máxima (h) do clima mantido em memória; 0 = sem limite")
+    parser.add_argument("--cache-ttl-dias", type=float, default=None, help="TTL do cache em disco em dias (padrão 30). Use 0 para desativar TTL")
+    parser.add_argument("--nasa-retries", type=int, default=3, help="Número de tentativas para consultar a NASA (padrão 3)")
+    parser.add_argument("--nasa-timeout", type=int, default=15, help="Timeout (s) por tentativa ao consultar a NASA (padrão 15)")
+    parser.add_argument("--grade-clima", help="Grade climática offline (src.gradeclima); a NASA vira alternativa")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG","INFO","WARNING","ERROR","CRITICAL"], help="Nível de log")
+    args = parser.parse_args(argv)
+    try:
+        logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
+    except Exception:
+        pass
+
+    from .servidor import ServidorCotacao
+    _configurar_grade(args.grade_clima)
+    servidor = ServidorCotacao(
+        args.host, args.porta, workers_io=args.workers_io, workers_png=args.workers_png,
+        ttl_memoria_s=max(0.0, args.ttl_memoria_h) * 3600,
+        ttl_seconds=_ttl_em_segundos(args.cache_ttl_dias),
+        retries=max(0, args.nasa_retries), nasa_timeout=max(1, args.nasa_timeout),
+    )
+    print(f"🌐 Servidor de cotações em http://{args.host}:{args.porta} (Ctrl+C para encerrar)")
+    servidor.servir()
+
+
+def main(argv=None):
     if not logging.getLogger().handlers:
         logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
-    parser = argparse.ArgumentParser(description="Simulador Solar - CLI")
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "batch":
+        return main_batch(argv[1:])
+    if argv and argv[0] == "serve":
+        return main_serve(argv[1:])
+    if argv and argv[0] == "grade":
+        return main_grade(argv[1:])
+    parser = argparse.ArgumentParser(description="Simulador Solar - CLI (use `batch` para processar uma planilha, `serve` para o servidor de cotações, `grade` para a grade climática offline)")
     parser.add_argument("--cidade", required=True, help="Cidade, UF (ex.: Fortaleza, CE)")
     parser.add_argument("--consumo", type=float, required=True, help="Consumo médio mensal em kWh")
     parser.add_argument("--taxa", type=int, choices=[30, 50, 100], required=True, help="Taxa mínima (30, 50, 100 kWh)")
     parser.add_argument("--financiar", action="store_true", help="Ativa simulação com financiamento")
-    parser.add_argument("--taxa-aa", type=float, default=0.0, help="Taxa de juros anual (% a.a.) se financiar")
+    parser.add_argument("--taxa-aa", type=float, default=0.0, help="Taxa de juros anual (%% a.a.) se financiar")
     parser.add_argument("--meses", type=int, default=0, help="Prazo do financiamento em meses")
     parser.add_argument("--no-show", action="store_true", help="Não exibe a janela do gráfico (apenas salva PNG)")
-    parser.add_argument("--inflacao", type=float, help="Sobrescreve inflação anual (%)")
-    parser.add_argument("--degradacao", type=float, help="Sobrescreve degradação anual dos módulos (%)")
+    parser.add_argument("--inflacao", type=float, help="Sobrescreve inflação anual (%%)")
+    parser.add_argument("--degradacao", type=float, help="Sobrescreve degradação anual dos módulos (%%)")
     parser.add_argument("--refresh-cache", action="store_true", help="Ignora cache e coleta dados novamente")
+    parser.add_argument("--horario", action="store_true", help="Simulação horária (8760 h) com perfil de carga e autoconsumo real")
+    parser.add_argument("--perfil", default="residencial", choices=["residencial", "comercial", "plano"], help="Perfil de carga do modo horário")
+    parser.add_argument("--irradiancia-horaria", help="Arquivo local (CSV/.npy) com 8760 valores horários de irradiação")
+    parser.add_argument("--float32", action="store_true", help="Modo horário compacto (float32)")
+    parser.add_argument("--cenarios", type=int, default=0, help="Simula N cenários de risco (Monte Carlo) e gera as faixas P10/P50/P90")
+    parser.add_argument("--seed", type=int, default=None, help="Semente dos cenários de risco (reprodutível)")
+    parser.add_argument("--otimizar", choices=["vpl", "payback"], help="Compara o dimensionamento com o ótimo por VPL ou payback")
+    parser.add_argument("--excedencia", type=int, metavar="P",
+                        help="Simula a geração no nível de excedência P (ex.: 90 = P90) da série mensal NASA de 20+ anos")
+    parser.add_argument("--excedencia-metodo", default="empirico", choices=["empirico", "normal"],
+                        help="Percentis dos anos observados ou aproximação normal (padrão empirico)")
+    parser.add_argument("--tarifas", nargs="?", const="", metavar="DIR",
+                        help="Usa a tarifa da distribuidora da cidade (padrão data/tarifas)")
+    parser.add_argument("--catalogo", nargs="?", const="", metavar="DIR",
+                        help="Escolhe módulo, inversor e strings pelo catálogo de hardware (padrão data/catalogo)")
     parser.add_argument("--clear-cache", action="store_true", help="Remove cache da cidade antes de coletar")
     parser.add_argument("--output", help="Diretório para salvar o relatório PNG")
+    parser.add_argument("--exportar", metavar="ARQ.npz", help="Grava escalares e séries mensais da proposta em .npz")
+    parser.add_argument("--pdf", metavar="ARQ.pdf", help="Grava a proposta (dashboard e datasheet técnico) em PDF")
     parser.add_argument("--no-cache-fallback", action="store_true", help="Não usa cache vencido se a coleta falhar")
     parser.add_argument("--cache-ttl-dias", type=float, default=None, help="TTL do cache em dias (padrão 30). Use 0 para desativar TTL")
     parser.add_argument("--nasa-retries", type=int, default=3, help="Número de tentativas para consultar a NASA (padrão 3)")
     parser.add_argument("--nasa-timeout", type=int, default=15, help="Timeout (s) por tentativa ao consultar a NASA (padrão 15)")
+    parser.add_argument("--grade-clima", help="Grade climática offline (src.gradeclima); a NASA vira alternativa")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG","INFO","WARNING","ERROR","CRITICAL"], help="Nível de log")
-    args = parser.parse_args()
+    parser.add_argument("--profile", nargs="?", const="-", metavar="ARQ.json",
+                        help="Grava o trace JSON por fase (geodata, engineering, viz) em ARQ (padrão: stderr)")
+    parser.add_argument("--cprofile", metavar="ARQ.prof", help="Executa sob cProfile e grava as estatísticas (pstats) em ARQ")
+    args = parser.parse_args(argv)
     # Ajuste de log dinâmico
     try:
         logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
     except Exception:
         pass
 
+    if args.profile or args.cprofile:
+        return _executar_com_perfil(args)
+    return _executar(args)
+
+
+def _executar_com_perfil(args):
+    """Executa a proposta com spans ligados (e sob cProfile, se pedido) e grava o trace JSON."""
+    import json
+    from . import perf
+
+    perf.ativar()
+    perfilador = None
+    if args.cprofile:
+        import cProfile
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+    try:
+        with perf.span("cli.total"):
+            return _executar(args)
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(args.cprofile)
+            print(f"📊 cProfile salvo em {args.cprofile} (veja com: python -m pstats {args.cprofile})")
+        perf.desativar()
+        if args.profile:
+            trace = perf.trace()
+            if args.profile == "-":
+                json.dump(trace, sys.stderr, indent=2)
+                sys.stderr.write("\n")
+            else:
+                with open(args.profile, "w", encoding="utf-8") as f:
+                    json.dump(trace, f, indent=2)
+                print(f"📊 Trace por fase salvo em {args.profile}")
+
+
+def _fator_excedencia(args, irr, temp, tarifas, ttl_seconds):
+    """Imprime P50/P75/P90 (e o nível pedido) da série mensal e retorna o fator de geração do nível pedido."""
+    from .engineering import calcular_payback
+    from .excedencia import NIVEIS_PADRAO, simular_niveis
+    from .geodata import get_serie_mensal
+
+    serie = get_serie_mensal(args.cidade, refresh_cache=args.refresh_cache, ttl_seconds=ttl_seconds,
+                             allow_stale_fallback=(not args.no_cache_fallback), retries=max(0, args.nasa_retries),
+                             nasa_timeout=max(1, args.nasa_timeout))
+    if serie is None:
+        print("⚠️  Série mensal da NASA indisponível; simulando com a climatologia (P50 aproximado)")
+        return None
+    niveis = sorted(set(NIVEIS_PADRAO) | {args.excedencia})
+    n, r = simular_niveis(args.consumo, args.taxa, serie, niveis, args.excedencia_metodo, clima=(irr, temp),
+                          financiar=args.financiar, taxa_aa=args.taxa_aa, meses=args.meses,
+                          inflacao=args.inflacao, degradacao=args.degradacao, tarifas=tarifas)
+    payback = calcular_payback(r.saldo)
+    print(f"\n📉 GERAÇÃO POR NÍVEL DE EXCEDÊNCIA ({int(n.anos_validos)} anos completos entre {serie.anos[0]} e {serie.anos[-1]}):")
+    for k, p in enumerate(niveis):
+        pb = "sem retorno" if payback[k] != payback[k] else f"{int(payback[k])} meses"
+        marca = "  ◀" if p == args.excedencia else ""
+        print(f"   P{p}: {n.geracao_anual[k]:,.0f} kWh/kWp/ano ({n.fator[k] - 1:+.1%}) | payback {pb} | "
+              f"economia R$ {r.total_sem[k] - r.total_com[k]:,.2f}{marca}")
+    return float(n.fator[niveis.index(args.excedencia)])
+
+
+def _executar(args):
+    """Simula a proposta única descrita em `args` (já validados pelo parser)."""
+    # Importações tardias: `--help` e erros de argumento não pagam numpy/matplotlib/requests
+    from .geodata import get_data, clear_cache
+    from .engineering import ResultadoCotacao, calcular_tudo
+    from .viz import plotar_dashboard_final
+    from . import perf
+
+    _configurar_grade(args.grade_clima)
     if args.clear_cache:
         if clear_cache(args.cidade):
             print(f"🧹 Cache removido para: {args.cidade}")
@@ -45,43 +267,144 @@ def main():
         if args.meses <= 0 or args.taxa_aa <= 0:
             logger.error("Para financiar, informe --taxa-aa > 0 e --meses > 0")
             raise SystemExit(2)
+    if args.excedencia is not None and not 0 < args.excedencia < 100:
+        logger.error("--excedencia deve estar entre 1 e 99 (ex.: 90 para P90)")
+        raise SystemExit(2)
     # TTL em segundos (None usa padrão do módulo)
-    ttl_seconds = None
-    if args.cache_ttl_dias is not None:
-        try:
-            ttl_seconds = max(0, int(args.cache_ttl_dias * 86400))
-        except Exception:
-            ttl_seconds = None
-
-    irr, temp = get_data(
-        args.cidade,
-        refresh_cache=args.refresh_cache,
-        allow_stale_fallback=(not args.no_cache_fallback),
-        ttl_seconds=ttl_seconds if ttl_seconds is not None else None,
-        retries=max(0, args.nasa_retries),
-        nasa_timeout=max(1, args.nasa_timeout)
-    )
+    ttl_seconds = _ttl_em_segundos(args.cache_ttl_dias)
+
+    with perf.span("cli.clima"):
+        irr, temp = get_data(
+            args.cidade,
+            refresh_cache=args.refresh_cache,
+            allow_stale_fallback=(not args.no_cache_fallback),
+            ttl_seconds=ttl_seconds if ttl_seconds is not None else None,
+            retries=max(0, args.nasa_retries),
+            nasa_timeout=max(1, args.nasa_timeout)
+        )
     if irr is None:
         raise SystemExit("Cidade não encontrada. Verifique o nome (ex.: 'Fortaleza, CE').")
 
     fin_data = (args.taxa_aa, args.meses) if args.financiar else None
-    (qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com) = calcular_tudo(
-        args.consumo, args.taxa, irr, temp, args.financiar, fin_data,
-        inflacao_override=args.inflacao, degradacao_override=args.degradacao
-    )
+    tarifas = None
+    if args.tarifas is not None:
+        from .tarifas import DIRETORIO_PADRAO, carregar_tabela
+
+        tabela = carregar_tabela(args.tarifas or DIRETORIO_PADRAO)
+        distribuidora = tabela.localizar(args.cidade)
+        if distribuidora is None:
+            print(f"ℹ️ Distribuidora de {args.cidade} fora da tabela; usando a tarifa padrão")
+        else:
+            tarifas = tabela.vetores(distribuidora.codigo, inflacao=args.inflacao)
+            print(f"🔌 Distribuidora: {distribuidora.nome} | tarifa inicial R$ {tarifas[0][0]:.3f}/kWh "
+                  f"| Fio B R$ {tarifas[1][0]:.3f}/kWh")
+            if args.horario:
+                logger.warning("--tarifas não se aplica ao modo horário; usando a tarifa padrão")
+    fator_geracao = None
+    if args.excedencia is not None:
+        if args.horario:
+            logger.warning("--excedencia não se aplica ao modo horário; usando a climatologia")
+        else:
+            with perf.span("cli.excedencia"):
+                fator_geracao = _fator_excedencia(args, irr, temp, tarifas, ttl_seconds)
+    if args.horario:
+        import numpy as np
+        from .geodata import obter_coordenadas
+        from .horario import LATITUDE_PADRAO, calcular_lote_horario, ler_serie_horaria
+
+        coords = obter_coordenadas(args.cidade)
+        r = calcular_lote_horario(
+            args.consumo, args.taxa, irr, temp, coords[0] if coords else LATITUDE_PADRAO, args.perfil,
+            args.financiar, args.taxa_aa, args.meses, args.inflacao, args.degradacao,
+            irr_horaria=ler_serie_horaria(args.irradiancia_horaria) if args.irradiancia_horaria else None,
+            dtype=np.float32 if args.float32 else np.float64,
+        )
+        resultado = ResultadoCotacao.do_lote(r, 0, financiado=args.financiar)
+        print(f"\n⏱️  MODO HORÁRIO (perfil {args.perfil}): autoconsumo de {r.fracao_autoconsumo[0]:.1%} da geração")
+    else:
+        resultado = calcular_tudo(
+            args.consumo, args.taxa, irr, temp, args.financiar, fin_data,
+            inflacao_override=args.inflacao, degradacao_override=args.degradacao, tarifas=tarifas,
+            fator_geracao=fator_geracao,
+        )
+    (qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com) = resultado
+
+    if args.exportar:
+        from .exportacao import salvar_npz
+        salvar_npz(args.exportar, resultado)
+        print(f"✅ Séries exportadas: {args.exportar}")
 
     print("\n💰 RESUMO COMERCIAL:")
     print(f"   Investimento Total: R$ {capex:,.2f}")
     if args.financiar:
         print(f"   Parcela Mensal: R$ {parc:,.2f}")
+    if resultado.ano_equilibrio is None:
+        pb_txt = "sem retorno em 25 anos"
+    else:
+        pb_txt = f"{int(resultado.payback)} meses (ano {resultado.ano_equilibrio})"
+    tir_txt = "" if resultado.tir != resultado.tir else f" | TIR {resultado.tir:.1%} a.a."
+    print(f"   Payback: {pb_txt}")
+    print(f"   Economia em 25 anos: R$ {resultado.economia_total:,.2f} | VPL R$ {resultado.vpl():,.2f}{tir_txt}")
 
     # Plota e salva
-    path_png = plotar_dashboard_final(
-        args.cidade, pot, ant, novo, saldo, tot_sem, tot_com, parc, args.financiar,
-        show=(not args.no_show), out_dir=args.output
-    )
+    with perf.span("cli.dashboard"):
+        path_png = plotar_dashboard_final(
+            args.cidade, pot, ant, novo, saldo, tot_sem, tot_com, parc, args.financiar,
+            show=(not args.no_show), out_dir=args.output
+        )
     if path_png:
         print(f"\n✅ Arquivo gerado: {path_png}")
+    if args.pdf:
+        from .relatorio import gerar_pdf
+        with perf.span("cli.pdf"):
+            gerar_pdf([(args.cidade, resultado, args.financiar)], args.pdf)
+        print(f"✅ Relatório PDF: {args.pdf}")
+
+    if args.catalogo is not None:
+        from .catalogo import DIRETORIO_PADRAO, Catalogo, buscar_projeto
+        from .engineering import potencia_necessaria_wp
+
+        catalogo = Catalogo.carregar(args.catalogo or DIRETORIO_PADRAO)
+        projeto = buscar_projeto(catalogo, potencia_necessaria_wp(args.consumo, irr, temp))
+        if projeto is None:
+            print("\n🔧 CATÁLOGO: nenhuma combinação módulo/inversor atende à potência necessária")
+        else:
+            print(f"\n🔧 PROJETO PELO CATÁLOGO ({len(catalogo.modulos_skus)} módulos x {len(catalogo.inversores_skus)} inversores):")
+            print(f"   {projeto.qtd_modulos}x {projeto.modulo} ({projeto.strings} string(s) de {projeto.modulos_por_string}) "
+                  f"= {projeto.pot_dc_wp/1000:.2f} kWp | inversor {projeto.inversor} (DC/AC {projeto.razao_dc_ac:.2f})")
+            print(f"   Hardware R$ {projeto.custo_hardware:,.2f} | investimento R$ {projeto.capex:,.2f} | "
+                  f"{projeto.area_m2:.1f} m², {projeto.peso_kg:.0f} kg")
+
+    if args.otimizar:
+        from .otimizacao import otimizar_dimensionamento
+
+        otimo = otimizar_dimensionamento(
+            args.consumo, args.taxa, irr, temp, args.financiar, args.taxa_aa, args.meses,
+            criterio=args.otimizar, inflacao=args.inflacao, degradacao=args.degradacao, tarifas=tarifas,
+        )
+        print(f"\n📐 DIMENSIONAMENTO ÓTIMO ({args.otimizar.upper()}, {otimo.fronteira.qtd.size} candidatos):")
+        for rotulo, c in (("Fórmula", otimo.formula()), ("Ótimo", otimo.melhor())):
+            pb_txt = "sem retorno" if c["payback"] != c["payback"] else f"{int(c['payback'])} meses"
+            print(f"   {rotulo}: {c['qtd']} módulos ({c['pot_wp']/1000:.2f} kWp), inversor {c['inv_w']/1000:.0f} kW | "
+                  f"investimento R$ {c['capex']:,.2f} | VPL R$ {c['vpl']:,.2f} | payback {pb_txt}")
+
+    if args.cenarios > 0:
+        from .risco import ParametrosRisco, simular_cenarios
+        from .viz import plotar_bandas_risco
+
+        risco = simular_cenarios(
+            args.consumo, args.taxa, irr, temp, args.financiar, args.taxa_aa, args.meses,
+            n_cenarios=args.cenarios, seed=args.seed,
+            parametros=ParametrosRisco(inflacao_media=args.inflacao, degradacao_media=args.degradacao),
+            tarifas=tarifas,
+        )
+        print(f"\n🎲 RISCO ({args.cenarios} cenários):")
+        for q, pb, eco in zip(risco.percentis, risco.payback_percentis, risco.economia_percentis):
+            pb_txt = "sem retorno" if pb != pb else f"{int(pb)} meses"
+            print(f"   P{q:g}: payback {pb_txt} | economia 25 anos R$ {eco:,.2f}")
+        print(f"   Probabilidade de não retornar em 25 anos: {risco.prob_sem_retorno:.1%}")
+        path_risco = plotar_bandas_risco(args.cidade, risco.saldo_bandas, risco.percentis, risco.saldo_base, out_dir=args.output)
+        print(f"✅ Faixas de risco: {path_risco}")
 
 
 if __name__ == "__main__":
@@ -7,6 +7,12 @@ INFLACAO_ENERGETICA_AA = 0.08 # 8% ao ano
 DEGRADACAO_ANUAL = 0.006      # 0.6% ao ano
 PR_MINIMO = 0.70
 PR_BASE = 0.80
+TAXA_DESCONTO_AA = 0.10       # 10% ao ano (custo de oportunidade no VPL)
+RAZAO_DC_AC_MAX = 1.35        # potência dos módulos / potência do inversor
+RAZAO_DC_AC_MIN = 0.80        # abaixo disso o inversor está superdimensionado
+FATOR_INSTALACAO = 2.1        # capex = hardware x fator (estrutura, cabos, mão de obra, margem)
+TEMP_MINIMA_C = 5.0           # temperatura ambiente mínima para a Voc de string (frio)
+TEMP_CELULA_MAX_C = 70.0      # temperatura de célula máxima para a Vmp de string (calor)
 
 MODULO_W = 555
 MODULO_AREA_M2 = 2.6
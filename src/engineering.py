@@ -1,6 +1,10 @@
 import numpy as np
+from bisect import bisect_right
+from functools import lru_cache
 from math import ceil
-from . import config
+from typing import NamedTuple
+from . import config, perf
+from .financiamento import mes_de_retorno, parcela_price, parcela_price_escalar, tir, vpl
 import logging
 logger = logging.getLogger(__name__)
 
@@ -9,8 +13,20 @@ DB_HARDWARE = {
     'MODULO': {'W': config.MODULO_W, 'AREA': config.MODULO_AREA_M2, 'PESO': config.MODULO_PESO_KG},
 }
 
-def imprimir_relatorio_tecnico(qtd, pot_inv_w):
-    """Imprime os detalhes físicos e elétricos no console."""
+class DatasheetTecnico(NamedTuple):
+    """Detalhes físicos e elétricos do sistema (relatório técnico)."""
+    qtd_modulos: int
+    area_m2: float
+    peso_kg: float
+    carga_kg_m2: float
+    inversor_kw: float
+    corrente_a: float
+    disjuntor_a: int
+    cabo: str
+
+
+def datasheet_tecnico(qtd, pot_inv_w):
+    """Área, peso e proteção elétrica para `qtd` módulos e um inversor de `pot_inv_w` W."""
     area = qtd * DB_HARDWARE['MODULO']['AREA']
     peso = qtd * (DB_HARDWARE['MODULO']['PESO'] + 2)  # +2kg estrutura
 
@@ -20,21 +36,28 @@ def imprimir_relatorio_tecnico(qtd, pot_inv_w):
     cabo = "4.0mm²" if disj > 20 else "2.5mm²"
     if disj > 32: cabo = "6.0mm²"
     if disj > 50: cabo = "10.0mm²"
+    return DatasheetTecnico(int(qtd), float(area), float(peso), float(peso / area), pot_inv_w / 1000,
+                            float(i_nom), disj, cabo)
+
+
+def imprimir_relatorio_tecnico(qtd, pot_inv_w):
+    """Imprime os detalhes físicos e elétricos no console."""
+    d = datasheet_tecnico(qtd, pot_inv_w)
 
     print("\n" + "=" * 60)
     print("🛠️  RELATÓRIO TÉCNICO DE ENGENHARIA (ESTRUTURA & ELÉTRICA)  🛠️")
     print("=" * 60)
-    logger.info("Engenharia: qtd_modulos=%s, inversor_w=%s, area_m2=%.2f, peso_kg=%.0f", qtd, pot_inv_w, area, peso)
+    logger.info("Engenharia: qtd_modulos=%s, inversor_w=%s, area_m2=%.2f, peso_kg=%.0f", qtd, pot_inv_w, d.area_m2, d.peso_kg)
     print(f"🏗️  ESTRUTURA E TELHADO:")
-    print(f"    • Área Necessária: {area:.1f} m² (Livre de sombras)")
-    print(f"    • Peso Total (Carga): {peso:.0f} kg")
-    print(f"    • Distribuição: {peso / area:.1f} kg/m²")
+    print(f"    • Área Necessária: {d.area_m2:.1f} m² (Livre de sombras)")
+    print(f"    • Peso Total (Carga): {d.peso_kg:.0f} kg")
+    print(f"    • Distribuição: {d.carga_kg_m2:.1f} kg/m²")
     print("-" * 60)
     print(f"⚡  CONEXÃO ELÉTRICA:")
-    print(f"    • Inversor Selecionado: {pot_inv_w / 1000:.1f} kW")
-    print(f"    • Corrente de Saída: {i_nom:.1f} A")
-    print(f"    • Disjuntor Recomendado: {disj} A (Curva C)")
-    print(f"    • Cabo CA Recomendado: {cabo}")
+    print(f"    • Inversor Selecionado: {d.inversor_kw:.1f} kW")
+    print(f"    • Corrente de Saída: {d.corrente_a:.1f} A")
+    print(f"    • Disjuntor Recomendado: {d.disjuntor_a} A (Curva C)")
+    print(f"    • Cabo CA Recomendado: {d.cabo}")
     print("=" * 60)
 
 
@@ -45,101 +68,493 @@ def _to_month_array(data):
         return np.array([data.get(m) for m in order], dtype=float)
     return np.asarray(data, dtype=float)
 
-def calcular_tudo(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, financiar=False, fin_dados=None, inflacao_override=None, degradacao_override=None):
+MESES_SIMULACAO = 300  # 25 anos
+FRACAO_INJECAO = 0.65   # parcela da geração injetada na rede (restante é autoconsumo)
+TAMANHO_BLOCO_LOTE = 256   # clientes por bloco em calcular_lote (temporários pequenos, cache-friendly)
+
+# Escada de inversores: potência (W) escolhida conforme a potência de pico do arranjo
+INVERSORES_W = np.array([3000, 5000, 8000, 10000])
+INVERSORES_LIMITE_WP = np.array([4000, 6500, 10000])
+
+# Índices pré-calculados do horizonte de simulação (mês, ano e mês do calendário)
+_MES = np.arange(MESES_SIMULACAO)
+_ANO = _MES // 12
+_MES_CAL = _MES % 12
+_ANOS = np.arange(MESES_SIMULACAO // 12, dtype=float)
+
+
+class ResultadoLote(NamedTuple):
+    """Resultado de calcular_lote: vetores (N,) e matrizes (N, 300)."""
+    qtd: np.ndarray
+    pot_wp: np.ndarray
+    inv_w: np.ndarray
+    capex: np.ndarray
+    parcela: np.ndarray
+    conta_antiga: np.ndarray
+    conta_nova: np.ndarray
+    saldo: np.ndarray
+    total_sem: np.ndarray
+    total_com: np.ndarray
+
+
+class ResultadoCotacao:
+    """Resultado de calcular_tudo: séries float64 (300,) e métricas calculadas sob demanda.
+
+    Continua desempacotável como a antiga tupla de 9 itens
+    (qtd, pot_wp, capex, parcela, conta_antiga, conta_nova, saldo, total_sem,
+    total_com). Payback, VPL, TIR, ano de equilíbrio e agregados anuais são
+    calculados no primeiro acesso e guardados.
     """
-    Dimensiona o sistema, estima custos e simula fluxo de caixa em 25 anos (300 meses).
+    __slots__ = ("qtd", "pot_wp", "inv_w", "capex", "parcela", "conta_antiga", "conta_nova", "saldo",
+                 "total_sem", "total_com", "capex_vista", "_metricas")
+    CAMPOS_TUPLA = ("qtd", "pot_wp", "capex", "parcela", "conta_antiga", "conta_nova", "saldo", "total_sem", "total_com")
 
-    Retorna:
-        (qtd_modulos, potencia_wp, capex, parcela_mensal, conta_antiga[], conta_nova[], saldo[], total_sem, total_com)
+    def __init__(self, qtd, pot_wp, inv_w, capex, parcela, conta_antiga, conta_nova, saldo, total_sem, total_com,
+                 capex_vista=0.0):
+        self.qtd = qtd
+        self.pot_wp = pot_wp
+        self.inv_w = inv_w
+        self.capex = capex
+        self.parcela = parcela
+        self.conta_antiga = conta_antiga
+        self.conta_nova = conta_nova
+        self.saldo = saldo
+        self.total_sem = total_sem
+        self.total_com = total_com
+        self.capex_vista = capex_vista   # investimento pago no mês 0 (0 quando financiado)
+        self._metricas = None
+
+    @classmethod
+    def do_lote(cls, r, k, financiado=False):
+        """Cliente `k` de um ResultadoLote; as séries são vistas das matrizes do lote (sem cópia)."""
+        capex = float(r.capex[k])
+        return cls(int(r.qtd[k]), int(r.pot_wp[k]), float(r.inv_w[k]), capex, float(r.parcela[k]),
+                   r.conta_antiga[k], r.conta_nova[k], r.saldo[k], float(r.total_sem[k]), float(r.total_com[k]),
+                   0.0 if financiado else capex)
+
+    # --- compatibilidade com a tupla -----------------------------------
+
+    def astuple(self):
+        return tuple(getattr(self, c) for c in self.CAMPOS_TUPLA)
+
+    def __iter__(self):
+        return iter(self.astuple())
+
+    def __len__(self):
+        return len(self.CAMPOS_TUPLA)
+
+    def __getitem__(self, k):
+        return self.astuple()[k]
+
+    def __repr__(self):
+        return (f"ResultadoCotacao(qtd={self.qtd}, pot_wp={self.pot_wp}, capex={self.capex:.2f}, "
+                f"parcela={self.parcela:.2f}, total_sem={self.total_sem:.2f}, total_com={self.total_com:.2f})")
+
+    # --- métricas sob demanda ------------------------------------------
+
+    def _memo(self, chave, calcular):
+        if self._metricas is None:
+            self._metricas = {}
+        if chave not in self._metricas:
+            self._metricas[chave] = calcular()
+        return self._metricas[chave]
+
+    @property
+    def fluxo(self):
+        """Economia líquida mês a mês (conta antiga - conta nova, já com as parcelas)."""
+        return self._memo("fluxo", lambda: np.subtract(self.conta_antiga, self.conta_nova))
+
+    @property
+    def payback(self):
+        """Mês (1..300) em que o saldo acumulado fica não negativo; NaN sem retorno em 25 anos."""
+        return self._memo("payback", lambda: float(mes_de_retorno(self.saldo)))
+
+    @property
+    def ano_equilibrio(self):
+        """Ano (1..25) em que o saldo acumulado fica não negativo; None sem retorno."""
+        p = self.payback
+        return None if p != p else max(1, int(np.ceil(p / 12.0)))
+
+    def vpl(self, taxa_desconto_aa=None):
+        """VPL da economia mensal à taxa anual (fração; padrão config.TAXA_DESCONTO_AA)."""
+        taxa = config.TAXA_DESCONTO_AA if taxa_desconto_aa is None else float(taxa_desconto_aa)
+        return self._memo(("vpl", taxa), lambda: float(vpl(self.fluxo, taxa, self.capex_vista)))
+
+    @property
+    def tir(self):
+        """TIR anual (fração) do investimento à vista; NaN quando financiado ou sem troca de sinal."""
+        def calcular():
+            if self.capex_vista <= 0:
+                return float("nan")
+            return float(tir(self.fluxo, self.capex_vista))
+        return self._memo("tir", calcular)
+
+    @property
+    def economia_total(self):
+        """Economia líquida em 25 anos (total sem solar - total com solar, investimento incluído)."""
+        return self.total_sem - self.total_com
+
+    def _anual(self, serie):
+        return np.asarray(serie).reshape(-1, 12).sum(axis=1)
+
+    @property
+    def conta_antiga_anual(self):
+        """Soma anual (25,) da conta sem solar."""
+        return self._memo("conta_antiga_anual", lambda: self._anual(self.conta_antiga))
+
+    @property
+    def conta_nova_anual(self):
+        """Soma anual (25,) da conta com solar (inclui parcelas)."""
+        return self._memo("conta_nova_anual", lambda: self._anual(self.conta_nova))
+
+    @property
+    def economia_anual(self):
+        """Economia anual (25,): conta antiga - conta nova."""
+        return self._memo("economia_anual", lambda: self.conta_antiga_anual - self.conta_nova_anual)
+
+    @property
+    def saldo_anual(self):
+        """Saldo acumulado ao fim de cada ano (25,)."""
+        return self.saldo[11::12]
+
+
+def _tarifa_mensal(tarifa_base, inflacao):
+    """Tarifas (R$/kWh) mês a mês, reajustadas anualmente pela inflação.
+
+    `inflacao` escalar gera (1, 300); vetor (N,) gera (N, 300).
     """
-    irr = _to_month_array(irr_mensal)
-    temp = _to_month_array(temp_mensal)
-    irr_media = float(np.mean(irr)) if irr.size else 4.5  # HSP média
-    temp_media = float(np.mean(temp)) if temp.size else 25.0
+    inflacao = np.asarray(inflacao, dtype=float)
+    return (tarifa_base * (1.0 + inflacao[..., None]) ** _ANOS)[..., _ANO]
 
-    perda_termica = max(0.0, (temp_media + 20 - 25) * 0.0035)  # coeficiente simplificado
-    PR = max(config.PR_MINIMO, config.PR_BASE - perda_termica)
 
-    pot_necessaria_kwp = (consumo_kwh_mes / (irr_media * 30.0 * PR))
+def _tarifas_padrao(inflacao):
+    """(tarifa, fio_b) mês a mês com os parâmetros atuais de config e a `inflacao` dada."""
+    return _tarifas_memo(inflacao, config.TARIFA_BASE_R_KWH, config.FIO_B_COMPONENTE, config.FIO_B_FATOR)
+
+
+@lru_cache(maxsize=64)
+def _tarifas_memo(inflacao, tarifa_base, fio_b_componente, fio_b_fator):
+    """_tarifas_padrao memoizado por todos os parâmetros (config pode mudar em tempo de execução)."""
+    tar = _tarifa_mensal(tarifa_base, inflacao)
+    fio_b = tar * (fio_b_componente * fio_b_fator)
+    tar.flags.writeable = False
+    fio_b.flags.writeable = False
+    return tar, fio_b
+
+
+@lru_cache(maxsize=64)
+def _degradacao_mensal(degradacao):
+    """Fator de degradação linear mês a mês (300,), memoizado por taxa anual."""
+    fator = (1.0 - degradacao * _ANOS)[_ANO]
+    fator.flags.writeable = False
+    return fator
+
+
+def _geracao_mensal(pot_wp, hsp_mensal, PR, degradacao):
+    """Geração (kWh) mês a mês (N, 300) considerando degradação linear anual.
+
+    Com pot_wp, PR e degradacao escalares (floats do Python) retorna (300,).
+    """
+    if isinstance(degradacao, float) and isinstance(pot_wp, (int, float)):
+        fator = pot_wp / 1000.0 * 30.0 * PR
+        return (np.asarray(hsp_mensal, dtype=float) * fator)[..., _MES_CAL] * _degradacao_mensal(degradacao)
+    fator = (np.asarray(pot_wp, dtype=float) / 1000.0) * 30.0 * PR
+    degradacao = np.asarray(degradacao, dtype=float)
+    hsp = np.asarray(hsp_mensal, dtype=float) * fator[..., None]
+    return hsp[..., _MES_CAL] * (1.0 - degradacao[..., None] * _ANOS)[..., _ANO]
+
+
+def _pr_termico(temp_media):
+    """Performance ratio com perda térmica simplificada (vetorizado)."""
+    perda_termica = np.maximum(0.0, (temp_media + 20 - 25) * 0.0035)
+    return np.maximum(config.PR_MINIMO, config.PR_BASE - perda_termica)
+
+
+def _dimensionar(consumo_kwh_mes, irr_media, PR):
+    """Quantidade de módulos (par, mínimo 2) e potência de pico (Wp)."""
+    pot_necessaria_kwp = consumo_kwh_mes / (irr_media * 30.0 * PR)
+    qtd = np.maximum(2, np.ceil((pot_necessaria_kwp * 1000) / DB_HARDWARE['MODULO']['W'])).astype(np.int64)
+    qtd += qtd % 2
+    return qtd, qtd * DB_HARDWARE['MODULO']['W']
+
+
+def _dimensionar_escalar(consumo_kwh_mes, irr, temp):
+    """_pr_termico, _dimensionar e _selecionar_inversor para um único cliente, em floats do Python.
+
+    Mesmas fórmulas e mesma ordem de operações (resultado idêntico); evita o
+    custo fixo dos ufuncs sobre escalares na cotação interativa.
+    Retorna (PR, qtd, pot_wp, inv_w).
+    """
+    perda_termica = max(0.0, (float(temp.sum()) / 12.0 + 20 - 25) * 0.0035)
+    PR = max(config.PR_MINIMO, config.PR_BASE - perda_termica)
+    pot_necessaria_kwp = consumo_kwh_mes / (float(irr.sum()) / 12.0 * 30.0 * PR)
     qtd = max(2, ceil((pot_necessaria_kwp * 1000) / DB_HARDWARE['MODULO']['W']))
-    if qtd % 2 != 0:
-        qtd += 1
+    qtd += qtd % 2
     pot_wp = qtd * DB_HARDWARE['MODULO']['W']
+    return PR, qtd, pot_wp, int(INVERSORES_W[bisect_right(INVERSORES_LIMITE_WP, pot_wp)])
 
-    # Seleção simples de inversor
-    if pot_wp < 4000:
-        inv_w = 3000
-    elif pot_wp < 6500:
-        inv_w = 5000
-    elif pot_wp < 10000:
-        inv_w = 8000
-    else:
-        inv_w = 10000
 
-    # Custos aproximados
+def _selecionar_inversor(pot_wp):
+    """Potência do inversor (W) pela escada INVERSORES_W."""
+    return INVERSORES_W[np.searchsorted(INVERSORES_LIMITE_WP, pot_wp, side='right')]
+
+
+def _capex(qtd, inv_w):
+    """Investimento aproximado: hardware (módulos + inversor) com fator de instalação."""
     custo_hardware = (qtd * 620.0) + (inv_w * 0.8)
-    capex = custo_hardware * 2.1
+    return custo_hardware * config.FATOR_INSTALACAO
+
 
-    # Financiamento (Price)
-    parcela = 0.0
-    meses = 0
+def _simular_fluxo(consumo_kwh_mes, taxa_min_kwh, ger_kwh, tar, fio_b, parcela, meses, saldo_inicial, out=None,
+                   injecao_kwh=None):
+    """Fluxo de caixa mensal vetorizado.
+
+    Recebe as séries de geração, tarifa e Fio B (R$/kWh) já montadas e
+    retorna (conta_antiga, conta_nova, saldo) como np.ndarray. Os parâmetros
+    por cliente devem ser escalares ou colunas (N, 1). Com `out`, as três
+    séries são escritas nos arrays fornecidos (operações in-place).
+    `injecao_kwh` (energia injetada mês a mês) substitui a divisão fixa
+    FRACAO_INJECAO; o restante da geração é autoconsumo.
+    """
+    if out is None:
+        forma = np.broadcast_shapes(np.shape(ger_kwh), np.shape(tar), np.shape(consumo_kwh_mes))
+        out = (np.empty(forma), np.empty(forma), np.empty(forma))
+    conta_antiga, conta_nova, saldo = out
+
+    np.multiply(consumo_kwh_mes, tar, out=conta_antiga)
+
+    # Consumo da rede após o autoconsumo (usa `saldo` como rascunho)
+    cons_rede = saldo
+    if injecao_kwh is None:
+        np.multiply(ger_kwh, FRACAO_INJECAO - 1.0, out=cons_rede)
+        aux = ger_kwh * FRACAO_INJECAO
+    else:
+        np.subtract(injecao_kwh, ger_kwh, out=cons_rede)
+        aux = np.array(injecao_kwh, dtype=float)
+    cons_rede += consumo_kwh_mes
+    np.maximum(cons_rede, 0.0, out=cons_rede)
+
+    # Créditos da energia injetada, limitados ao consumo da rede
+    np.minimum(aux, cons_rede, out=aux)
+    np.subtract(cons_rede, aux, out=conta_nova)
+    conta_nova *= tar
+    aux *= fio_b
+    conta_nova += aux
+
+    # Piso da taxa mínima de disponibilidade
+    np.multiply(taxa_min_kwh, tar, out=aux)
+    np.maximum(conta_nova, aux, out=conta_nova)
+
+    # Parcelas do financiamento nos primeiros `meses`
+    if isinstance(meses, int):
+        if meses > 0:
+            conta_nova[..., :meses] += parcela
+    else:
+        np.multiply(_MES < meses, parcela, out=aux)
+        conta_nova += aux
+
+    np.subtract(conta_antiga, conta_nova, out=saldo)
+    np.cumsum(saldo, axis=-1, out=saldo)
+    saldo += saldo_inicial
+    return conta_antiga, conta_nova, saldo
+
+
+def _coluna(valor, n, dtype=float):
+    """Converte escalar ou sequência em vetor (n,)."""
+    arr = np.asarray(valor, dtype=dtype)
+    return np.full(n, arr, dtype=dtype) if arr.ndim == 0 else arr.reshape(n)
+
+
+def _matriz_mensal(valor, n):
+    """Converte dados mensais (12,) ou (n, 12) em matriz (n, 12)."""
+    arr = np.asarray(valor, dtype=float).reshape(-1, 12)
+    return np.repeat(arr, n, axis=0) if arr.shape[0] == 1 and n > 1 else arr
+
+
+def _projetar(consumo, irr, temp, fin, taxa_aa, meses):
+    """Dimensionamento, custos e financiamento de N clientes (vetores (N,), matrizes (N, 12)).
+
+    Retorna (PR, qtd, pot_wp, inv_w, capex, meses_fin, parcela, capex_vista).
+    """
+    n = consumo.shape[0]
+    PR = _pr_termico(temp.sum(axis=1) / 12.0)
+    qtd, pot_wp = _dimensionar(consumo, irr.sum(axis=1) / 12.0, PR)
+    inv_w = _selecionar_inversor(pot_wp)
+    capex = _capex(qtd, inv_w)
+
+    # Financiamento (Price) apenas para quem financia; capex à vista para os demais
+    meses_fin = np.where(fin, _coluna(meses, n, dtype=np.int64), 0)
+    parcela = parcela_price(capex, _coluna(taxa_aa, n), meses_fin) if fin.any() else np.zeros(n)
+    capex_vista = np.where(fin, 0.0, capex)
+    return PR, qtd, pot_wp, inv_w, capex, meses_fin, parcela, capex_vista
+
+
+def calcular_lote(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, financiar=False, taxa_aa=0.0, meses=0,
+                  inflacao=None, degradacao=None, tamanho_bloco=TAMANHO_BLOCO_LOTE, tarifas=None, fator_geracao=None):
+    """Dimensiona e simula N clientes de uma vez.
+
+    consumo_kwh_mes, taxa_min_kwh, financiar, taxa_aa, meses, inflacao e
+    degradacao aceitam escalar ou vetor (N,); irr_mensal e temp_mensal aceitam
+    (12,) ou (N, 12). As matrizes (N, 300) são preenchidas em blocos de
+    `tamanho_bloco` linhas para limitar os temporários.
+
+    `tarifas` = (tarifa, fio_b) mês a mês, (300,) ou (N, 300), como os de
+    tarifas.TabelaTarifas.vetores; substitui a tarifa de config (e `inflacao`).
+    `fator_geracao` (escalar ou (N,)) multiplica a geração sem mudar o
+    dimensionamento, ex.: o nível P90 de excedencia.niveis_excedencia.
+
+    Retorna ResultadoLote.
+    """
+    consumo = np.atleast_1d(np.asarray(consumo_kwh_mes, dtype=float))
+    n = consumo.shape[0]
+    taxa_min = _coluna(taxa_min_kwh, n)
+    irr = _matriz_mensal(irr_mensal, n)
+    temp = _matriz_mensal(temp_mensal, n)
+    fin = _coluna(financiar, n, dtype=bool)
+    inflacao = _coluna(config.INFLACAO_ENERGETICA_AA if inflacao is None else inflacao, n)
+    degradacao = _coluna(config.DEGRADACAO_ANUAL if degradacao is None else degradacao, n)
+    fator = None if fator_geracao is None else _coluna(fator_geracao, n)
+
+    with perf.span("engineering.dimensionamento"):
+        PR, qtd, pot_wp, inv_w, capex, meses_fin, parcela, capex_vista = _projetar(consumo, irr, temp, fin, taxa_aa, meses)
+
+    # Tarifas da distribuidora, se informadas; senão as de config, comuns a todos quando a inflação é única
+    if tarifas is not None:
+        tar, fio_b = (np.asarray(v, dtype=float) for v in tarifas)
+        tar_unica = tar.ndim == 1
+    else:
+        tar_unica = n == 1 or bool(np.all(inflacao == inflacao[0]))
+        if tar_unica:
+            tar, fio_b = _tarifas_padrao(float(inflacao[0]))
+
+    conta_antiga = np.empty((n, MESES_SIMULACAO))
+    conta_nova = np.empty((n, MESES_SIMULACAO))
+    saldo = np.empty((n, MESES_SIMULACAO))
+    bloco = max(1, int(tamanho_bloco))
+    with perf.span("engineering.simulacao"):
+        for ini in range(0, n, bloco):
+            b = slice(ini, ini + bloco)
+            if tar_unica:
+                tar_b, fio_b_b = tar, fio_b
+            elif tarifas is not None:
+                tar_b, fio_b_b = tar[b], fio_b[b]
+            else:
+                tar_b = _tarifa_mensal(config.TARIFA_BASE_R_KWH, inflacao[b])
+                fio_b_b = tar_b * (config.FIO_B_COMPONENTE * config.FIO_B_FATOR)
+            ger_kwh = _geracao_mensal(pot_wp[b], irr[b], PR[b], degradacao[b])
+            if fator is not None:
+                ger_kwh *= fator[b, None]
+            _simular_fluxo(
+                consumo[b, None], taxa_min[b, None], ger_kwh, tar_b, fio_b_b,
+                parcela[b, None], meses_fin[b, None], -capex_vista[b, None],
+                out=(conta_antiga[b], conta_nova[b], saldo[b]),
+            )
+
+    total_sem = conta_antiga.sum(axis=1)
+    total_com = conta_nova.sum(axis=1) + capex_vista
+
+    return ResultadoLote(qtd, pot_wp, inv_w, capex, parcela, conta_antiga, conta_nova, saldo, total_sem, total_com)
+
+
+def calcular_payback(saldo):
+    """Mês (1..300) a partir do qual o saldo acumulado fica não negativo.
+
+    Aceita (300,) ou (N, 300). Retorna 0 quando o saldo nunca fica negativo e
+    NaN quando não há retorno dentro do horizonte.
+    """
+    return mes_de_retorno(saldo)
+
+
+def _clima_mensal(irr_mensal, temp_mensal):
+    """(irr, temp) como arrays de 12 meses; séries de outro tamanho viram a média repetida."""
+    irr = _to_month_array(irr_mensal)
+    temp = _to_month_array(temp_mensal)
+    if irr.size != 12:
+        irr = np.full(12, float(irr.sum()) / irr.size if irr.size else 4.5)  # HSP média
+    if temp.size != 12:
+        temp = np.full(12, float(temp.sum()) / temp.size if temp.size else 25.0)
+    return irr, temp
+
+
+def _dados_financiamento(financiar, fin_dados):
+    """(taxa_aa, meses) de fin_dados; (0.0, 0) sem financiamento ou com dados inválidos."""
     if financiar and fin_dados:
-        taxa_aa, meses = fin_dados
         try:
-            i = (1.0 + float(taxa_aa) / 100.0) ** (1.0 / 12.0) - 1.0
-            if meses and meses > 0:
-                parcela = capex * ((i * (1 + i) ** meses) / ((1 + i) ** meses - 1))
+            return float(fin_dados[0]), int(fin_dados[1] or 0)
         except Exception:
-            parcela = 0.0
-
-    # Simulação mensal 25 anos
-    inflacao = float(inflacao_override) if inflacao_override is not None else config.INFLACAO_ENERGETICA_AA
-    tarifa_base = config.TARIFA_BASE_R_KWH
-    fio_b = (tarifa_base * config.FIO_B_COMPONENTE) * config.FIO_B_FATOR
-
-    conta_antiga = []
-    conta_nova = []
-    saldo = []
-    saldo_acum = -capex if not financiar else 0.0
-
-    for m in range(300):
-        ano = m // 12
-        idx = m % 12
-        tar = tarifa_base * ((1 + inflacao) ** ano)
-
-        # Consumo sem solar
-        conta_full = consumo_kwh_mes * tar
-        conta_antiga.append(conta_full)
-
-        # Geração estimada no mês
-        hsp = irr[idx] if irr.size == 12 else irr_media
-        degr = float(degradacao_override) if degradacao_override is not None else config.DEGRADACAO_ANUAL
-        ger_kwh = (pot_wp / 1000.0) * hsp * 30.0 * PR * (1 - degr * ano)
-
-        inj, auto = ger_kwh * 0.65, ger_kwh * 0.35
-        cons_rede = max(0.0, consumo_kwh_mes - auto)
-        cred = min(inj, cons_rede)
-        taxa_uso = (cons_rede - cred) * tar + (cred * fio_b * ((1 + inflacao) ** ano))
-        conta_mes = max(taxa_uso, taxa_min_kwh * tar)
-
-        pgto_fin = parcela if (m < meses) else 0.0
-        desembolso = conta_mes + pgto_fin
-        conta_nova.append(desembolso)
-
-        saldo_acum += (conta_full - desembolso)
-        saldo.append(saldo_acum)
-
-    total_sem = float(np.sum(conta_antiga))
-    total_com = float(np.sum(conta_nova)) + (0.0 if financiar else capex)
-
-    return (
-        qtd,
-        pot_wp,
-        float(capex),
-        float(parcela),
-        conta_antiga,
-        conta_nova,
-        saldo,
-        total_sem,
-        total_com,
-    )
\ No newline at end of file
+            pass
+    return 0.0, 0
+
+
+def potencia_necessaria_wp(consumo_kwh_mes, irr_mensal, temp_mensal):
+    """Potência de pico (Wp) que cobre o consumo médio, antes do arredondamento em módulos."""
+    irr, temp = _clima_mensal(irr_mensal, temp_mensal)
+    PR = _pr_termico(float(temp.sum()) / 12.0)
+    return float(consumo_kwh_mes) * 1000.0 / (float(irr.sum()) / 12.0 * 30.0 * PR)
+
+
+_ESCALARES = (int, float, np.number)
+
+
+def _cotacao_unica(consumo, taxa_min, irr, temp, financiar, taxa_aa, meses, inflacao, degradacao, tarifas, fator):
+    """calcular_lote com um único cliente de parâmetros escalares, sem montar colunas (N,).
+
+    Mesmas etapas e mesmas operações de calcular_lote (a parcela Price pode
+    diferir no último bit); evita o custo fixo de _coluna/_matriz_mensal/
+    _projetar, que triplicava o tempo da cotação interativa.
+    """
+    consumo = float(consumo)
+    with perf.span("engineering.dimensionamento"):
+        PR, qtd, pot_wp, inv_w = _dimensionar_escalar(consumo, irr, temp)
+        capex = float(_capex(qtd, inv_w))
+        if not financiar:
+            meses = 0
+        parcela = parcela_price_escalar(capex, taxa_aa, meses) if financiar else 0.0
+        capex_vista = 0.0 if financiar else capex
+
+    if tarifas is not None:
+        tar, fio_b = (np.asarray(v, dtype=float) for v in tarifas)
+    else:
+        tar, fio_b = _tarifas_padrao(float(config.INFLACAO_ENERGETICA_AA if inflacao is None else inflacao))
+    degradacao = float(config.DEGRADACAO_ANUAL if degradacao is None else degradacao)
+
+    with perf.span("engineering.simulacao"):
+        ger_kwh = _geracao_mensal(pot_wp, irr, PR, degradacao)
+        if fator is not None:
+            ger_kwh *= float(fator)
+        conta_antiga, conta_nova, saldo = _simular_fluxo(
+            consumo, float(taxa_min), ger_kwh, tar, fio_b, parcela, meses, -capex_vista,
+            out=(np.empty(MESES_SIMULACAO), np.empty(MESES_SIMULACAO), np.empty(MESES_SIMULACAO)),
+        )
+
+    return ResultadoCotacao(qtd, pot_wp, float(inv_w), capex, parcela, conta_antiga, conta_nova, saldo,
+                            float(conta_antiga.sum()), float(conta_nova.sum()) + capex_vista, capex_vista)
+
+
+def calcular_tudo(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, financiar=False, fin_dados=None, inflacao_override=None, degradacao_override=None,
+                 tarifas=None, fator_geracao=None):
+    """
+    Dimensiona o sistema, estima custos e simula fluxo de caixa em 25 anos (300 meses).
+
+    Retorna ResultadoCotacao, desempacotável como
+        (qtd_modulos, potencia_wp, capex, parcela_mensal, conta_antiga[], conta_nova[], saldo[], total_sem, total_com)
+
+    As séries mensais são np.ndarray de 300 posições. Equivale a
+    calcular_lote com um único cliente; `tarifas` = (tarifa, fio_b) mês a mês
+    da distribuidora (tarifas.TabelaTarifas.vetores) substitui a tarifa de config
+    e `fator_geracao` escala a geração (nível de excedência, ex.: P90).
+    """
+    irr, temp = _clima_mensal(irr_mensal, temp_mensal)
+    taxa_aa, meses = _dados_financiamento(financiar, fin_dados)
+
+    escalares = (consumo_kwh_mes, taxa_min_kwh, inflacao_override, degradacao_override, fator_geracao)
+    if all(v is None or isinstance(v, _ESCALARES) for v in escalares) and (tarifas is None or np.ndim(tarifas[0]) == 1):
+        return _cotacao_unica(consumo_kwh_mes, taxa_min_kwh, irr, temp, bool(financiar), taxa_aa, meses,
+                              inflacao_override, degradacao_override, tarifas, fator_geracao)
+
+    r = calcular_lote(
+        consumo_kwh_mes, taxa_min_kwh, irr, temp, bool(financiar), taxa_aa, meses,
+        inflacao=inflacao_override, degradacao=degradacao_override, tarifas=tarifas, fator_geracao=fator_geracao,
+    )
+
+    return ResultadoCotacao.do_lote(r, 0, financiado=bool(financiar))
@@ -0,0 +1,132 @@
+"""Níveis de excedência (P50/P75/P90) da geração a partir de séries mensais plurianuais.
+
+A climatologia da NASA dá uma média por mês; propostas financiadas pedem
+também a geração superada em 75% ou 90% dos anos. Com a série mensal da
+NASA POWER (geodata.get_serie_mensal, 20+ anos de irradiação e
+temperatura), a geração específica (kWh/kWp) é calculada ano a ano com o
+mesmo modelo de engineering (mês de 30 dias, PR com perda térmica pela
+temperatura média do ano) e o nível Pxx é a geração anual superada em xx%
+dos anos completos. Tudo é vetorizado sobre (..., anos, 12): várias células
+são tratadas de uma vez.
+
+O nível entra na simulação como `fator_geracao` de calcular_lote/calcular_tudo:
+o sistema continua dimensionado pela média e só a geração é escalada.
+"""
+import logging
+from statistics import NormalDist
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+from .engineering import _pr_termico, _to_month_array, calcular_lote
+
+logger = logging.getLogger(__name__)
+
+NIVEIS_PADRAO = (50, 75, 90)
+METODOS = ("empirico", "normal")
+DIAS_MES = 30.0      # mesmo mês comercial de engineering._geracao_mensal
+ANOS_MINIMOS = 10    # com menos anos completos os percentis são pouco confiáveis (só avisa)
+
+
+class SerieMensal(NamedTuple):
+    """Série mensal plurianual de uma célula.
+
+    anos: (A,); irr (kWh/m²/dia) e temp (°C): (A, 12), NaN nos meses ausentes.
+    """
+    anos: np.ndarray
+    irr: np.ndarray
+    temp: np.ndarray
+
+
+class NiveisExcedencia(NamedTuple):
+    """Resultado de niveis_excedencia; `...` são as dimensões extras da entrada.
+
+    fator: (..., L) geração anual no nível / geração anual média.
+    geracao_anual: (..., L) kWh/kWp por ano no nível.
+    geracao_mensal: (..., L, 12) kWh/kWp por mês (perfil médio escalado pelo fator).
+    irr_mensal, temp_mensal: (..., 12) médias dos anos completos (dimensionamento).
+    anos_validos: (...,) anos completos usados.
+    """
+    niveis: Tuple[float, ...]
+    fator: np.ndarray
+    geracao_anual: np.ndarray
+    geracao_mensal: np.ndarray
+    irr_mensal: np.ndarray
+    temp_mensal: np.ndarray
+    anos_validos: np.ndarray
+
+
+def geracao_especifica(irr, temp):
+    """Geração (kWh/kWp) mês a mês (..., A, 12), com o PR pela temperatura média de cada ano.
+
+    Anos com algum mês ausente (NaN) ficam NaN.
+    """
+    irr = np.asarray(irr, dtype=float)
+    temp = np.asarray(temp, dtype=float)
+    PR = _pr_termico(temp.mean(axis=-1, keepdims=True))
+    return irr * DIAS_MES * PR
+
+
+def niveis_excedencia(irr, temp, niveis=NIVEIS_PADRAO, metodo="empirico"):
+    """P50/P75/P90 (ou `niveis` quaisquer em (0, 100)) da geração anual.
+
+    irr e temp: (..., A, 12), como SerieMensal.irr/temp. `metodo`:
+    "empirico" usa os percentis dos anos observados; "normal" assume
+    geração anual normal (média - z·desvio), prática comum em bancos.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"metodo deve ser um de {METODOS}")
+    niveis = tuple(float(p) for p in niveis)
+    if not all(0.0 < p < 100.0 for p in niveis):
+        raise ValueError("niveis devem estar entre 0 e 100 (exclusivo)")
+
+    irr = np.asarray(irr, dtype=float)
+    temp = np.asarray(temp, dtype=float)
+    ger = geracao_especifica(irr, temp)                 # (..., A, 12)
+    anual = ger.sum(axis=-1)                            # (..., A); NaN nos anos incompletos
+    valido = np.isfinite(anual)
+    n_validos = valido.sum(axis=-1)
+    if np.any(n_validos < 2):
+        raise ValueError("a série precisa de pelo menos 2 anos completos")
+    if np.any(n_validos < ANOS_MINIMOS):
+        logger.warning("Série com apenas %d anos completos; percentis pouco confiáveis", int(n_validos.min()))
+
+    def media_mensal(m):
+        return np.where(valido[..., None], m, 0.0).sum(axis=-2) / n_validos[..., None]
+
+    ger_media = media_mensal(ger)                       # (..., 12)
+    media_anual = ger_media.sum(axis=-1)                # (...,)
+
+    if metodo == "empirico":
+        # Pxx é superado em xx% dos anos: quantil (100 - xx)%
+        q = np.array([(100.0 - p) / 100.0 for p in niveis])
+        anual_nivel = np.moveaxis(np.nanquantile(anual, q, axis=-1), 0, -1)
+    else:
+        z = np.array([NormalDist().inv_cdf(p / 100.0) for p in niveis])
+        desvio = np.sqrt(np.where(valido, (anual - media_anual[..., None]) ** 2, 0.0).sum(axis=-1) / (n_validos - 1))
+        anual_nivel = media_anual[..., None] - z * desvio[..., None]
+
+    fator = anual_nivel / media_anual[..., None]
+    return NiveisExcedencia(
+        niveis, fator, anual_nivel, ger_media[..., None, :] * fator[..., None],
+        media_mensal(irr), media_mensal(temp), n_validos,
+    )
+
+
+def simular_niveis(consumo_kwh_mes, taxa_min_kwh, serie, niveis=NIVEIS_PADRAO, metodo="empirico", clima=None,
+                   **kwargs_lote):
+    """Simula uma proposta em cada nível de excedência da `serie` (SerieMensal).
+
+    O dimensionamento usa `clima` = (irr, temp) mensais (ex.: a climatologia
+    de geodata.get_data) ou, sem ele, a média dos anos completos da série;
+    cada linha do ResultadoLote (L, 300) é a mesma instalação com a geração
+    do nível correspondente. `kwargs_lote` vão para calcular_lote (financiar,
+    taxa_aa, meses, inflacao, degradacao, tarifas).
+
+    Retorna (NiveisExcedencia, ResultadoLote).
+    """
+    n = niveis_excedencia(serie.irr, serie.temp, niveis, metodo)
+    irr, temp = (n.irr_mensal, n.temp_mensal) if clima is None else (_to_month_array(c) for c in clima)
+    r = calcular_lote(np.full(len(n.niveis), float(consumo_kwh_mes)), taxa_min_kwh, irr, temp,
+                      fator_geracao=n.fator, **kwargs_lote)
+    return n, r
@@ -0,0 +1,293 @@
+"""Exportação colunar dos resultados de simulação.
+
+Um conjunto de resultados é um diretório com um arquivo binário cru por
+coluna (`<coluna>.bin`, C-contíguo) e `meta.json` com o dtype e o número de
+linhas. `GravadorResultados` acrescenta blocos de calcular_lote em disco à
+medida que ficam prontos (nada é retido em memória) e `ResultadosColunares`
+lê as colunas com np.memmap: escalares (N,) e séries (N, 300) são paginadas
+sob demanda, então filtrar 100 mil clientes e ler o saldo de alguns só toca
+as linhas usadas.
+
+A partir do diretório, `exportar_npz` grava um .npz compactado em streaming
+e `exportar_parquet`/`exportar_arrow` gravam Parquet ou Arrow IPC (quando o
+pyarrow está instalado), bloco a bloco.
+"""
+import json
+import logging
+import os
+import shutil
+import zipfile
+
+import numpy as np
+
+from .engineering import MESES_SIMULACAO, ResultadoCotacao, calcular_payback
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_META = "meta.json"
+_CONVERSOES = ("resultados.npz", "resultados.parquet", "resultados.arrow")   # gravadas pelo CLI no diretório
+SERIES = ("conta_antiga", "conta_nova", "saldo")
+ESCALARES = {
+    "linha": np.int64, "qtd": np.int64, "pot_wp": np.float64, "inv_w": np.float64, "capex": np.float64,
+    "parcela": np.float64, "total_sem": np.float64, "total_com": np.float64, "payback": np.float64,
+}
+LINHAS_POR_BLOCO = 8192   # linhas lidas por vez nas conversões (limita a memória)
+
+
+def _colunas(resultado):
+    """dict coluna -> array de um ResultadoLote, ResultadoCotacao ou tupla de 9 itens de calcular_tudo."""
+    if hasattr(resultado, "_asdict"):
+        colunas = {k: np.atleast_1d(np.asarray(v)) for k, v in resultado._asdict().items()}
+    elif isinstance(resultado, ResultadoCotacao):
+        colunas = {k: np.atleast_1d(np.asarray(getattr(resultado, k)))
+                   for k in (*ResultadoCotacao.CAMPOS_TUPLA, "inv_w")}
+    else:
+        qtd, pot, capex, parcela, antiga, nova, saldo, total_sem, total_com = resultado
+        colunas = {"qtd": qtd, "pot_wp": pot, "inv_w": np.nan, "capex": capex, "parcela": parcela,
+                   "conta_antiga": antiga, "conta_nova": nova, "saldo": saldo,
+                   "total_sem": total_sem, "total_com": total_com}
+        colunas = {k: np.atleast_1d(np.asarray(v)) for k, v in colunas.items()}
+    for nome in SERIES:
+        colunas[nome] = colunas[nome].reshape(-1, MESES_SIMULACAO)
+    colunas["payback"] = np.atleast_1d(calcular_payback(colunas["saldo"]))
+    return colunas
+
+
+def _exportacao_anterior(diretorio):
+    """True se `diretorio` está vazio ou só contém uma exportação anterior (meta.json, *.bin e conversões)."""
+    nomes = os.listdir(diretorio)
+    if not nomes:
+        return True
+    return ARQUIVO_META in nomes and all(
+        nome == ARQUIVO_META or nome.endswith(".bin") or nome in _CONVERSOES for nome in nomes)
+
+
+def _verificar_destino(diretorio):
+    """FileExistsError se `diretorio` existe e não é vazio nem uma exportação anterior."""
+    if os.path.lexists(diretorio) and (not os.path.isdir(diretorio) or os.path.islink(diretorio)
+                                       or not _exportacao_anterior(diretorio)):
+        raise FileExistsError(f"{diretorio} existe e não é uma exportação de resultados; escolha outro diretório")
+
+
+def _liberar_destino(diretorio):
+    """Remove `diretorio` se for vazio ou uma exportação anterior; qualquer outro conteúdo é preservado."""
+    _verificar_destino(diretorio)
+    if os.path.lexists(diretorio):
+        shutil.rmtree(diretorio)
+
+
+class GravadorResultados:
+    """Acrescenta blocos de resultados a um diretório colunar.
+
+    `dtype_series` (padrão float64) define o tipo das séries mensais;
+    float32 reduz o arquivo à metade. Os blocos vão para `<diretorio>.tmp`,
+    que só substitui `diretorio` em fechar() (descartar(), ou uma exceção no
+    bloco `with`, apaga o temporário e mantém `diretorio`); um existente só é
+    substituído se estiver vazio ou contiver uma exportação anterior
+    (senão FileExistsError, antes de gravar qualquer coisa).
+    """
+
+    def __init__(self, diretorio, dtype_series=np.float64):
+        diretorio = os.path.abspath(diretorio)
+        _verificar_destino(diretorio)
+        self.diretorio = diretorio
+        self.dtype_series = np.dtype(dtype_series)
+        self.n_linhas = 0
+        self._temporario = diretorio + ".tmp"
+        _liberar_destino(self._temporario)
+        os.makedirs(self._temporario)
+        self._arquivos = {nome: open(os.path.join(self._temporario, nome + ".bin"), "wb")
+                          for nome in (*ESCALARES, *SERIES)}
+        self._gravar_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_exc, *exc):
+        if tipo_exc is None:
+            self.fechar()
+        else:
+            self.descartar()
+
+    def _dtype(self, nome):
+        return self.dtype_series if nome in SERIES else np.dtype(ESCALARES[nome])
+
+    def _gravar_meta(self):
+        meta = {"n_linhas": self.n_linhas, "meses": MESES_SIMULACAO,
+                "colunas": {nome: self._dtype(nome).str for nome in (*ESCALARES, *SERIES)},
+                "series": list(SERIES)}
+        caminho = os.path.join(self._temporario, ARQUIVO_META)
+        with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(caminho + ".tmp", caminho)
+
+    def acrescentar(self, resultado, linhas=None):
+        """Grava um ResultadoLote (ou o resultado de calcular_tudo); `linhas` identifica cada cliente.
+
+        Sem `linhas`, a numeração continua a partir do último bloco gravado.
+        """
+        colunas = _colunas(resultado)
+        n = colunas["qtd"].shape[0]
+        colunas["linha"] = (np.arange(self.n_linhas, self.n_linhas + n) if linhas is None
+                            else np.asarray(linhas).reshape(n))
+        for nome, arquivo in self._arquivos.items():
+            valores = np.broadcast_to(colunas[nome], (n, MESES_SIMULACAO) if nome in SERIES else (n,))
+            arquivo.write(np.ascontiguousarray(valores, dtype=self._dtype(nome)).tobytes())
+        self.n_linhas += n
+        for arquivo in self._arquivos.values():
+            arquivo.flush()
+        self._gravar_meta()
+        return n
+
+    def fechar(self):
+        """Fecha os arquivos e move `<diretorio>.tmp` para `diretorio`."""
+        if self._arquivos is None:
+            return
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        self._arquivos = None
+        self._gravar_meta()
+        _liberar_destino(self.diretorio)
+        os.replace(self._temporario, self.diretorio)
+
+    def descartar(self):
+        """Fecha os arquivos e apaga `<diretorio>.tmp`, sem tocar em `diretorio` (exportação interrompida)."""
+        if self._arquivos is None:
+            return
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        self._arquivos = None
+        shutil.rmtree(self._temporario, ignore_errors=True)
+
+
+class ResultadosColunares:
+    """Leitura mapeada em memória de um diretório gravado por GravadorResultados."""
+
+    def __init__(self, diretorio):
+        with open(os.path.join(diretorio, ARQUIVO_META), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.diretorio = diretorio
+        self.n_linhas = int(meta["n_linhas"])
+        self.meses = int(meta["meses"])
+        self.dtypes = {nome: np.dtype(d) for nome, d in meta["colunas"].items()}
+        self._mapas = {}
+
+    def __len__(self):
+        return self.n_linhas
+
+    @property
+    def colunas(self):
+        return tuple(self.dtypes)
+
+    def __getitem__(self, nome):
+        """Coluna `nome` como np.memmap somente leitura: (N,) ou (N, meses) para as séries."""
+        mapa = self._mapas.get(nome)
+        if mapa is None:
+            forma = (self.n_linhas, self.meses) if nome in SERIES else (self.n_linhas,)
+            if self.n_linhas == 0:
+                return np.empty(forma, dtype=self.dtypes[nome])
+            mapa = self._mapas[nome] = np.memmap(os.path.join(self.diretorio, nome + ".bin"),
+                                                 dtype=self.dtypes[nome], mode="r", shape=forma)
+        return mapa
+
+    def selecionar(self, indices, colunas=None):
+        """dict coluna -> array só com as linhas `indices` (máscara booleana ou posições)."""
+        indices = np.flatnonzero(indices) if np.asarray(indices).dtype == bool else np.asarray(indices)
+        return {nome: np.asarray(self[nome][indices]) for nome in (colunas or self.colunas)}
+
+    def ler(self, nome, ini, fim):
+        """Linhas [ini, fim) da coluna lidas do arquivo (sem mapear: não deixam páginas residentes)."""
+        fim = min(fim, self.n_linhas)
+        largura = self.meses if nome in SERIES else 1
+        dtype = self.dtypes[nome]
+        valores = np.fromfile(os.path.join(self.diretorio, nome + ".bin"), dtype=dtype,
+                              count=max(0, fim - ini) * largura, offset=ini * largura * dtype.itemsize)
+        return valores.reshape(-1, self.meses) if nome in SERIES else valores
+
+    def blocos(self, tamanho=LINHAS_POR_BLOCO, colunas=None):
+        """Itera dicts coluna -> array em blocos de `tamanho` linhas."""
+        for ini in range(0, self.n_linhas, tamanho):
+            yield {nome: self.ler(nome, ini, ini + tamanho) for nome in (colunas or self.colunas)}
+
+
+def salvar_npz(caminho, resultado):
+    """Grava um resultado em memória (ResultadoLote, ResultadoCotacao ou tupla) em .npz compactado."""
+    np.savez_compressed(caminho, **_colunas(resultado))
+    return caminho
+
+
+def exportar_npz(diretorio, caminho, tamanho=LINHAS_POR_BLOCO, nivel=1):
+    """Converte o diretório em .npz compactado (deflate `nivel`), uma coluna por vez e em blocos.
+
+    O arquivo é um .npz comum (np.load); só o diretório permite leitura mapeada.
+    """
+    dados = ResultadosColunares(diretorio)
+    with zipfile.ZipFile(caminho, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=nivel, allowZip64=True) as z:
+        for nome in dados.colunas:
+            forma = (len(dados), dados.meses) if nome in SERIES else (len(dados),)
+            with z.open(nome + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array_header_2_0(
+                    f, {"descr": np.lib.format.dtype_to_descr(dados.dtypes[nome]), "fortran_order": False,
+                        "shape": forma})
+                for ini in range(0, len(dados), tamanho):
+                    f.write(dados.ler(nome, ini, ini + tamanho).tobytes())
+    logger.info("Resultados %s -> %s (%d linhas)", diretorio, caminho, len(dados))
+    return caminho
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Exportação Arrow/Parquet requer o pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _tabela_arrow(pa, bloco, meses):
+    """Bloco como pyarrow.Table: escalares como colunas e séries como listas de tamanho fixo."""
+    campos = {}
+    for nome, valores in bloco.items():
+        if valores.ndim == 2:
+            campos[nome] = pa.FixedSizeListArray.from_arrays(pa.array(valores.reshape(-1)), meses)
+        else:
+            campos[nome] = pa.array(valores)
+    return pa.table(campos)
+
+
+def exportar_parquet(diretorio, caminho, tamanho=LINHAS_POR_BLOCO, compressao="zstd"):
+    """Converte o diretório em Parquet, um row group por bloco de `tamanho` linhas."""
+    pa = _pyarrow()
+    import pyarrow.parquet as pq
+
+    dados = ResultadosColunares(diretorio)
+    escritor = None
+    try:
+        for bloco in dados.blocos(tamanho):
+            tabela = _tabela_arrow(pa, bloco, dados.meses)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema, compression=compressao)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return caminho
+
+
+def exportar_arrow(diretorio, caminho, tamanho=LINHAS_POR_BLOCO):
+    """Converte o diretório em Arrow IPC (Feather v2), legível com pyarrow.memory_map sem cópia."""
+    pa = _pyarrow()
+    dados = ResultadosColunares(diretorio)
+    escritor = None
+    try:
+        for bloco in dados.blocos(tamanho):
+            tabela = _tabela_arrow(pa, bloco, dados.meses)
+            if escritor is None:
+                escritor = pa.ipc.new_file(caminho, tabela.schema)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return caminho
+
+
+FORMATOS = {"npz": exportar_npz, "parquet": exportar_parquet, "arrow": exportar_arrow}
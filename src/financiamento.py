@@ -0,0 +1,266 @@
+"""Motor de financiamento vetorizado (NumPy).
+
+Cronogramas completos Price e SAC, com carência, calculados por fórmulas
+fechadas sobre grades inteiras de valor x taxa x prazo; VPL, TIR (Newton em
+lote com bisseção de reserva) e payback descontado sobre matrizes de fluxo
+de caixa mensal (..., meses).
+
+Convenções: taxas de financiamento em % a.a. (como `finance.calcular_custos`
+e a CLI); taxas de desconto em fração a.a. (como config.TAXA_DESCONTO_AA).
+Fluxos mensais ocorrem nos meses 1..T e o investimento, no mês 0.
+`finance.py` continua sendo a API escalar sem dependências.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+
+SISTEMAS = ("price", "sac")
+TAMANHO_BLOCO_OFERTAS = 256   # propostas por bloco em avaliar_ofertas
+_TIR_MIN_MENSAL = -0.5        # intervalo de busca da bisseção (taxa mensal)
+_TIR_MAX_MENSAL = 1.0
+
+
+class Cronograma(NamedTuple):
+    """Cronograma mês a mês (..., horizonte); saldo_devedor é o saldo ao fim de cada mês."""
+    parcela: np.ndarray
+    juros: np.ndarray
+    amortizacao: np.ndarray
+    saldo_devedor: np.ndarray
+
+
+class ResultadoOfertas(NamedTuple):
+    """Resultado de avaliar_ofertas: matrizes (propostas, taxas, prazos)."""
+    parcela_inicial: np.ndarray
+    total_pago: np.ndarray
+    vpl: np.ndarray
+    payback_descontado: np.ndarray
+
+
+def taxa_mensal(taxa_aa):
+    """Taxa efetiva mensal (fração) a partir da taxa anual em %."""
+    return (1.0 + np.asarray(taxa_aa, dtype=float) / 100.0) ** (1.0 / 12.0) - 1.0
+
+
+def parcela_price(valor, taxa_aa, meses):
+    """Parcela Price vetorizada (taxa em % a.a.). Prazo <= 0 resulta em 0; taxa 0, em valor/meses."""
+    i = taxa_mensal(taxa_aa)
+    meses = np.asarray(meses)
+    fator = (1.0 + i) ** meses
+    den = fator - 1.0
+    valido = meses > 0
+    parcela = np.zeros(np.broadcast(valor, den).shape)
+    np.divide(valor * i * fator, den, out=parcela, where=valido & (den != 0))
+    np.divide(valor, meses, out=parcela, where=valido & (den == 0))
+    return parcela
+
+
+def parcela_price_escalar(valor, taxa_aa, meses):
+    """parcela_price para um único financiamento em floats do Python.
+
+    Mesmas operações; o pow da libm pode diferir do ufunc vetorizado no último bit.
+    """
+    if meses <= 0:
+        return 0.0
+    i = (1.0 + taxa_aa / 100.0) ** (1.0 / 12.0) - 1.0
+    fator = (1.0 + i) ** meses
+    den = fator - 1.0
+    return valor * i * fator / den if den != 0 else valor / meses
+
+
+def cronograma(valor, taxa_aa, meses, sistema="price", carencia=0, pagar_juros_carencia=False, horizonte=None):
+    """Cronograma completo de amortização, vetorizado sobre os parâmetros.
+
+    valor, taxa_aa (% a.a.), meses e carencia são escalares ou arrays
+    compatíveis por broadcasting (ex.: grade_financiamento). Na carência não
+    há amortização: os juros são capitalizados ou, com
+    `pagar_juros_carencia`, pagos mês a mês. Depois, `meses` parcelas Price
+    (constantes) ou SAC (amortização constante) sobre o saldo da carência.
+
+    Retorna Cronograma com arrays (broadcast dos parâmetros) + (horizonte,);
+    o horizonte padrão é o maior carencia + meses.
+    """
+    if sistema not in SISTEMAS:
+        raise ValueError(f"sistema deve ser um de {SISTEMAS}")
+    valor = np.asarray(valor, dtype=float)
+    i = taxa_mensal(taxa_aa)
+    n = np.asarray(meses, dtype=np.int64)
+    c = np.asarray(carencia, dtype=np.int64)
+    forma = np.broadcast_shapes(valor.shape, i.shape, n.shape, c.shape)
+    valido = n > 0
+    c = np.where(valido, c, 0)
+    if horizonte is None:
+        horizonte = int(np.max(np.broadcast_to(c + np.where(valido, n, 0), forma), initial=0))
+    k = np.arange(1, int(horizonte) + 1)
+
+    V, iv, nv, cv, okv = (np.asarray(x)[..., None] for x in (valor, i, n, c, valido))
+    cresc = 1.0 + iv
+    saldo_carencia = V if pagar_juros_carencia else V * cresc ** cv
+    m = k - cv   # mês da fase de amortização
+    em_carencia = k <= cv
+    em_amortizacao = (m >= 1) & (m <= nv)
+
+    # Saldo devedor ao fim de cada mês (fórmulas fechadas)
+    if sistema == "price":
+        f_n = cresc ** nv
+        f_m = cresc ** np.clip(m, 0, None)
+        den = f_n - 1.0
+        frac = np.empty(np.broadcast_shapes(den.shape, m.shape))
+        np.divide(f_n - f_m, den, out=frac, where=np.broadcast_to(den != 0, frac.shape))
+        np.subtract(1.0, m / np.maximum(nv, 1), out=frac, where=np.broadcast_to(den == 0, frac.shape))
+    else:
+        frac = 1.0 - m / np.maximum(nv, 1)
+    saldo_carencia_k = V if pagar_juros_carencia else V * cresc ** k
+    saldo = np.where(em_carencia, saldo_carencia_k, np.where(em_amortizacao, saldo_carencia * frac, 0.0))
+    saldo = np.where(okv, saldo, 0.0)
+
+    saldo_ant = np.empty_like(saldo)
+    saldo_ant[..., :1] = np.where(okv, V, 0.0)
+    saldo_ant[..., 1:] = saldo[..., :-1]
+    juros = iv * saldo_ant
+
+    if sistema == "price":
+        pmt = parcela_price(saldo_carencia, np.asarray(taxa_aa, dtype=float)[..., None], nv)
+        parcela_amort = np.broadcast_to(pmt, juros.shape)
+    else:
+        parcela_amort = saldo_carencia / np.maximum(nv, 1) + juros
+    parcela_carencia = juros if pagar_juros_carencia else 0.0
+    parcela = np.where(em_carencia, parcela_carencia, np.where(em_amortizacao, parcela_amort, 0.0))
+    parcela = np.where(okv, parcela, 0.0)
+    return Cronograma(parcela, juros, parcela - juros, saldo)
+
+
+def grade_financiamento(valores, taxas_aa, prazos, sistema="price", carencia=0, pagar_juros_carencia=False,
+                        horizonte=None):
+    """Cronogramas para todas as combinações valor x taxa x prazo: arrays (V, T, P, horizonte)."""
+    valores = np.asarray(valores, dtype=float).reshape(-1, 1, 1)
+    taxas_aa = np.asarray(taxas_aa, dtype=float).reshape(1, -1, 1)
+    prazos = np.asarray(prazos, dtype=np.int64).reshape(1, 1, -1)
+    return cronograma(valores, taxas_aa, prazos, sistema, carencia, pagar_juros_carencia, horizonte)
+
+
+def fatores_desconto(taxa_desconto_aa, n_meses):
+    """Fatores 1/(1+i)^t para t = 1..n_meses; taxa em fração a.a. (escalar ou array -> (..., n_meses))."""
+    i = (1.0 + np.asarray(taxa_desconto_aa, dtype=float)) ** (1.0 / 12.0) - 1.0
+    return np.exp(-np.log1p(i)[..., None] * np.arange(1, n_meses + 1))
+
+
+def vpl(fluxos, taxa_desconto_aa=None, investimento=0.0):
+    """VPL de fluxos mensais (..., T) descontados à taxa anual (fração), menos o investimento no mês 0."""
+    fluxos = np.asarray(fluxos, dtype=float)
+    taxa = config.TAXA_DESCONTO_AA if taxa_desconto_aa is None else taxa_desconto_aa
+    d = fatores_desconto(taxa, fluxos.shape[-1])
+    valor = fluxos @ d if d.ndim == 1 else np.einsum("...t,...t->...", fluxos, d)
+    return valor - investimento
+
+
+def mes_de_retorno(acumulado):
+    """Mês (1..T) a partir do qual o acumulado (..., T) fica não negativo.
+
+    Retorna 0 quando nunca é negativo e NaN quando não há retorno no horizonte.
+    """
+    negativo = np.asarray(acumulado) < 0
+    n_meses = negativo.shape[-1]
+    # Índice (0..T-1) do último mês negativo; o retorno ocorre no mês seguinte (1-based: índice + 2)
+    ultimo_neg = n_meses - 1 - np.argmax(negativo[..., ::-1], axis=-1)
+    retorno = np.where(negativo.any(axis=-1), ultimo_neg + 2.0, 0.0)
+    return np.where(negativo[..., -1], np.nan, retorno)
+
+
+def payback_descontado(fluxos, taxa_desconto_aa=None, investimento=0.0):
+    """Payback descontado (meses) de fluxos mensais (..., T); NaN se não retorna no horizonte."""
+    fluxos = np.asarray(fluxos, dtype=float)
+    taxa = config.TAXA_DESCONTO_AA if taxa_desconto_aa is None else taxa_desconto_aa
+    acumulado = np.cumsum(fluxos * fatores_desconto(taxa, fluxos.shape[-1]), axis=-1)
+    acumulado -= np.asarray(investimento, dtype=float)[..., None]
+    return mes_de_retorno(acumulado)
+
+
+def _vpl_mensal(fluxos, investimento, r, t):
+    """VPL e derivada para taxas mensais r (...,)."""
+    v = np.exp(-np.log1p(r)[..., None] * t)
+    fv = fluxos * v
+    return fv.sum(axis=-1) - investimento, -(fv @ t) / (1.0 + r)
+
+
+def tir(fluxos, investimento=0.0, anual=True, tol=1e-10, max_iter=50, iter_bissecao=100):
+    """TIR de fluxos mensais (..., T) com investimento no mês 0.
+
+    Newton em lote a partir de 1% a.m.; elementos que não convergem caem na
+    bisseção em [-50%, 100%] a.m. Sem troca de sinal no intervalo, NaN.
+    Retorna a taxa anual efetiva (fração) ou, com anual=False, a mensal.
+    """
+    fluxos = np.asarray(fluxos, dtype=float)
+    forma = fluxos.shape[:-1]
+    investimento = np.broadcast_to(np.asarray(investimento, dtype=float), forma)
+    t = np.arange(1, fluxos.shape[-1] + 1, dtype=float)
+
+    r = np.full(forma, 0.01)
+    convergiu = np.zeros(forma, dtype=bool)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(max_iter):
+            valor, deriv = _vpl_mensal(fluxos, investimento, r, t)
+            passo = np.where(deriv != 0, valor / deriv, np.nan)
+            r_novo = r - passo
+            ok = np.isfinite(r_novo) & (r_novo > _TIR_MIN_MENSAL) & (r_novo < _TIR_MAX_MENSAL)
+            convergiu = ok & (np.abs(passo) < tol)
+            r = np.where(ok, r_novo, r)
+            if convergiu.all():
+                break
+
+        # Reserva: bisseção nos elementos que o Newton não resolveu
+        falhou = ~convergiu
+        if falhou.any():
+            f_sel, inv_sel = fluxos[falhou], investimento[falhou]
+            lo = np.full(inv_sel.shape, _TIR_MIN_MENSAL)
+            hi = np.full(inv_sel.shape, _TIR_MAX_MENSAL)
+            v_lo = _vpl_mensal(f_sel, inv_sel, lo, t)[0]
+            v_hi = _vpl_mensal(f_sel, inv_sel, hi, t)[0]
+            troca = np.sign(v_lo) != np.sign(v_hi)
+            for _ in range(iter_bissecao):
+                meio = 0.5 * (lo + hi)
+                v_meio = _vpl_mensal(f_sel, inv_sel, meio, t)[0]
+                mesmo_lado = np.sign(v_meio) == np.sign(v_lo)
+                lo = np.where(mesmo_lado, meio, lo)
+                v_lo = np.where(mesmo_lado, v_meio, v_lo)
+                hi = np.where(mesmo_lado, hi, meio)
+            r[falhou] = np.where(troca, 0.5 * (lo + hi), np.nan)
+
+    return (1.0 + r) ** 12 - 1.0 if anual else r
+
+
+def avaliar_ofertas(economia, capex, taxas_aa, prazos, sistema="price", carencia=0, pagar_juros_carencia=False,
+                    taxa_desconto_aa=None, tamanho_bloco=TAMANHO_BLOCO_OFERTAS):
+    """Avalia todas as ofertas de crédito (taxa x prazo) para todas as propostas.
+
+    economia: (N, T) economia mensal sem financiamento (conta antiga - conta
+    nova); capex: (N,) valor financiado. Os fluxos do cliente são a economia
+    menos as parcelas de cada oferta (100% financiado). Processa `tamanho_bloco`
+    propostas por vez para limitar a matriz (bloco, taxas, prazos, T).
+
+    Retorna ResultadoOfertas com matrizes (N, len(taxas_aa), len(prazos)).
+    """
+    economia = np.atleast_2d(np.asarray(economia, dtype=float))
+    capex = np.asarray(capex, dtype=float).reshape(-1)
+    taxas_aa = np.asarray(taxas_aa, dtype=float).reshape(-1)
+    prazos = np.asarray(prazos, dtype=np.int64).reshape(-1)
+    n, n_meses = economia.shape
+    taxa = config.TAXA_DESCONTO_AA if taxa_desconto_aa is None else taxa_desconto_aa
+    d = fatores_desconto(taxa, n_meses)
+    horizonte = max(n_meses, int(np.max(prazos + np.max(carencia), initial=0)))
+
+    forma = (n, taxas_aa.size, prazos.size)
+    parcela_inicial, total_pago, vpl_ofertas, payback = (np.empty(forma) for _ in range(4))
+    bloco = max(1, int(tamanho_bloco))
+    for ini in range(0, n, bloco):
+        b = slice(ini, ini + bloco)
+        cr = grade_financiamento(capex[b], taxas_aa, prazos, sistema, carencia, pagar_juros_carencia, horizonte)
+        primeira = np.argmax(cr.parcela > 0, axis=-1)[..., None]
+        parcela_inicial[b] = np.take_along_axis(cr.parcela, primeira, axis=-1)[..., 0]
+        total_pago[b] = cr.parcela.sum(axis=-1)
+        fluxo = economia[b, None, None, :] - cr.parcela[..., :n_meses]
+        fluxo *= d
+        vpl_ofertas[b] = fluxo.sum(axis=-1)
+        payback[b] = mes_de_retorno(np.cumsum(fluxo, axis=-1, out=fluxo))
+    return ResultadoOfertas(parcela_inicial, total_pago, vpl_ofertas, payback)
@@ -0,0 +1,206 @@
+"""Geocodificador local de municípios brasileiros.
+
+Índice em memória montado a partir de uma tabela de municípios (nome, UF,
+latitude, longitude): nomes sem acento, em minúsculas e com espaços,
+hífens e apóstrofos uniformes, chaveados por "nome|uf" em um dict, mais
+uma lista ordenada para busca por prefixo e correspondência aproximada
+(difflib) para erros de digitação, restrita aos municípios da UF informada:
+sem UF, um município ausente da tabela cairia no nome parecido de outro
+("Palma" em Palmas/TO). Aceita o CSV de data/municipios.csv ou
+tabelas no formato IBGE (codigo_uf, latitude, longitude, capital).
+
+Só usa a biblioteca padrão: é consultado por geodata antes do Nominatim.
+"""
+import bisect
+import csv
+import difflib
+import logging
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+UFS = {
+    "AC": "acre", "AL": "alagoas", "AP": "amapa", "AM": "amazonas", "BA": "bahia", "CE": "ceara",
+    "DF": "distrito federal", "ES": "espirito santo", "GO": "goias", "MA": "maranhao", "MT": "mato grosso",
+    "MS": "mato grosso do sul", "MG": "minas gerais", "PA": "para", "PB": "paraiba", "PR": "parana",
+    "PE": "pernambuco", "PI": "piaui", "RJ": "rio de janeiro", "RN": "rio grande do norte",
+    "RS": "rio grande do sul", "RO": "rondonia", "RR": "roraima", "SC": "santa catarina", "SP": "sao paulo",
+    "SE": "sergipe", "TO": "tocantins",
+}
+# Códigos IBGE das UFs (coluna codigo_uf das tabelas oficiais)
+CODIGOS_UF = {
+    12: "AC", 27: "AL", 16: "AP", 13: "AM", 29: "BA", 23: "CE", 53: "DF", 32: "ES", 52: "GO", 21: "MA",
+    51: "MT", 50: "MS", 31: "MG", 15: "PA", 25: "PB", 41: "PR", 26: "PE", 22: "PI", 33: "RJ", 24: "RN",
+    43: "RS", 11: "RO", 14: "RR", 42: "SC", 35: "SP", 28: "SE", 17: "TO",
+}
+_UF_POR_NOME = {nome: sigla for sigla, nome in UFS.items()}
+_PAISES = {"brasil", "brazil", "br"}
+_TROCAS = str.maketrans({"-": " ", "'": " ", "’": " ", "`": " ", ".": " "})
+
+CORTE_APROXIMADO = 0.85   # similaridade mínima (difflib) para aceitar um nome com erro de digitação
+
+
+class Municipio(NamedTuple):
+    nome: str
+    uf: str
+    lat: float
+    lon: float
+
+
+def normalizar_nome(texto):
+    """Sem acentos, minúsculo, com hífens/apóstrofos como espaço e espaços simples."""
+    texto = str(texto)
+    if not texto.isascii():
+        texto = unicodedata.normalize("NFKD", texto)
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().translate(_TROCAS).split())
+
+
+@lru_cache(maxsize=1024)
+def _sufixo(parte):
+    """"BR" para o país, a sigla para uma UF ("CE", "ce", "Ceará"); None para o resto."""
+    p = normalizar_nome(parte)
+    if p in _PAISES:
+        return "BR"
+    if p.upper() in UFS:
+        return p.upper()
+    return _UF_POR_NOME.get(p)
+
+
+def _uf(parte):
+    """Sigla da UF ou None."""
+    uf = _sufixo(parte)
+    return None if uf == "BR" else uf
+
+
+def separar_consulta(consulta):
+    """("nome normalizado", "UF" ou None) de "Cidade, UF", "Cidade - UF", "Cidade/UF" ou "Cidade"."""
+    texto = str(consulta)
+    for sep in (" - ", "/"):
+        texto = texto.replace(sep, ",")
+    partes = [p for p in (p.strip() for p in texto.split(",")) if p]
+    while len(partes) > 1 and _sufixo(partes[-1]) == "BR":
+        partes.pop()
+    uf = None
+    if len(partes) > 1:
+        uf = _uf(partes[-1])
+        if uf is not None:
+            partes.pop()
+    return normalizar_nome(" ".join(partes)), uf
+
+
+def _campo(linha, *nomes):
+    for nome in nomes:
+        valor = linha.get(nome)
+        if valor not in (None, ""):
+            return valor.strip()
+    return None
+
+
+class IndiceMunicipios:
+    """Índice compacto de municípios: dict "nome|uf" -> posição e vetores de coordenadas."""
+
+    def __init__(self, municipios, prioridade=None):
+        self.nomes = []
+        self.ufs = []
+        self.lat = array("d")
+        self.lon = array("d")
+        self._chaves = {}        # "nome|uf" -> posição
+        self._homonimos = {}     # nome -> posições (ordenadas pela prioridade)
+        prioridade = prioridade or {}
+        for k, m in enumerate(municipios):
+            nome = normalizar_nome(m.nome)
+            self.nomes.append(m.nome)
+            self.ufs.append(m.uf)
+            self.lat.append(float(m.lat))
+            self.lon.append(float(m.lon))
+            self._chaves.setdefault(f"{nome}|{m.uf}", k)
+            self._homonimos.setdefault(nome, []).append(k)
+        for nome, posicoes in self._homonimos.items():
+            posicoes.sort(key=lambda k: -prioridade.get(k, 0))
+            self._homonimos[nome] = tuple(posicoes)
+        self._ordenados = sorted(self._homonimos)
+        self._por_uf = None
+
+    def __len__(self):
+        return len(self.nomes)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê o CSV (nome, uf|codigo_uf, lat|latitude, lon|longitude[, capital][, populacao])."""
+        municipios, prioridade = [], {}
+        with open(caminho, encoding="utf-8-sig", newline="") as f:
+            for linha in csv.DictReader(f):
+                uf = _campo(linha, "uf", "UF", "sigla_uf")
+                if uf is None:
+                    codigo = _campo(linha, "codigo_uf")
+                    uf = CODIGOS_UF.get(int(codigo)) if codigo else None
+                nome = _campo(linha, "nome", "municipio")
+                lat = _campo(linha, "lat", "latitude")
+                lon = _campo(linha, "lon", "longitude")
+                if not (nome and uf and lat and lon):
+                    continue
+                k = len(municipios)
+                municipios.append(Municipio(nome, uf.upper(), float(lat), float(lon)))
+                # Sem UF na consulta, homônimos preferem a capital e depois o mais populoso
+                capital = _campo(linha, "capital") in ("1", "true", "True", "sim")
+                populacao = _campo(linha, "populacao")
+                prioridade[k] = (1e12 if capital else 0) + (float(populacao) if populacao else 0)
+        logger.info("Índice de municípios: %d entradas de %s", len(municipios), caminho)
+        return cls(municipios, prioridade)
+
+    def _municipio(self, k):
+        return Municipio(self.nomes[k], self.ufs[k], self.lat[k], self.lon[k])
+
+    def _exato(self, nome, uf):
+        if uf is not None:
+            return self._chaves.get(f"{nome}|{uf}")
+        posicoes = self._homonimos.get(nome)
+        return posicoes[0] if posicoes else None
+
+    def _aproximado(self, nome, uf):
+        if self._por_uf is None:
+            por_uf = {}
+            for chave in self._chaves:
+                n, u = chave.rsplit("|", 1)
+                por_uf.setdefault(u, []).append(n)
+            self._por_uf = por_uf
+        candidatos = self._por_uf.get(uf, ())
+        parecidos = difflib.get_close_matches(nome, candidatos, n=1, cutoff=CORTE_APROXIMADO)
+        return self._exato(parecidos[0], uf) if parecidos else None
+
+    def localizar(self, consulta, aproximado=True):
+        """Municipio para "Cidade, UF" (UF opcional) ou None; com UF, tenta nomes parecidos da mesma UF."""
+        nome, uf = separar_consulta(consulta)
+        if not nome:
+            return None
+        k = self._exato(nome, uf)
+        if k is None and aproximado and uf is not None:
+            k = self._aproximado(nome, uf)
+        return None if k is None else self._municipio(k)
+
+    def localizar_lote(self, consultas, aproximado=True):
+        """Lista alinhada de Municipio (ou None); consultas repetidas são resolvidas uma vez."""
+        resolvidos = {}
+        saida = []
+        for consulta in consultas:
+            if consulta not in resolvidos:
+                resolvidos[consulta] = self.localizar(consulta, aproximado)
+            saida.append(resolvidos[consulta])
+        return saida
+
+    def buscar(self, prefixo, uf=None, limite=10):
+        """Municípios cujo nome normalizado começa com `prefixo` (autocompletar)."""
+        p = normalizar_nome(prefixo)
+        uf = _uf(uf) if uf else None
+        saida = []
+        for nome in self._ordenados[bisect.bisect_left(self._ordenados, p):]:
+            if not nome.startswith(p) or len(saida) >= limite:
+                break
+            for k in self._homonimos[nome]:
+                if (uf is None or self.ufs[k] == uf) and len(saida) < limite:
+                    saida.append(self._municipio(k))
+        return saida
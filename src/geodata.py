@@ -1,54 +1,336 @@
 import os
 import json
 import time
+import base64
 import logging
-import requests
-from geopy.geocoders import Nominatim
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, Dict
 
+from . import perf
+
 CACHE_TTL_SECONDS = 60 * 60 * 24 * 30  # 30 dias
 
 CACHE_DIR = os.path.join(os.getcwd(), ".cache")
-os.makedirs(CACHE_DIR, exist_ok=True)
+CACHE_DB = "cache.sqlite3"  # arquivo único do cache dentro de CACHE_DIR
+
+# Resolução da grade da climatologia NASA POWER (graus). Cidades na mesma
+# célula compartilham a mesma entrada de cache climático.
+GRADE_POWER_GRAUS = 0.5
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+
+# Namespaces do cache
+NS_GEOCODE = "geocode"  # nome normalizado -> {lat, lon, address}
+NS_CLIMA = "clima"      # célula da grade -> {irr, temp, lat, lon}
+NS_LEGADO = "legado"    # arquivos geo_<cidade>.json importados -> {irr, temp}
+NS_SERIE = "serie"      # célula da grade + anos -> séries mensais plurianuais (float32 em base64)
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+# Classe do geocodificador; importada do geopy no primeiro uso
+Nominatim = None
+
+# Endpoints (configuráveis para testes com servidor HTTP local)
+NASA_POWER_URL = "https://power.larc.nasa.gov/api/temporal/climatology/point"
+NASA_POWER_MENSAL_URL = "https://power.larc.nasa.gov/api/temporal/monthly/point"
+NOMINATIM_DOMAIN = "nominatim.openstreetmap.org"
+NOMINATIM_SCHEME = "https"
+NOMINATIM_REQ_POR_S = 1.0      # política de uso do Nominatim público
+NASA_MAX_CONCORRENCIA = 8      # requisições simultâneas à NASA POWER
+RETRY_ESPERA_S = 0.5           # espera inicial entre tentativas (dobra a cada falha)
+
+# Série mensal plurianual da NASA POWER (P50/P90, src/excedencia.py)
+SERIE_ANO_INICIO = 2001
+VALOR_AUSENTE_NASA = -999.0
+
+# Grade climática offline (src/gradeclima.py); a NASA só é consultada sem cobertura da grade
+GRADE_CLIMA_PATH = os.environ.get("SOLAR_GRADE_CLIMA") or None
+GRADE_CLIMA_METODO = "bilinear"
+_GRADE = None
+_GRADE_LOCK = threading.Lock()
+
+# Tabela de municípios do geocodificador local (src/geocodificador.py); None desativa
+MUNICIPIOS_CSV = os.environ.get("SOLAR_MUNICIPIOS") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "municipios.csv")
+_INDICE_MUNICIPIOS = None
+_MUNICIPIOS_LOCK = threading.Lock()
+
+
+def _normalizar_cidade(cidade):
+    """Normaliza o nome para chave de cache: sem acentos, minúsculo, espaços e vírgulas uniformes.
+
+    "Fortaleza, CE", "fortaleza,CE" e "  Fortaleza ,  ce" resultam em "fortaleza, ce".
+    """
+    texto = unicodedata.normalize("NFKD", str(cidade))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).casefold()
+    partes = [" ".join(p.split()) for p in texto.split(",")]
+    return ", ".join(p for p in partes if p)
+
+
+def _chave_legado(cidade):
+    """Chave dos caches legados, cujo nome de arquivo trocava espaços e vírgulas por '_'."""
+    return _normalizar_cidade(cidade.replace("_", " ").replace(",", " "))
+
+
+def _celula_grade(lat, lon, passo=GRADE_POWER_GRAUS):
+    """Centro da célula da grade POWER que contém (lat, lon)."""
+    return round(round(lat / passo) * passo, 4), round(round(lon / passo) * passo, 4)
+
+
+def _chave_celula(lat, lon):
+    return f"{lat:+08.3f}_{lon:+09.3f}"
+
+
+def _grade():
+    """GradeClima de GRADE_CLIMA_PATH, aberta no primeiro uso (None sem grade configurada)."""
+    global _GRADE
+    if not GRADE_CLIMA_PATH:
+        return None
+    with _GRADE_LOCK:
+        if _GRADE is None or _GRADE[0] != GRADE_CLIMA_PATH:
+            try:
+                from .gradeclima import GradeClima
+                _GRADE = (GRADE_CLIMA_PATH, GradeClima(GRADE_CLIMA_PATH))
+            except Exception as e:
+                logging.getLogger(__name__).warning("Grade climática indisponível (%s): %s", GRADE_CLIMA_PATH, e)
+                _GRADE = (GRADE_CLIMA_PATH, None)
+        return _GRADE[1]
+
+
+def _indice_municipios():
+    """IndiceMunicipios de MUNICIPIOS_CSV, carregado no primeiro uso (None se indisponível)."""
+    global _INDICE_MUNICIPIOS
+    if not MUNICIPIOS_CSV:
+        return None
+    with _MUNICIPIOS_LOCK:
+        if _INDICE_MUNICIPIOS is None or _INDICE_MUNICIPIOS[0] != MUNICIPIOS_CSV:
+            try:
+                from .geocodificador import IndiceMunicipios
+                _INDICE_MUNICIPIOS = (MUNICIPIOS_CSV, IndiceMunicipios.carregar(MUNICIPIOS_CSV))
+            except Exception as e:
+                logging.getLogger(__name__).warning("Tabela de municípios indisponível (%s): %s", MUNICIPIOS_CSV, e)
+                _INDICE_MUNICIPIOS = (MUNICIPIOS_CSV, None)
+        return _INDICE_MUNICIPIOS[1]
+
+
+def _consultar_grade(lat, lon):
+    """(irr, temp) da grade offline em (lat, lon) ou None."""
+    grade = _grade()
+    if grade is None:
+        return None
+    with perf.span("geodata.grade"):
+        dados = grade.consultar(lat, lon, GRADE_CLIMA_METODO)
+    perf.contar("grade_acertos" if dados is not None else "grade_faltas")
+    return dados
+
+
+def _store():
+    """CacheStore do diretório atual, aberto (e migrado) na primeira utilização."""
+    global _STORE
+    path = os.path.join(CACHE_DIR, CACHE_DB)
+    with _STORE_LOCK:
+        if _STORE is None or _STORE.path != path:
+            from .cache import NS_META, CacheStore
+            _STORE = CacheStore(path)
+            if _STORE.get(NS_META, "migracao_json") is None:
+                migrar_cache_json(_STORE, CACHE_DIR)
+        return _STORE
+
+
+def _ler_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def migrar_cache_json(store, diretorio):
+    """Importa os caches JSON antigos de `diretorio` para o store.
+
+    Reconhece geo_<cidade>.json (um por cidade), geocode.json e
+    clima_<célula>.json. Os arquivos não são apagados. Retorna o número de
+    entradas importadas.
+    """
+    logger = logging.getLogger(__name__)
+    total = 0
+    try:
+        nomes = sorted(os.listdir(diretorio))
+    except OSError:
+        nomes = []
+    for nome in nomes:
+        if not nome.endswith(".json"):
+            continue
+        path = os.path.join(diretorio, nome)
+        data = _ler_json(path)
+        if not isinstance(data, dict):
+            continue
+        try:
+            if nome == "geocode.json":
+                for chave, item in data.items():
+                    store.set(NS_GEOCODE, chave, {k: item[k] for k in ("lat", "lon", "address") if k in item}, ts=item.get("ts"))
+                    total += 1
+            elif nome.startswith("geo_"):
+                ts = data["ts"] if "ts" in data else os.path.getmtime(path)
+                store.set(NS_LEGADO, _chave_legado(nome[4:-5]), {"irr": data["irr"], "temp": data["temp"]}, ts=ts, ttl=CACHE_TTL_SECONDS)
+                total += 1
+            elif nome.startswith("clima_"):
+                ts = data.pop("ts") if "ts" in data else os.path.getmtime(path)
+                store.set(NS_CLIMA, nome[6:-5], data, ts=ts, ttl=CACHE_TTL_SECONDS)
+                total += 1
+        except (KeyError, TypeError, OSError) as e:
+            logger.warning("Cache JSON ignorado na migração (%s): %s", nome, e)
+    from .cache import NS_META
+    store.set(NS_META, "migracao_json", {"entradas": total})
+    if total:
+        logger.info("Migração do cache JSON: %d entradas importadas de %s", total, diretorio)
+    return total
 
-def _cache_path(cidade): 
-    safe = cidade.replace(" ", "_").replace(",", "_")
-    return os.path.join(CACHE_DIR, f"geo_{safe}.json")
 
 def clear_cache(cidade):
-    """Remove o arquivo de cache para a cidade, se existir."""
-    path = _cache_path(cidade)
+    """Remove o cache da cidade: geocodificação, clima da célula da grade e entrada legada.
+
+    Observação: o clima é compartilhado por todas as cidades da mesma célula.
+    """
+    removido = False
     try:
-        if os.path.exists(path):
-            os.remove(path)
-            logging.info("Cache removido: %s", path)
-            return True
+        store = _store()
+        chave = _normalizar_cidade(cidade)
+        item = store.get(NS_GEOCODE, chave)
+        if item is not None:
+            coords = item[0]
+            store.delete(NS_CLIMA, _chave_celula(*_celula_grade(coords["lat"], coords["lon"])))
+            removido = store.delete(NS_GEOCODE, chave)
+        removido = store.delete(NS_LEGADO, _chave_legado(cidade)) or removido
+        if removido:
+            logging.info("Cache removido: %s", cidade)
     except Exception as e:
-        logging.warning("Falha ao remover cache %s: %s", path, e)
-    return False
+        logging.warning("Falha ao remover cache de %s: %s", cidade, e)
+    return removido
 
-def get_nasa_data(lat: float, lon: float, timeout: int = 10) -> Optional[Dict]:
-    """Obtém parâmetros climáticos da API NASA POWER com tratamento de erros.
+class _LimitadorTaxa:
+    """Token bucket simples e thread-safe: no máximo `taxa` aquisições por segundo."""
 
-    Retorna o dicionário de parâmetros em caso de sucesso ou None em falhas
-    (sem internet, timeout, HTTP não-200, JSON inesperado, etc.).
-    """
+    def __init__(self, taxa, capacidade=1):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self._tokens = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        with self._lock:
+            agora = time.monotonic()
+            self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            espera = 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.taxa
+            self._tokens -= 1.0
+            if espera > 0:
+                # Dorme segurando o lock para manter a fila na ordem de chegada
+                time.sleep(espera)
+                self._ultimo = time.monotonic()
+                self._tokens = 0.0
+
+
+class _VooUnico:
+    """Deduplica chamadas concorrentes com a mesma chave (single-flight)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_voo = {}
+
+    def executar(self, chave, funcao):
+        with self._lock:
+            evento = self._em_voo.get(chave)
+            lider = evento is None
+            if lider:
+                evento = self._em_voo[chave] = [threading.Event(), None, None]
+        if not lider:
+            evento[0].wait()
+            if evento[2] is not None:
+                raise evento[2]
+            return evento[1]
+        try:
+            evento[1] = funcao()
+            return evento[1]
+        except BaseException as e:
+            evento[2] = e
+            raise
+        finally:
+            with self._lock:
+                self._em_voo.pop(chave, None)
+            evento[0].set()
+
+
+_LIMITE_NOMINATIM = _LimitadorTaxa(NOMINATIM_REQ_POR_S)
+_NASA_SEMAFORO = threading.BoundedSemaphore(NASA_MAX_CONCORRENCIA)
+_VOO_CELULA = _VooUnico()
+_HTTP_LOCK = threading.Lock()
+_SESSAO = None
+_GEOCODER = None
+_GEOCODER_CHAVE = None
+
+
+def _sessao_http():
+    """Sessão HTTP compartilhada (keep-alive) com pool do tamanho da concorrência NASA."""
+    global _SESSAO
+    with _HTTP_LOCK:
+        if _SESSAO is None:
+            import requests
+            sessao = requests.Session()
+            adaptador = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=NASA_MAX_CONCORRENCIA)
+            sessao.mount("https://", adaptador)
+            sessao.mount("http://", adaptador)
+            _SESSAO = sessao
+        return _SESSAO
+
+
+def _geocoder():
+    """Cliente Nominatim compartilhado (recriado se o domínio configurado mudar)."""
+    global _GEOCODER, _GEOCODER_CHAVE, Nominatim
+    if Nominatim is None:
+        from geopy.geocoders import Nominatim
+    chave = (Nominatim, NOMINATIM_DOMAIN, NOMINATIM_SCHEME)
+    with _HTTP_LOCK:
+        if _GEOCODER is None or _GEOCODER_CHAVE != chave:
+            _GEOCODER = Nominatim(user_agent="projeto_solar_geodata", domain=NOMINATIM_DOMAIN, scheme=NOMINATIM_SCHEME)
+            _GEOCODER_CHAVE = chave
+        return _GEOCODER
+
+
+def _com_retentativas(funcao, retries, descricao):
+    """Executa `funcao` até obter resultado não nulo, com espera exponencial entre falhas."""
+    logger = logging.getLogger(__name__)
+    espera = RETRY_ESPERA_S
+    tentativas = max(0, int(retries)) or 1
+    for n in range(tentativas):
+        try:
+            resultado = funcao()
+            if resultado is not None:
+                return resultado
+        except Exception as e:
+            logger.warning("Falha em %s (tentativa %d/%d): %s", descricao, n + 1, tentativas, e)
+        if n + 1 < tentativas:
+            perf.contar("retentativas")
+            time.sleep(espera)
+            espera *= 2
+    return None
+
+
+def _consultar_nasa(url, params, timeout):
+    """GET na NASA POWER; dicionário `properties.parameter` ou None em falhas (com mensagem ao usuário)."""
+    import requests
     logger = logging.getLogger(__name__)
-    url = (
-        "https://power.larc.nasa.gov/api/temporal/climatology/point"
-    )
-    params = {
-        "parameters": "ALLSKY_SFC_SW_DWN,T2M",
-        "community": "RE",
-        "longitude": lon,
-        "latitude": lat,
-        "format": "JSON",
-    }
     try:
-        print(f"📡 Conectando com satélite NASA em ({lat:.4f}, {lon:.4f})...")
-        resp = requests.get(url, params=params, timeout=timeout)
-        resp.raise_for_status()
-        payload = resp.json()
+        print(f"📡 Conectando com satélite NASA em ({params['latitude']:.4f}, {params['longitude']:.4f})...")
+        perf.contar("nasa_consultas")
+        with perf.span("geodata.nasa"), _NASA_SEMAFORO:
+            resp = _sessao_http().get(url, params=params, timeout=timeout)
+            resp.raise_for_status()
+            payload = resp.json()
         return payload["properties"]["parameter"]
     except requests.exceptions.ConnectionError:
         print("❌ ERRO: Sem conexão com a internet.")
@@ -71,14 +353,294 @@ def get_nasa_data(lat: float, lon: float, timeout: int = 10) -> Optional[Dict]:
         logger.warning("Erro inesperado NASA POWER: %s", e)
         return None
 
-def get_data(cidade, refresh_cache=False, ttl_seconds=CACHE_TTL_SECONDS, allow_stale_fallback=True, retries: int = 3, nasa_timeout: int = 15):
+
+def get_nasa_data(lat: float, lon: float, timeout: int = 10) -> Optional[Dict]:
+    """Obtém parâmetros climáticos da API NASA POWER com tratamento de erros.
+
+    Retorna o dicionário de parâmetros em caso de sucesso ou None em falhas
+    (sem internet, timeout, HTTP não-200, JSON inesperado, etc.). Usa a
+    sessão HTTP compartilhada e no máximo NASA_MAX_CONCORRENCIA requisições
+    simultâneas.
+    """
+    params = {
+        "parameters": "ALLSKY_SFC_SW_DWN,T2M",
+        "community": "RE",
+        "longitude": lon,
+        "latitude": lat,
+        "format": "JSON",
+    }
+    return _consultar_nasa(NASA_POWER_URL, params, timeout)
+
+
+def get_nasa_serie_mensal(lat: float, lon: float, ano_inicio: int, ano_fim: int, timeout: int = 30) -> Optional[Dict]:
+    """Série mensal (endpoint temporal/monthly) de ALLSKY_SFC_SW_DWN e T2M entre dois anos.
+
+    Retorna o dicionário de parâmetros ({"AAAAMM": valor}, com MM=13 para a
+    média anual) ou None em falhas, como get_nasa_data.
+    """
+    params = {
+        "parameters": "ALLSKY_SFC_SW_DWN,T2M",
+        "community": "RE",
+        "longitude": lon,
+        "latitude": lat,
+        "start": int(ano_inicio),
+        "end": int(ano_fim),
+        "format": "JSON",
+    }
+    return _consultar_nasa(NASA_POWER_MENSAL_URL, params, timeout)
+
+
+def _ler_cache_clima(store, ns, chave, ttl, logger):
+    """Lê uma entrada de cache climático.
+
+    Retorna (payload_valido, payload_vencido, idade_dias_vencido); apenas um
+    dos dois payloads é preenchido.
+    """
+    with perf.span("geodata.cache_leitura"):
+        item = store.get(ns, chave)
+    if item is None:
+        perf.contar("cache_faltas")
+        return None, None, None
+    try:
+        data, ts = item
+        age = time.time() - ts
+        # TTL == 0 -> cache infinito
+        if ttl == 0 or age <= ttl:
+            age_days = age/86400.0
+            if ttl == 0:
+                print(f"ℹ️  Usando cache (infinito), idade {age_days:.1f} dias.")
+            else:
+                ttl_days = ttl/86400.0
+                print(f"ℹ️  Usando cache com idade de {age_days:.1f} dias (TTL {ttl_days:.0f} dias).")
+            perf.contar("cache_acertos")
+            return (data["irr"], data["temp"]), None, None
+        stale_age_days = age/86400.0
+        logger.info("Cache expirado (%.1f dias). Requisitando novos dados...", stale_age_days)
+        perf.contar("cache_vencidos")
+        return None, (data["irr"], data["temp"]), stale_age_days
+    except Exception:
+        return None, None, None
+
+
+def _geocodificar(cidade, retries=3):
+    """(lat, lon, endereço) da cidade: índice local de municípios, cache de geocodificação ou Nominatim (1 req/s).
+
+    O índice local só casa nomes exatos antes do cache; a busca por nomes parecidos (só
+    com UF, entre os municípios dela) fica para depois de uma falta no cache.
+    """
+    logger = logging.getLogger(__name__)
+    indice = _indice_municipios()
+    if indice is not None:
+        municipio = indice.localizar(cidade, aproximado=False)
+        if municipio is not None:
+            perf.contar("geocode_local_acertos")
+            return municipio.lat, municipio.lon, f"{municipio.nome}, {municipio.uf}"
+    store = _store()
+    chave_nome = _normalizar_cidade(cidade)
+    with perf.span("geodata.cache_leitura"):
+        item = store.get(NS_GEOCODE, chave_nome)
+    if item is not None:
+        perf.contar("geocode_cache_acertos")
+        return item[0]["lat"], item[0]["lon"], item[0].get("address", "")
+
+    perf.contar("geocode_cache_faltas")
+    if indice is not None:
+        municipio = indice.localizar(cidade)
+        if municipio is not None:
+            perf.contar("geocode_local_acertos")
+            logger.info("Município aproximado para %r: %s, %s", cidade, municipio.nome, municipio.uf)
+            return municipio.lat, municipio.lon, f"{municipio.nome}, {municipio.uf}"
+
+    def consultar():
+        _LIMITE_NOMINATIM.aguardar()
+        perf.contar("nominatim_consultas")
+        with perf.span("geodata.nominatim"):
+            return _geocoder().geocode(cidade, timeout=10)
+
+    loc = _com_retentativas(consultar, retries, f"geocodificação de {cidade!r}")
+    if not loc:
+        return None
+    logger.info("Localização encontrada: %s", loc.address)
+    print(f"✅ Location found: {loc.address}")
+    store.set(NS_GEOCODE, chave_nome, {"lat": loc.latitude, "lon": loc.longitude, "address": loc.address})
+    return loc.latitude, loc.longitude, loc.address
+
+
+def obter_coordenadas(cidade, retries=3):
+    """(lat, lon) da cidade ou None; usa o mesmo cache de geocodificação de get_data."""
+    coords = _geocodificar(cidade, retries=retries)
+    return None if coords is None else (coords[0], coords[1])
+
+
+def _baixar_clima_celula(lat_c, lon_c, retries=3, nasa_timeout=15):
+    """Baixa e grava no cache o clima da célula; chamadas simultâneas à mesma célula são unificadas."""
+    chave_celula = _chave_celula(lat_c, lon_c)
+
+    def baixar():
+        print("🛰️  Downloading climate data...")
+        d = _com_retentativas(lambda: get_nasa_data(lat=lat_c, lon=lon_c, timeout=nasa_timeout), retries, "NASA POWER")
+        if d is None:
+            return None
+        irr = {m: d['ALLSKY_SFC_SW_DWN'][m] for m in MESES}
+        temp = {m: d['T2M'][m] for m in MESES}
+        _store().set(NS_CLIMA, chave_celula, {"irr": irr, "temp": temp, "lat": lat_c, "lon": lon_c}, ttl=CACHE_TTL_SECONDS)
+        return irr, temp
+
+    return _VOO_CELULA.executar(chave_celula, baixar)
+
+
+def _serie_dos_parametros(d, ano_inicio, ano_fim):
+    """Valor de cache da resposta mensal: matrizes (anos, 12) float32 em base64, ausentes como NaN."""
+    import numpy as np
+
+    def codificar(nome):
+        valores = d[nome]
+        matriz = np.array([[valores.get(f"{ano}{mes:02d}", VALOR_AUSENTE_NASA) for mes in range(1, 13)]
+                           for ano in range(ano_inicio, ano_fim + 1)], dtype="<f4")
+        matriz[matriz <= VALOR_AUSENTE_NASA] = np.nan
+        return base64.b64encode(matriz.tobytes()).decode("ascii")
+
+    return {"ano_inicio": ano_inicio, "irr": codificar("ALLSKY_SFC_SW_DWN"), "temp": codificar("T2M")}
+
+
+def _serie_do_cache(valor):
+    """SerieMensal a partir do valor gravado por _serie_dos_parametros."""
+    import numpy as np
+    from .excedencia import SerieMensal
+
+    irr = np.frombuffer(base64.b64decode(valor["irr"]), dtype="<f4").reshape(-1, 12)
+    temp = np.frombuffer(base64.b64decode(valor["temp"]), dtype="<f4").reshape(-1, 12)
+    return SerieMensal(np.arange(valor["ano_inicio"], valor["ano_inicio"] + irr.shape[0]), irr, temp)
+
+
+def get_serie_mensal(cidade, ano_inicio=None, ano_fim=None, refresh_cache=False, ttl_seconds=CACHE_TTL_SECONDS,
+                     allow_stale_fallback=True, retries: int = 3, nasa_timeout: int = 30):
+    """Série mensal plurianual (excedencia.SerieMensal) da célula da cidade, ou None.
+
+    Usa o endpoint temporal/monthly da NASA POWER de `ano_inicio` (padrão
+    SERIE_ANO_INICIO) a `ano_fim` (padrão: ano passado). A série fica no
+    cache por célula da grade e intervalo de anos, como float32 compacto
+    (~1 KB por parâmetro para 20 anos); meses ausentes na NASA viram NaN.
+    """
+    from datetime import date
+
+    ano_inicio = int(SERIE_ANO_INICIO if ano_inicio is None else ano_inicio)
+    ano_fim = int(date.today().year - 1 if ano_fim is None else ano_fim)
+    ttl = CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    coords = _geocodificar(cidade, retries=retries)
+    if coords is None:
+        return None
+    lat_c, lon_c = _celula_grade(coords[0], coords[1])
+    chave = f"{_chave_celula(lat_c, lon_c)}|{ano_inicio}-{ano_fim}"
+    store = _store()
+
+    vencido = None
+    if not refresh_cache:
+        with perf.span("geodata.cache_leitura"):
+            item = store.get(NS_SERIE, chave)
+        if item is not None:
+            valor, ts = item
+            if ttl == 0 or time.time() - ts <= ttl:
+                perf.contar("serie_cache_acertos")
+                return _serie_do_cache(valor)
+            vencido = valor
+        perf.contar("serie_cache_faltas")
+
+    def baixar():
+        print(f"🛰️  Baixando série mensal {ano_inicio}-{ano_fim}...")
+        d = _com_retentativas(lambda: get_nasa_serie_mensal(lat_c, lon_c, ano_inicio, ano_fim, timeout=nasa_timeout),
+                              retries, "NASA POWER (série mensal)")
+        if d is None:
+            return None
+        valor = _serie_dos_parametros(d, ano_inicio, ano_fim)
+        store.set(NS_SERIE, chave, valor, ttl=CACHE_TTL_SECONDS)
+        return valor
+
+    valor = _VOO_CELULA.executar(f"serie|{chave}", baixar)
+    if valor is None and allow_stale_fallback and vencido is not None:
+        print("⚠️  NASA indisponível; usando série mensal vencida do cache.")
+        perf.contar("cache_vencido_servido")
+        valor = vencido
+    return None if valor is None else _serie_do_cache(valor)
+
+
+_REVALIDACAO_LOCK = threading.Lock()
+_REVALIDACAO_POOL = None
+_REVALIDANDO = {}  # cidade normalizada -> (Future, lista de hooks on_refresh)
+
+
+def _executar_revalidacao(chave, cidade, retries, nasa_timeout):
+    """Tarefa do worker: coleta dados novos e notifica os hooks registrados."""
+    logger = logging.getLogger(__name__)
+    try:
+        irr, temp = get_data(cidade, refresh_cache=True, allow_stale_fallback=False, retries=retries, nasa_timeout=nasa_timeout)
+    finally:
+        with _REVALIDACAO_LOCK:
+            _, hooks = _REVALIDANDO.pop(chave)
+    if irr is None:
+        logger.warning("Revalidação em segundo plano falhou para %s", cidade)
+        return None, None
+    logger.info("Revalidação concluída para %s", cidade)
+    for hook in hooks:
+        try:
+            hook(cidade, irr, temp)
+        except Exception as e:
+            logger.warning("Falha no hook on_refresh de %s: %s", cidade, e)
+    return irr, temp
+
+
+def _revalidar_em_segundo_plano(cidade, on_refresh, retries, nasa_timeout):
+    """Agenda a atualização da cidade em background; pedidos repetidos reaproveitam a mesma (single-flight)."""
+    global _REVALIDACAO_POOL
+    chave = _normalizar_cidade(cidade)
+    with _REVALIDACAO_LOCK:
+        if chave in _REVALIDANDO:
+            futuro, hooks = _REVALIDANDO[chave]
+            logging.getLogger(__name__).info("Revalidação de %s já em andamento", cidade)
+        else:
+            if _REVALIDACAO_POOL is None:
+                _REVALIDACAO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="revalidacao")
+            hooks = []
+            futuro = _REVALIDACAO_POOL.submit(_executar_revalidacao, chave, cidade, retries, nasa_timeout)
+            _REVALIDANDO[chave] = (futuro, hooks)
+        if on_refresh is not None:
+            hooks.append(on_refresh)
+    return futuro
+
+
+def aguardar_revalidacoes(timeout=None):
+    """Aguarda as atualizações em segundo plano pendentes (útil em testes e no encerramento)."""
+    with _REVALIDACAO_LOCK:
+        pendentes = [futuro for futuro, _ in _REVALIDANDO.values()]
+    for futuro in pendentes:
+        try:
+            futuro.result(timeout=timeout)
+        except Exception:
+            pass
+
+
+def get_data(cidade, refresh_cache=False, ttl_seconds=CACHE_TTL_SECONDS, allow_stale_fallback=True, retries: int = 3, nasa_timeout: int = 15,
+             stale_while_revalidate=False, on_refresh=None):
     """Retorna (irradiacao_mensal_dict, temperatura_mensal_dict).
 
-    Quando refresh_cache=True, ignora cache e força nova coleta.
+    O cache tem duas camadas: geocodificação (nome normalizado -> lat/lon) e
+    clima por célula da grade POWER (GRADE_POWER_GRAUS), de modo que cidades
+    vizinhas e grafias diferentes reaproveitam a mesma consulta à NASA.
+    Geocodificação e NASA têm tentativas independentes: uma falha na NASA
+    não repete a geocodificação.
+    Quando refresh_cache=True, ignora o cache climático e força nova coleta.
+    Com GRADE_CLIMA_PATH configurado (variável SOLAR_GRADE_CLIMA), a grade
+    offline de src/gradeclima.py responde antes da NASA, que fica como
+    alternativa para pontos sem cobertura (ou para falhas com refresh_cache).
+
+    Com stale_while_revalidate=True, um cache vencido é devolvido na hora e
+    a atualização roda em segundo plano (uma por cidade por vez);
+    on_refresh(cidade, irr, temp) é chamado quando o dado novo chegar.
+    Sem essa opção, o vencido só é usado após falhar a coleta
+    (allow_stale_fallback).
     """
     logger = logging.getLogger(__name__)
     logger.info("Buscando dados climáticos para %s", cidade)
-    geo = Nominatim(user_agent="projeto_solar_geodata")
     print(f"📍 Searching for coordinates of '{cidade}'...")
 
     # Normaliza TTL: None usa padrão; 0 = cache infinito (nunca expira)
@@ -87,71 +649,72 @@ def get_data(cidade, refresh_cache=False, ttl_seconds=CACHE_TTL_SECONDS, allow_s
     else:
         ttl = ttl_seconds
 
-    # tenta cache
-    cpath = _cache_path(cidade)
+    store = _store()
     stale_payload = None
     stale_age_days = None
-    if os.path.exists(cpath) and not refresh_cache:
-        try:
-            with open(cpath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            now = time.time()
-            ts = data.get("ts")
-            if ts is None:
-                try:
-                    ts = os.path.getmtime(cpath)
-                except Exception:
-                    ts = now
-            age = now - ts
-            # TTL == 0 -> cache infinito
-            if ttl == 0 or age <= ttl:
-                age_days = age/86400.0
-                if ttl == 0:
-                    print(f"ℹ️  Usando cache (infinito), idade {age_days:.1f} dias.")
-                else:
-                    ttl_days = ttl/86400.0
-                    print(f"ℹ️  Usando cache com idade de {age_days:.1f} dias (TTL {ttl_days:.0f} dias).")
-                return data["irr"], data["temp"]
-            else:
-                stale_age_days = age/86400.0
-                logger.info("Cache expirado (%.1f dias). Requisitando novos dados...", stale_age_days)
-                stale_payload = (data["irr"], data["temp"])  # para fallback
-        except Exception:
-            pass
+    if not refresh_cache:
+        # Cidade ainda não geocodificada: tenta a entrada legada importada dos JSON antigos
+        if store.get(NS_GEOCODE, _normalizar_cidade(cidade)) is None:
+            fresh, stale_payload, stale_age_days = _ler_cache_clima(store, NS_LEGADO, _chave_legado(cidade), ttl, logger)
+            if fresh is not None:
+                return fresh
+            if stale_payload is not None and stale_while_revalidate:
+                print(f"⚠️  Usando cache vencido de {stale_age_days:.1f} dias; atualizando em segundo plano.")
+                _revalidar_em_segundo_plano(cidade, on_refresh, retries, nasa_timeout)
+                perf.contar("cache_vencido_servido")
+                return stale_payload
+
+    coords = _geocodificar(cidade, retries=retries)
+    if coords is not None:
+        lat_c, lon_c = _celula_grade(coords[0], coords[1])
+        if not refresh_cache:
+            fresh, stale, stale_age = _ler_cache_clima(store, NS_CLIMA, _chave_celula(lat_c, lon_c), ttl, logger)
+            if fresh is not None:
+                return fresh
+            if stale is not None:
+                stale_payload, stale_age_days = stale, stale_age
+                if stale_while_revalidate:
+                    print(f"⚠️  Usando cache vencido de {stale_age_days:.1f} dias; atualizando em segundo plano.")
+                    _revalidar_em_segundo_plano(cidade, on_refresh, retries, nasa_timeout)
+                    perf.contar("cache_vencido_servido")
+                    return stale_payload
+            dados = _consultar_grade(coords[0], coords[1])
+            if dados is not None:
+                print("🗺️  Usando grade climática offline.")
+                return dados
+        dados = _baixar_clima_celula(lat_c, lon_c, retries=retries, nasa_timeout=nasa_timeout)
+        if dados is not None:
+            return dados
+        if refresh_cache:
+            dados = _consultar_grade(coords[0], coords[1])
+            if dados is not None:
+                print("⚠️  NASA indisponível; usando grade climática offline.")
+                return dados
 
-    for _ in range(max(0, int(retries)) or 1):
-        try:
-            loc = geo.geocode(cidade, timeout=10)
-            if not loc:
-                time.sleep(1)
-                continue
-            logger.info("Localização encontrada: %s", loc.address)
-            print(f"✅ Location found: {loc.address}")
-            print("🛰️  Downloading climate data...")
-
-            d = get_nasa_data(lat=loc.latitude, lon=loc.longitude, timeout=nasa_timeout)
-            if d is None:
-                # tentar novamente; pode ter sido falha transitória
-                time.sleep(1)
-                continue
-
-            irr = {m: d['ALLSKY_SFC_SW_DWN'][m] for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']}
-            temp = {m: d['T2M'][m] for m in ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']}
-            # salva cache
-            try:
-                with open(cpath, "w", encoding="utf-8") as f:
-                    json.dump({"irr": irr, "temp": temp, "ts": time.time()}, f)
-            except Exception:
-                pass
-            return irr, temp
-        except Exception as e:
-            logger.warning("Falha ao geocodificar/obter dados (tentativa): %s", e)
-            time.sleep(1)
     # fallback para cache vencido se permitido
     if allow_stale_fallback and stale_payload is not None:
         if stale_age_days is not None:
             print(f"⚠️  Usando cache vencido de {stale_age_days:.1f} dias por indisponibilidade de rede.")
         logger.warning("Usando cache vencido por indisponibilidade de rede (%.1f dias).", stale_age_days or -1)
+        perf.contar("cache_vencido_servido")
         return stale_payload
     return None, None
- 
+
+
+def get_data_many(cidades, workers: int = NASA_MAX_CONCORRENCIA, **kwargs):
+    """Busca o clima de várias cidades em paralelo.
+
+    Usa um pool de threads: a geocodificação respeita o limite compartilhado
+    do Nominatim (NOMINATIM_REQ_POR_S), as consultas à NASA usam a sessão
+    HTTP compartilhada com no máximo NASA_MAX_CONCORRENCIA simultâneas, e
+    cidades da mesma célula da grade geram uma única consulta. `kwargs` são
+    repassados a get_data.
+
+    Retorna dict cidade -> (irr, temp); (None, None) para as que falharem.
+    """
+    unicas = list(dict.fromkeys(cidades))
+    if not unicas:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(unicas)))) as pool:
+        resultados = pool.map(lambda c: get_data(c, **kwargs), unicas)
+        return dict(zip(unicas, resultados))
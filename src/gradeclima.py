@@ -0,0 +1,182 @@
+"""Grade climática offline (NASA POWER) em arquivo NumPy mapeado em memória.
+
+`construir_grade` converte exportações locais da climatologia POWER (JSON de
+ponto ou regional, CSV regional) em uma matriz float32 (nlat, nlon, 24) —
+12 meses de ALLSKY_SFC_SW_DWN seguidos de 12 de T2M por célula — gravada em
+`<base>.npy` com os metadados em `<base>.json`. `GradeClima` abre o arquivo
+com mmap (apenas as células consultadas são lidas do disco) e devolve os
+mesmos dicts irr/temp de geodata.get_data, pela célula mais próxima ou por
+interpolação bilinear.
+
+    python -m src.cli grade --entrada exportacoes_power/ --saida data/grade_clima
+"""
+import csv
+import json
+import logging
+import math
+import os
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+PARAMETROS = ("ALLSKY_SFC_SW_DWN", "T2M")
+PASSO_PADRAO = 0.5
+AUSENTE_POWER = -999.0
+METODOS = ("bilinear", "proximo")
+
+
+class Limites(NamedTuple):
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+
+
+LIMITES_BRASIL = Limites(-34.0, 5.5, -74.0, -34.5)
+
+
+def _caminhos(base):
+    base = base[:-4] if base.endswith((".npy", ".json")) else base
+    if base.endswith("."):
+        base = base[:-1]
+    return base + ".npy", base + ".json"
+
+
+def _mensais(valores):
+    return [AUSENTE_POWER if valores.get(m) is None else float(valores[m]) for m in MESES]
+
+
+def _pontos_json(payload):
+    """(lat, lon, parametro, 12 valores) de uma resposta POWER (ponto ou FeatureCollection)."""
+    features = payload.get("features") or [payload]
+    for f in features:
+        lon, lat = f["geometry"]["coordinates"][:2]
+        parametros = f["properties"]["parameter"]
+        for p in PARAMETROS:
+            if p in parametros:
+                yield float(lat), float(lon), p, _mensais(parametros[p])
+
+
+def _pontos_csv(arquivo):
+    """Linhas PARAMETER,LAT,LON,JAN..DEC do CSV regional (o cabeçalho -BEGIN/-END HEADER- é ignorado)."""
+    linhas = arquivo.read().splitlines()
+    if linhas and linhas[0].strip() == "-BEGIN HEADER-":
+        fim = next(k for k, l in enumerate(linhas) if l.strip() == "-END HEADER-")
+        linhas = linhas[fim + 1:]
+    for linha in csv.DictReader(linhas):
+        if linha.get("PARAMETER") in PARAMETROS:
+            yield float(linha["LAT"]), float(linha["LON"]), linha["PARAMETER"], _mensais(linha)
+
+
+def _ler_fontes(fontes):
+    if isinstance(fontes, str):
+        fontes = [fontes]
+    arquivos = []
+    for fonte in fontes:
+        if os.path.isdir(fonte):
+            arquivos += sorted(os.path.join(fonte, n) for n in os.listdir(fonte) if n.lower().endswith((".json", ".csv")))
+        else:
+            arquivos.append(fonte)
+    for caminho in arquivos:
+        with open(caminho, encoding="utf-8") as f:
+            if caminho.lower().endswith(".csv"):
+                yield from _pontos_csv(f)
+            else:
+                yield from _pontos_json(json.load(f))
+
+
+def construir_grade(fontes, destino, passo=PASSO_PADRAO, limites=LIMITES_BRASIL):
+    """Grava a grade a partir de arquivos/diretórios de exportação POWER; retorna GradeClima.
+
+    Cada ponto vai para o nó mais próximo da grade (lat_min + i*passo,
+    lon_min + j*passo); pontos no mesmo nó são promediados e nós sem dados
+    ficam NaN. Valores -999 (ausentes no POWER) são ignorados.
+    """
+    nlat = int(round((limites.lat_max - limites.lat_min) / passo)) + 1
+    nlon = int(round((limites.lon_max - limites.lon_min) / passo)) + 1
+    soma = np.zeros((nlat, nlon, 2 * len(MESES)))
+    n = np.zeros((nlat, nlon, 2 * len(MESES)))
+    pontos = 0
+    for lat, lon, parametro, valores in _ler_fontes(fontes):
+        i = int(round((lat - limites.lat_min) / passo))
+        j = int(round((lon - limites.lon_min) / passo))
+        if not (0 <= i < nlat and 0 <= j < nlon):
+            continue
+        valores = np.asarray(valores)
+        validos = valores != AUSENTE_POWER
+        col = slice(0, 12) if parametro == PARAMETROS[0] else slice(12, 24)
+        soma[i, j, col][validos] += valores[validos]
+        n[i, j, col][validos] += 1
+        pontos += 1
+
+    grade = np.full(soma.shape, np.nan, dtype=np.float32)
+    np.divide(soma, n, out=grade, where=n > 0, casting="unsafe")
+    caminho_npy, caminho_meta = _caminhos(destino)
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_npy)), exist_ok=True)
+    np.save(caminho_npy, grade)
+    meta = {"lat_min": limites.lat_min, "lon_min": limites.lon_min, "passo": passo, "nlat": nlat, "nlon": nlon,
+            "parametros": list(PARAMETROS), "pontos": pontos, "criado": datetime.now().isoformat(timespec="seconds")}
+    with open(caminho_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    cobertas = int(np.isfinite(grade[..., 0]).sum())
+    logger.info("Grade climática %s: %d pontos, %d de %d células com dados", caminho_npy, pontos, cobertas, nlat * nlon)
+    return GradeClima(caminho_npy)
+
+
+class GradeClima:
+    """Grade climática mapeada em memória (somente leitura)."""
+
+    def __init__(self, caminho):
+        caminho_npy, caminho_meta = _caminhos(caminho)
+        with open(caminho_meta, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.caminho = caminho_npy
+        self.lat_min = float(meta["lat_min"])
+        self.lon_min = float(meta["lon_min"])
+        self.passo = float(meta["passo"])
+        self.dados = np.load(caminho_npy, mmap_mode="r")
+        self.nlat, self.nlon = self.dados.shape[:2]
+        self._nos = self.dados.view(np.ndarray)   # mesma memória mapeada, sem o custo da subclasse memmap
+
+    def _indices(self, lat, lon):
+        return (lat - self.lat_min) / self.passo, (lon - self.lon_min) / self.passo
+
+    def valores(self, lat, lon, metodo="bilinear"):
+        """Vetor (24,) [irr x12, temp x12] em (lat, lon); None fora da grade ou sem dados."""
+        fi, fj = self._indices(float(lat), float(lon))
+        if not (-0.5 <= fi <= self.nlat - 0.5 and -0.5 <= fj <= self.nlon - 0.5):
+            return None
+        if metodo == "proximo":
+            v = self._nos[min(int(fi + 0.5), self.nlat - 1), min(int(fj + 0.5), self.nlon - 1)].astype(float)
+            return None if math.isnan(v.sum()) else v
+
+        i0 = min(max(math.floor(fi), 0), self.nlat - 2)
+        j0 = min(max(math.floor(fj), 0), self.nlon - 2)
+        ti = min(max(fi - i0, 0.0), 1.0)
+        tj = min(max(fj - j0, 0.0), 1.0)
+        pesos = np.array([(1 - ti) * (1 - tj), (1 - ti) * tj, ti * (1 - tj), ti * tj])
+        bloco = self._nos[i0:i0 + 2, j0:j0 + 2].reshape(4, -1)          # 4 nós x 24
+        v = pesos @ bloco
+        if not math.isnan(v.sum()):
+            return v
+        # Nós sem dados (mar, fora da exportação) saem do peso; o restante é renormalizado
+        validos = ~np.isnan(bloco)
+        pesos = pesos[:, None] * validos
+        total = pesos.sum(axis=0)
+        if (total <= 1e-12).any():
+            return None
+        return (np.where(validos, bloco, 0.0) * pesos).sum(axis=0) / total
+
+    def consultar(self, lat, lon, metodo="bilinear"):
+        """(irr, temp) como dicts mensais, no formato de geodata.get_data; None sem cobertura."""
+        if metodo not in METODOS:
+            raise ValueError(f"metodo deve ser um de {METODOS}")
+        v = self.valores(lat, lon, metodo)
+        if v is None:
+            return None
+        v = np.round(v, 4).tolist()
+        return dict(zip(MESES, v[:12])), dict(zip(MESES, v[12:]))
@@ -0,0 +1,231 @@
+"""Simulação horária (8760 h x 25 anos) de geração e autoconsumo.
+
+A irradiação horária é sintetizada a partir da HSP mensal da NASA com o
+formato de céu claro (cosseno do ângulo zenital, em hora solar) ou lida de
+um arquivo local com 8760 valores. A geração é confrontada hora a hora com
+um perfil de carga do cliente: o autoconsumo real é min(geração, carga) e o
+excedente é injetado, gerando créditos com Fio B no faturamento mensal.
+O faturamento, o financiamento e o dimensionamento são os mesmos de
+engineering; só a divisão autoconsumo/injeção deixa de ser fixa.
+
+As convenções de geração também são as do modo mensal: PR térmico da
+temperatura média anual e meses de faturamento de 30 dias (o total de cada
+mês é HSP x 30, como a carga, que soma consumo_kwh_mes em todo mês). Assim
+a geração mensal coincide com a de engineering e a diferença entre os modos
+vem só da divisão autoconsumo/injeção.
+"""
+import csv
+import logging
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+from .engineering import (
+    MESES_SIMULACAO, _ANOS, ResultadoCotacao, _coluna, _matriz_mensal, _projetar, _simular_fluxo, _tarifa_mensal,
+    _tarifas_padrao, _to_month_array,
+)
+
+logger = logging.getLogger(__name__)
+
+DIAS_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+HORAS_ANO = 8760
+LATITUDE_PADRAO = -15.0        # centro do Brasil, quando a cidade não tem coordenadas
+TAMANHO_BLOCO_HORARIO = 8      # clientes por bloco (25 x 8760 valores por cliente)
+
+# Índices pré-calculados do ano típico (365 dias; o ano começa numa segunda-feira)
+_DIA = np.repeat(np.arange(365), 24)
+_HORA = np.tile(np.arange(24), 365)
+_MES_HORA = np.repeat(np.arange(12), DIAS_MES * 24)
+_INICIO_MES = np.concatenate(([0], np.cumsum(DIAS_MES * 24)[:-1]))
+_FIM_DE_SEMANA = (_DIA % 7) >= 5
+_MES_30_DIAS = (30.0 / DIAS_MES)[_MES_HORA]   # leva a geração de cada mês aos 30 dias do modo mensal
+
+# Perfis de carga: pesos das 24 horas e fator de consumo nos fins de semana
+PERFIS_CARGA = {
+    "residencial": (np.array([0.6, 0.5, 0.5, 0.5, 0.5, 0.6, 0.9, 1.1, 0.9, 0.7, 0.7, 0.8,
+                              0.9, 0.8, 0.7, 0.7, 0.8, 1.0, 1.5, 1.9, 2.0, 1.8, 1.3, 0.9]), 1.1),
+    "comercial": (np.array([0.3, 0.3, 0.3, 0.3, 0.3, 0.4, 0.6, 1.2, 1.8, 2.0, 2.1, 2.1,
+                            1.9, 2.1, 2.1, 2.0, 1.8, 1.4, 0.8, 0.5, 0.4, 0.3, 0.3, 0.3]), 0.3),
+    "plano": (np.ones(24), 1.0),
+}
+
+
+class ResultadoHorario(NamedTuple):
+    """Resultado de calcular_lote_horario: campos de ResultadoLote e as energias mensais (N, 300) em kWh."""
+    qtd: np.ndarray
+    pot_wp: np.ndarray
+    inv_w: np.ndarray
+    capex: np.ndarray
+    parcela: np.ndarray
+    conta_antiga: np.ndarray
+    conta_nova: np.ndarray
+    saldo: np.ndarray
+    total_sem: np.ndarray
+    total_com: np.ndarray
+    geracao_kwh: np.ndarray
+    autoconsumo_kwh: np.ndarray
+    injecao_kwh: np.ndarray
+    fracao_autoconsumo: np.ndarray   # (N,) autoconsumo / geração em 25 anos
+
+
+def _somar_meses(horario, dtype=float):
+    """Soma (..., 8760) por mês do calendário -> (..., 12)."""
+    return np.add.reduceat(horario, _INICIO_MES, axis=-1, dtype=dtype)
+
+
+def _normalizar_mensal(forma, total_mes):
+    """Escala a forma horária (..., 8760) para que cada mês some `total_mes` (..., 12)."""
+    soma = _somar_meses(forma)
+    escala = np.zeros_like(soma)
+    np.divide(total_mes, soma, out=escala, where=soma > 0)
+    return forma * escala[..., _MES_HORA]
+
+
+def ceu_claro(latitude):
+    """Cosseno do ângulo zenital (>= 0) hora a hora: (8760,) ou (N, 8760) para latitudes (N,)."""
+    phi = np.radians(np.asarray(latitude, dtype=float))[..., None]
+    delta = np.radians(23.45) * np.sin(2.0 * np.pi * (284 + _DIA + 1) / 365.0)
+    omega = np.radians(15.0 * (_HORA + 0.5 - 12.0))
+    cosz = np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(omega)
+    return np.maximum(cosz, 0.0)
+
+
+def sintetizar_irradiancia(irr_mensal, latitude=LATITUDE_PADRAO):
+    """Irradiação horária (kWh/m²) com formato de céu claro e total mensal = HSP x dias.
+
+    irr_mensal: (12,) ou (N, 12) em kWh/m²/dia; latitude escalar ou (N,).
+    """
+    irr = np.asarray(irr_mensal, dtype=float)
+    return _normalizar_mensal(ceu_claro(latitude), irr * DIAS_MES)
+
+
+def perfil_carga(perfil, consumo_kwh_mes):
+    """Carga horária (kWh) de cada cliente: (N, 8760) para consumo (N,).
+
+    perfil: nome em PERFIS_CARGA, curva de 24 h ou série (8760,)/(N, 8760).
+    A forma é escalada para que cada mês some `consumo_kwh_mes`.
+    """
+    consumo = np.atleast_1d(np.asarray(consumo_kwh_mes, dtype=float))
+    if isinstance(perfil, str):
+        if perfil not in PERFIS_CARGA:
+            raise ValueError(f"perfil deve ser um de {tuple(PERFIS_CARGA)} ou uma série horária")
+        pesos, fator_fds = PERFIS_CARGA[perfil]
+        forma = pesos[_HORA] * np.where(_FIM_DE_SEMANA, fator_fds, 1.0)
+    else:
+        forma = np.asarray(perfil, dtype=float)
+        if forma.shape[-1] == 24:
+            forma = forma[..., _HORA]
+        if forma.shape[-1] != HORAS_ANO:
+            raise ValueError("perfil de carga deve ter 24 ou 8760 valores")
+    return _normalizar_mensal(np.broadcast_to(forma, consumo.shape + (HORAS_ANO,)), consumo[:, None])
+
+
+def ler_serie_horaria(caminho):
+    """Lê 8760 valores horários de um .npy ou CSV (usa a última coluna numérica de cada linha).
+
+    Anos bissextos (8784) perdem o dia 29/02. Valores acima de 10 são
+    tratados como W/m² (Wh/m² na hora) e convertidos para kWh/m².
+    """
+    if str(caminho).endswith(".npy"):
+        serie = np.load(caminho).astype(float).ravel()
+    else:
+        valores = []
+        with open(caminho, "r", encoding="utf-8", newline="") as f:
+            texto = f.read()
+            for linha in csv.reader(texto.splitlines(), delimiter=";" if ";" in texto[:1000] else ","):
+                for campo in reversed(linha):
+                    try:
+                        valores.append(float(campo.strip().replace(",", ".")))
+                        break
+                    except ValueError:
+                        continue
+        serie = np.array(valores, dtype=float)
+    if serie.size == HORAS_ANO + 24:
+        serie = np.delete(serie, np.arange(59 * 24, 60 * 24))
+    if serie.size != HORAS_ANO:
+        raise ValueError(f"série horária deve ter {HORAS_ANO} valores (lidos {serie.size})")
+    return serie / 1000.0 if serie.max() > 10.0 else serie
+
+
+def calcular_lote_horario(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, latitude=LATITUDE_PADRAO,
+                          perfil="residencial", financiar=False, taxa_aa=0.0, meses=0, inflacao=None,
+                          degradacao=None, irr_horaria=None, dtype=np.float64, tamanho_bloco=TAMANHO_BLOCO_HORARIO):
+    """Dimensiona e simula N clientes hora a hora (25 x 8760 passos por cliente).
+
+    Argumentos como calcular_lote, mais latitude (escalar ou (N,)), perfil
+    (ver perfil_carga) e irr_horaria opcional ((8760,) ou (N, 8760) kWh/m²,
+    substitui a síntese de céu claro; irr_mensal pode ser None e é derivada
+    dela). dtype=np.float32 reduz à metade a memória dos arrays horários;
+    os totais mensais são sempre acumulados em float64.
+
+    Retorna ResultadoHorario.
+    """
+    consumo = np.atleast_1d(np.asarray(consumo_kwh_mes, dtype=float))
+    n = consumo.shape[0]
+    if irr_horaria is not None:
+        irr_horaria = np.asarray(irr_horaria, dtype=float)
+        if irr_mensal is None:
+            irr_mensal = _somar_meses(irr_horaria) / DIAS_MES
+    taxa_min = _coluna(taxa_min_kwh, n)
+    irr = _matriz_mensal(irr_mensal, n)
+    temp = _matriz_mensal(temp_mensal, n)
+    fin = _coluna(financiar, n, dtype=bool)
+    latitude = _coluna(latitude, n)
+    inflacao = _coluna(config.INFLACAO_ENERGETICA_AA if inflacao is None else inflacao, n)
+    degradacao = _coluna(config.DEGRADACAO_ANUAL if degradacao is None else degradacao, n)
+
+    PR, qtd, pot_wp, inv_w, capex, meses_fin, parcela, capex_vista = _projetar(consumo, irr, temp, fin, taxa_aa, meses)
+
+    por_cliente = None if isinstance(perfil, str) or np.ndim(perfil) < 2 else np.asarray(perfil, dtype=float)
+    forma = (n, MESES_SIMULACAO)
+    conta_antiga, conta_nova, saldo = np.empty(forma), np.empty(forma), np.empty(forma)
+    geracao, autoconsumo = np.empty(forma), np.empty(forma)
+    bloco = max(1, int(tamanho_bloco))
+    for ini in range(0, n, bloco):
+        b = slice(ini, ini + bloco)
+        m = len(consumo[b])
+        if irr_horaria is None:
+            irr_h = sintetizar_irradiancia(irr[b], latitude[b])
+        else:
+            irr_h = np.broadcast_to(irr_horaria, (m, HORAS_ANO)) if irr_horaria.ndim == 1 else irr_horaria[b]
+        ger_ano1 = (irr_h * _MES_30_DIAS * (PR[b] * pot_wp[b] / 1000.0)[:, None]).astype(dtype)
+        carga = perfil_carga(perfil if por_cliente is None else por_cliente[b], consumo[b]).astype(dtype)
+
+        # Geração hora a hora dos 25 anos (m, 25, 8760) com degradação linear anual
+        fator_ano = (1.0 - degradacao[b, None] * _ANOS).astype(dtype)
+        ger_h = ger_ano1[:, None, :] * fator_ano[:, :, None]
+        geracao[b] = (_somar_meses(ger_ano1)[:, None, :] * fator_ano[:, :, None]).reshape(m, MESES_SIMULACAO)
+        np.minimum(ger_h, carga[:, None, :], out=ger_h)   # autoconsumo
+        autoconsumo[b] = _somar_meses(ger_h).reshape(m, MESES_SIMULACAO)
+
+        if n == 1 or np.all(inflacao[b] == inflacao[0]):
+            tar, fio_b = _tarifas_padrao(float(inflacao[ini]))
+        else:
+            tar = _tarifa_mensal(config.TARIFA_BASE_R_KWH, inflacao[b])
+            fio_b = tar * (config.FIO_B_COMPONENTE * config.FIO_B_FATOR)
+        _simular_fluxo(
+            consumo[b, None], taxa_min[b, None], geracao[b], tar, fio_b,
+            parcela[b, None], meses_fin[b, None], -capex_vista[b, None],
+            out=(conta_antiga[b], conta_nova[b], saldo[b]), injecao_kwh=geracao[b] - autoconsumo[b],
+        )
+
+    total_sem = conta_antiga.sum(axis=1)
+    total_com = conta_nova.sum(axis=1) + capex_vista
+    ger_total = geracao.sum(axis=1)
+    fracao = np.divide(autoconsumo.sum(axis=1), ger_total, out=np.zeros(n), where=ger_total > 0)
+    return ResultadoHorario(qtd, pot_wp, inv_w, capex, parcela, conta_antiga, conta_nova, saldo, total_sem,
+                            total_com, geracao, autoconsumo, geracao - autoconsumo, fracao)
+
+
+def calcular_tudo_horario(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, financiar=False, fin_dados=None,
+                          inflacao_override=None, degradacao_override=None, latitude=LATITUDE_PADRAO,
+                          perfil="residencial", irr_horaria=None, dtype=np.float64):
+    """Versão horária de calcular_tudo para um cliente; retorna ResultadoCotacao."""
+    irr = None if irr_mensal is None else _to_month_array(irr_mensal)
+    taxa_aa, meses = (float(fin_dados[0]), int(fin_dados[1] or 0)) if financiar and fin_dados else (0.0, 0)
+    r = calcular_lote_horario(
+        consumo_kwh_mes, taxa_min_kwh, irr, _to_month_array(temp_mensal), latitude, perfil, bool(financiar),
+        taxa_aa, meses, inflacao_override, degradacao_override, irr_horaria, dtype,
+    )
+    return ResultadoCotacao.do_lote(r, 0, financiado=bool(financiar))
@@ -0,0 +1,322 @@
+"""Processamento em lote de propostas a partir de planilha CSV.
+
+Lê o esquema de `data/sample_inputs.csv` (cidade, consumo_medio, taxa_minima,
+financiar, taxa_juros, meses) em blocos, busca o clima uma única vez por
+cidade (e, com uma tabela de tarifas, as séries da distribuidora uma vez
+por distribuidora), distribui o dimensionamento/financeiro em um pool de processos e
+grava o resumo de cada linha em um CSV de saída à medida que os blocos
+terminam (memória limitada ao tamanho do bloco). Opcionalmente, as séries
+mensais completas vão para um diretório colunar (src.exportacao) e as
+propostas para relatórios PDF (src.relatorio).
+"""
+import csv
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import config
+from .engineering import ResultadoCotacao, calcular_lote, calcular_payback, _tarifas_padrao, _to_month_array
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_CHUNK = 1000
+
+COLUNAS_ENTRADA = ["cidade", "consumo_medio", "taxa_minima", "financiar", "taxa_juros", "meses"]
+COLUNAS_SAIDA = COLUNAS_ENTRADA + [
+    "qtd_modulos",
+    "potencia_kwp",
+    "inversor_kw",
+    "capex",
+    "parcela",
+    "payback_meses",
+    "total_sem_solar",
+    "total_com_solar",
+    "economia_25_anos",
+    "dashboard",
+    "pdf",
+    "erro",
+]
+
+_VERDADEIRO = {"sim", "s", "true", "1", "yes", "y"}
+
+
+def _numero(valor, tipo=float, padrao=0):
+    """Converte texto da planilha em número (aceita vírgula decimal e vazio)."""
+    texto = (valor or "").strip().replace(",", ".")
+    if not texto:
+        return padrao
+    return tipo(float(texto))
+
+
+def _parse_linha(linha):
+    """Normaliza uma linha da planilha; erros viram a chave 'erro'."""
+    item = {c: (linha.get(c) or "").strip() for c in COLUNAS_ENTRADA}
+    item["erro"] = ""
+    try:
+        item["_consumo"] = _numero(item["consumo_medio"])
+        item["_taxa_min"] = _numero(item["taxa_minima"], int)
+        item["_financiar"] = item["financiar"].lower() in _VERDADEIRO
+        item["_taxa_aa"] = _numero(item["taxa_juros"])
+        item["_meses"] = _numero(item["meses"], int)
+    except ValueError as e:
+        item["erro"] = f"valor inválido: {e}"
+        return item
+    if not item["cidade"]:
+        item["erro"] = "cidade vazia"
+    elif item["_consumo"] <= 0:
+        item["erro"] = "consumo_medio deve ser > 0"
+    elif item["_taxa_min"] not in (30, 50, 100):
+        item["erro"] = "taxa_minima deve ser 30, 50 ou 100"
+    elif item["_financiar"] and (item["_taxa_aa"] <= 0 or item["_meses"] <= 0):
+        item["erro"] = "financiamento requer taxa_juros > 0 e meses > 0"
+    return item
+
+
+def ler_entradas(caminho, tamanho_chunk=TAMANHO_CHUNK):
+    """Gera listas de até `tamanho_chunk` linhas normalizadas do CSV de entrada."""
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        leitor = csv.DictReader(f, skipinitialspace=True)
+        bloco = []
+        for linha in leitor:
+            bloco.append(_parse_linha(linha))
+            if len(bloco) >= tamanho_chunk:
+                yield bloco
+                bloco = []
+        if bloco:
+            yield bloco
+
+
+def _simular_chunk(tarefa):
+    """Executa calcular_lote para um bloco da planilha (roda no worker).
+
+    Retorna (linhas do resumo, ResultadoLote se o bloco for exportado, senão None).
+    """
+    cidades, consumo, taxa_min, irr, temp, fin, taxa_aa, meses, out_dir, tarifas_bloco, exportar, out_dir_pdfs = tarefa
+    tarifas = None
+    if tarifas_bloco is not None:
+        # Séries (D, 300) das distribuidoras do bloco, expandidas por linha só aqui
+        idx, tar_d, fio_b_d = tarifas_bloco
+        tarifas = (tar_d[0], fio_b_d[0]) if len(tar_d) == 1 else (tar_d[idx], fio_b_d[idx])
+    r = calcular_lote(consumo, taxa_min, irr, temp, fin, taxa_aa, meses, tarifas=tarifas)
+    payback = calcular_payback(r.saldo)
+
+    dashboards = [""] * len(cidades)
+    if out_dir:
+        from .viz import _renderizador_processo
+        # Template montado uma vez por worker; cada linha só atualiza os dados
+        renderizador = _renderizador_processo()
+        for k, cidade in enumerate(cidades):
+            try:
+                dashboards[k] = renderizador.renderizar(
+                    cidade, r.pot_wp[k], r.conta_antiga[k], r.conta_nova[k], r.saldo[k],
+                    r.total_sem[k], r.total_com[k], r.parcela[k], bool(fin[k]),
+                    out_dir=out_dir,
+                )
+            except Exception as e:
+                logger.warning("Falha ao gerar dashboard de %s: %s", cidade, e)
+
+    pdfs = [""] * len(cidades)
+    if out_dir_pdfs:
+        from .relatorio import _gerar_pdf_cliente
+        os.makedirs(out_dir_pdfs, exist_ok=True)
+        for k, cidade in enumerate(cidades):
+            resultado = ResultadoCotacao.do_lote(r, k, financiado=bool(fin[k]))
+            pdfs[k] = _gerar_pdf_cliente((cidade, resultado, bool(fin[k]), out_dir_pdfs, True)) or ""
+
+    resumo = [
+        (
+            int(r.qtd[k]),
+            round(r.pot_wp[k] / 1000.0, 3),
+            round(r.inv_w[k] / 1000.0, 1),
+            round(float(r.capex[k]), 2),
+            round(float(r.parcela[k]), 2),
+            "" if np.isnan(payback[k]) else int(payback[k]),
+            round(float(r.total_sem[k]), 2),
+            round(float(r.total_com[k]), 2),
+            round(float(r.total_sem[k] - r.total_com[k]), 2),
+            dashboards[k],
+            pdfs[k],
+        )
+        for k in range(len(cidades))
+    ]
+    return resumo, (r if exportar else None)
+
+
+def _tarifas_do_bloco(cidades, tarifas_cidade):
+    """(índice por linha, tarifas (D, 300), fio_b (D, 300)) das D séries distintas do bloco."""
+    series, idx = {}, []
+    for cidade in cidades:
+        vetores = tarifas_cidade.get(cidade) or _tarifas_padrao(config.INFLACAO_ENERGETICA_AA)
+        idx.append(series.setdefault(id(vetores), (len(series), vetores))[0])
+    ordem = sorted(series.values(), key=lambda s: s[0])
+    return (np.array(idx, dtype=np.int64), np.array([v[0] for _, v in ordem]), np.array([v[1] for _, v in ordem]))
+
+
+def _montar_tarefa(linhas, clima, out_dir, tarifas_cidade=None, exportar=False, out_dir_pdfs=None):
+    """Monta os arrays do bloco; linhas sem clima recebem erro e ficam de fora."""
+    validas = []
+    for item in linhas:
+        if item["erro"]:
+            continue
+        irr, temp = clima.get(item["cidade"]) or (None, None)
+        if irr is None:
+            item["erro"] = "cidade não encontrada ou sem dados climáticos"
+            continue
+        validas.append(item)
+    if not validas:
+        return validas, None
+
+    # Vetores mensais convertidos uma vez por cidade
+    meses_cidade = {}
+    for item in validas:
+        if item["cidade"] not in meses_cidade:
+            irr, temp = clima[item["cidade"]]
+            meses_cidade[item["cidade"]] = (_to_month_array(irr), _to_month_array(temp))
+    tarefa = (
+        [it["cidade"] for it in validas],
+        np.array([it["_consumo"] for it in validas], dtype=float),
+        np.array([it["_taxa_min"] for it in validas], dtype=float),
+        np.array([meses_cidade[it["cidade"]][0] for it in validas]),
+        np.array([meses_cidade[it["cidade"]][1] for it in validas]),
+        np.array([it["_financiar"] for it in validas], dtype=bool),
+        np.array([it["_taxa_aa"] for it in validas], dtype=float),
+        np.array([it["_meses"] for it in validas], dtype=np.int64),
+        out_dir,
+        None if tarifas_cidade is None else _tarifas_do_bloco([it["cidade"] for it in validas], tarifas_cidade),
+        exportar,
+        out_dir_pdfs,
+    )
+    return validas, tarefa
+
+
+def _escrever(escritor, linhas, validas, resultados):
+    """Grava o bloco na ordem original da planilha."""
+    por_id = {id(it): res for it, res in zip(validas, resultados or [])}
+    vazio = ("",) * (len(COLUNAS_SAIDA) - len(COLUNAS_ENTRADA) - 1)
+    for item in linhas:
+        res = por_id.get(id(item), vazio)
+        escritor.writerow([item[c] for c in COLUNAS_ENTRADA] + list(res) + [item["erro"]])
+
+
+def processar_lote(entrada, saida, workers=None, tamanho_chunk=TAMANHO_CHUNK, out_dir_dashboards=None,
+                   obter_clima=None, tarifas=None, exportar=None, pdf=None, out_dir_pdfs=None, **kwargs_clima):
+    """Processa a planilha `entrada` e grava o resumo em `saida`.
+
+    workers: processos do pool (None = os.cpu_count(); 0 ou 1 = no próprio processo).
+    out_dir_dashboards: se informado, gera um PNG por linha nesse diretório.
+    obter_clima: função cidade -> (irr, temp); padrão geodata.get_data com
+    `kwargs_clima` (refresh_cache, ttl_seconds, retries, ...).
+    tarifas: tarifas.TabelaTarifas; cada cidade usa as séries da sua
+    distribuidora (as de config quando a cidade não está na tabela).
+    exportar: diretório colunar (exportacao.GravadorResultados) que recebe
+    escalares e séries mensais de cada linha válida; a coluna `linha` é a
+    posição da linha na planilha (0 = primeira linha de dados). Só substitui
+    o diretório ao fim do lote; um lote interrompido mantém a exportação anterior.
+    pdf: arquivo PDF único com as páginas (dashboard e datasheet) de todas
+    as linhas válidas, na ordem da planilha (src.relatorio.RelatorioPDF).
+    out_dir_pdfs: se informado, gera um PDF por linha nesse diretório.
+
+    Retorna um dict com contadores (linhas, ok, erros, cidades).
+    """
+    if obter_clima is None:
+        from .geodata import get_data
+
+        def obter_clima(cidade):
+            return get_data(cidade, **kwargs_clima)
+
+    workers = os.cpu_count() if workers is None else int(workers)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    max_pendentes = max(2, 2 * workers)
+
+    clima = {}
+    tarifas_cidade = None if tarifas is None else {}
+    stats = {"linhas": 0, "ok": 0, "erros": 0, "cidades": 0}
+    pendentes = deque()
+    gravador = None
+    if exportar:
+        from .exportacao import GravadorResultados
+        gravador = GravadorResultados(exportar)
+    relatorio = None
+    if pdf:
+        from .relatorio import RelatorioPDF
+        relatorio = RelatorioPDF(pdf)
+
+    def concluir(item_pendente):
+        linhas, validas, futuro, inicio = item_pendente
+        resultados, resultado_lote = futuro.result() if futuro is not None else (None, None)
+        _escrever(escritor, linhas, validas, resultados)
+        if resultado_lote is not None and gravador is not None:
+            posicao = {id(it): k for k, it in enumerate(linhas)}
+            gravador.acrescentar(resultado_lote, linhas=[inicio + posicao[id(it)] for it in validas])
+        if resultado_lote is not None and relatorio is not None:
+            for k, it in enumerate(validas):
+                relatorio.adicionar(it["cidade"], ResultadoCotacao.do_lote(resultado_lote, k, it["_financiar"]),
+                                    it["_financiar"])
+        stats["ok"] += len(resultados or [])
+        stats["erros"] += len(linhas) - len(resultados or [])
+
+    concluido = False
+    try:
+        with open(saida, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(COLUNAS_SAIDA)
+            for linhas in ler_entradas(entrada, tamanho_chunk):
+                inicio = stats["linhas"]
+                stats["linhas"] += len(linhas)
+                for cidade in {it["cidade"] for it in linhas if not it["erro"]}:
+                    if cidade not in clima:
+                        try:
+                            clima[cidade] = obter_clima(cidade)
+                        except Exception as e:
+                            # Só as linhas desta cidade ficam com erro; o resto do lote segue
+                            logger.warning("Falha ao obter o clima de %s: %s", cidade, e)
+                            clima[cidade] = None
+                        stats["cidades"] += 1
+                        if tarifas is not None:
+                            tarifas_cidade[cidade] = tarifas.vetores_cidade(cidade)
+                            if tarifas_cidade[cidade] is None:
+                                logger.warning("Sem distribuidora para %s; usando a tarifa padrão", cidade)
+
+                validas, tarefa = _montar_tarefa(linhas, clima, out_dir_dashboards, tarifas_cidade,
+                                                 gravador is not None or relatorio is not None, out_dir_pdfs)
+                if tarefa is None:
+                    futuro = None
+                elif pool is None:
+                    futuro = _Imediato(_simular_chunk(tarefa))
+                else:
+                    futuro = pool.submit(_simular_chunk, tarefa)
+                pendentes.append((linhas, validas, futuro, inicio))
+
+                # Backpressure: no máximo `max_pendentes` blocos em memória
+                while len(pendentes) >= max_pendentes:
+                    concluir(pendentes.popleft())
+            while pendentes:
+                concluir(pendentes.popleft())
+        concluido = True
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if gravador is not None:
+            # Lote interrompido: a exportação parcial é descartada e a anterior fica intacta
+            if concluido:
+                gravador.fechar()
+            else:
+                gravador.descartar()
+        if relatorio is not None:
+            relatorio.fechar()
+
+    logger.info("Lote concluído: %s", stats)
+    return stats
+
+
+class _Imediato:
+    """Resultado já calculado com a mesma interface de Future.result()."""
+
+    def __init__(self, valor):
+        self._valor = valor
+
+    def result(self):
+        return self._valor
@@ -45,12 +45,18 @@ def main():
         fin_data = None
 
     print("\n⏳ Calculando Engenharia e Financeiro...")
-    qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com = calcular_tudo(consumo, taxa_min, irr, temp, financiar, fin_data)
+    resultado = calcular_tudo(consumo, taxa_min, irr, temp, financiar, fin_data)
+    qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com = resultado
 
     print(f"\n💰 RESUMO COMERCIAL:")
     print(f"   Investimento Total: R$ {capex:,.2f}")
     if financiar:
         print(f"   Parcela Mensal: R$ {parc:,.2f}")
+    if resultado.ano_equilibrio is None:
+        print("   Payback: sem retorno em 25 anos")
+    else:
+        print(f"   Payback: {int(resultado.payback)} meses (ano {resultado.ano_equilibrio})")
+    print(f"   VPL: R$ {resultado.vpl():,.2f} | Economia em 25 anos: R$ {resultado.economia_total:,.2f}")
 
     input("\n[ENTER] para abrir os Gráficos...")
     plotar_dashboard_final(cidade, pot, ant, novo, saldo, tot_sem, tot_com, parc, financiar)
@@ -0,0 +1,139 @@
+"""Dimensionamento ótimo por VPL ou payback.
+
+Avalia, em uma única varredura vetorizada, as quantidades pares de módulos
+para um cliente; o inversor de cada candidato vem da mesma escada de
+calcular_tudo (_selecionar_inversor). A geração mensal por Wp instalado é
+calculada uma vez e apenas escalada por candidato; o fluxo de caixa (com
+Fio B e piso da taxa mínima) é o mesmo de engineering.
+
+O inversor não é otimizado: o modelo mensal não estima o clipping na
+potência CA, então trocar por um inversor menor só reduziria o capex e a
+varredura sempre escolheria o menor inversor viável.
+"""
+import logging
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+from .engineering import (
+    DB_HARDWARE, _ANO, _ANOS, _MES_CAL, _capex, _dimensionar,
+    _pr_termico, _selecionar_inversor, _simular_fluxo, _tarifas_padrao, _to_month_array, calcular_payback,
+)
+from .financiamento import parcela_price, vpl as calcular_vpl
+
+logger = logging.getLogger(__name__)
+
+CRITERIOS = ("vpl", "payback")
+FATOR_QTD_MAX = 2.0   # varre até o dobro do dimensionamento pela fórmula
+
+
+class Fronteira(NamedTuple):
+    """Candidatos avaliados (vetores alinhados, um item por quantidade de módulos).
+
+    pareto marca os candidatos não dominados em (menor capex, maior VPL).
+    """
+    qtd: np.ndarray
+    pot_wp: np.ndarray
+    inv_w: np.ndarray
+    capex: np.ndarray
+    parcela: np.ndarray
+    vpl: np.ndarray
+    payback: np.ndarray
+    economia: np.ndarray
+    pareto: np.ndarray
+
+
+class ResultadoOtimizacao(NamedTuple):
+    """Configuração ótima, configuração da fórmula atual e a fronteira completa."""
+    criterio: str
+    indice: int          # posição do ótimo na fronteira
+    indice_formula: int  # posição do dimensionamento de calcular_tudo
+    fronteira: Fronteira
+
+    def melhor(self):
+        """Dict com os valores do candidato ótimo."""
+        return {campo: getattr(self.fronteira, campo)[self.indice].item() for campo in Fronteira._fields}
+
+    def formula(self):
+        """Dict com os valores do dimensionamento pela fórmula."""
+        return {campo: getattr(self.fronteira, campo)[self.indice_formula].item() for campo in Fronteira._fields}
+
+
+def _candidatos(qtd_min, qtd_max):
+    """Quantidades pares de módulos e o inversor da escada para cada uma."""
+    qtd = np.arange(max(2, qtd_min + qtd_min % 2), qtd_max + 1, 2, dtype=np.int64)
+    return qtd, _selecionar_inversor(qtd * DB_HARDWARE['MODULO']['W'])
+
+
+def _marcar_pareto(capex, vpl):
+    """Não dominados: nenhum outro candidato com capex <= e VPL > (ou capex < e VPL >=)."""
+    ordem = np.lexsort((-vpl, capex))
+    vpl_ord = vpl[ordem]
+    melhor_ant = np.maximum.accumulate(np.concatenate(([-np.inf], vpl_ord[:-1])))
+    pareto = np.zeros(capex.size, dtype=bool)
+    pareto[ordem] = vpl_ord > melhor_ant
+    return pareto
+
+
+def otimizar_dimensionamento(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, financiar=False, taxa_aa=0.0,
+                             meses=0, criterio="vpl", taxa_desconto_aa=None, inflacao=None, degradacao=None,
+                             qtd_min=2, qtd_max=None, tarifas=None):
+    """Varre quantidades pares de módulos (inversor pela escada) e escolhe a melhor.
+
+    criterio: "vpl" (maior VPL descontado a `taxa_desconto_aa`, padrão
+    config.TAXA_DESCONTO_AA) ou "payback" (menor payback; empate pelo VPL).
+    qtd_max padrão: FATOR_QTD_MAX x o dimensionamento pela fórmula.
+    `tarifas` = (tarifa, fio_b) (300,) da distribuidora, como em calcular_tudo;
+    substitui a tarifa de config (e `inflacao`).
+
+    Retorna ResultadoOtimizacao.
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"criterio deve ser um de {CRITERIOS}")
+    taxa_desconto_aa = config.TAXA_DESCONTO_AA if taxa_desconto_aa is None else taxa_desconto_aa
+    inflacao = config.INFLACAO_ENERGETICA_AA if inflacao is None else inflacao
+    degradacao = config.DEGRADACAO_ANUAL if degradacao is None else degradacao
+
+    irr = _to_month_array(irr_mensal)
+    temp = _to_month_array(temp_mensal)
+    PR = float(_pr_termico(temp.sum() / 12.0))
+    qtd_formula = int(_dimensionar(float(consumo_kwh_mes), irr.sum() / 12.0, PR)[0])
+    qtd_max = int(qtd_max) if qtd_max is not None else int(np.ceil(qtd_formula * FATOR_QTD_MAX))
+    # O dimensionamento da fórmula sempre entra na varredura, para comparação
+    qtd, inv_w = _candidatos(min(int(qtd_min), qtd_formula), max(qtd_max, qtd_formula))
+    pot_wp = qtd * DB_HARDWARE['MODULO']['W']
+
+    # Geração por Wp (300,) calculada uma vez; cada candidato apenas a escala
+    ger_wp = irr[_MES_CAL] * (30.0 * PR / 1000.0) * (1.0 - degradacao * _ANOS)[_ANO]
+    ger_kwh = pot_wp[:, None] * ger_wp
+
+    fin = bool(financiar)
+    meses_fin = int(meses) if fin else 0
+    capex = _capex(qtd, inv_w)
+    parcela = parcela_price(capex, taxa_aa, meses_fin) if fin else np.zeros(qtd.size)
+    capex_vista = np.zeros(qtd.size) if fin else capex
+
+    if tarifas is not None:
+        tar, fio_b = (np.asarray(v, dtype=float) for v in tarifas)
+    else:
+        tar, fio_b = _tarifas_padrao(float(inflacao))
+    conta_antiga, conta_nova, saldo = _simular_fluxo(
+        float(consumo_kwh_mes), float(taxa_min_kwh), ger_kwh, tar, fio_b,
+        parcela[:, None], meses_fin, -capex_vista[:, None],
+    )
+    fluxo = conta_antiga - conta_nova
+    vpl = calcular_vpl(fluxo, taxa_desconto_aa, capex_vista)
+    economia = fluxo.sum(axis=1) - capex_vista
+    payback = calcular_payback(saldo)
+
+    if criterio == "vpl":
+        indice = int(np.argmax(vpl))
+    else:
+        indice = int(np.lexsort((-vpl, np.where(np.isnan(payback), np.inf, payback)))[0])
+    inv_formula = _selecionar_inversor(qtd_formula * DB_HARDWARE['MODULO']['W'])
+    indice_formula = int(np.flatnonzero((qtd == qtd_formula) & (inv_w == inv_formula))[0])
+
+    fronteira = Fronteira(qtd, pot_wp, inv_w, capex, parcela, vpl, payback, economia, _marcar_pareto(capex, vpl))
+    logger.debug("Otimização: %d candidatos, ótimo %d módulos / %d W", qtd.size, qtd[indice], inv_w[indice])
+    return ResultadoOtimizacao(criterio, indice, indice_formula, fronteira)
@@ -0,0 +1,136 @@
+"""Spans de tempo e contadores de operação.
+
+Os spans (`span("geodata.nasa")`) só registram algo depois de `ativar()`;
+desativados, devolvem um gerenciador de contexto nulo compartilhado, de modo
+que o custo nos caminhos quentes é uma checagem de flag. Os contadores
+(acertos/faltas de cache, vencidos servidos, retentativas...) estão sempre
+ligados e podem ser lidos por um processo de longa duração via
+`contadores()` ou `formato_prometheus()`.
+
+Sem dependências pesadas: este módulo é importado na partida da CLI.
+"""
+import contextlib
+import threading
+import time
+from collections import defaultdict
+
+MAX_SPANS = 100_000   # limite de spans guardados (processos longos não crescem sem fim)
+
+_ATIVO = False
+_NULO = contextlib.nullcontext()
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_SPANS = []
+_FASES = {}           # nome -> [chamadas, total_s, max_s]
+_CONTADORES = defaultdict(int)
+_INICIO = time.perf_counter()
+_INICIO_EPOCA = time.time()
+
+
+class _Span:
+    __slots__ = ("nome", "inicio", "profundidade")
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        pilha = getattr(_LOCAL, "pilha", None)
+        if pilha is None:
+            pilha = _LOCAL.pilha = []
+        self.profundidade = len(pilha)
+        pilha.append(self.nome)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracao = time.perf_counter() - self.inicio
+        _LOCAL.pilha.pop()
+        with _LOCK:
+            fase = _FASES.get(self.nome)
+            if fase is None:
+                _FASES[self.nome] = [1, duracao, duracao]
+            else:
+                fase[0] += 1
+                fase[1] += duracao
+                if duracao > fase[2]:
+                    fase[2] = duracao
+            if len(_SPANS) < MAX_SPANS:
+                _SPANS.append((self.nome, self.inicio - _INICIO, duracao, self.profundidade,
+                               threading.current_thread().name))
+        return False
+
+
+def span(nome):
+    """Gerenciador de contexto que mede a fase `nome` (nulo quando desativado)."""
+    return _Span(nome) if _ATIVO else _NULO
+
+
+def ativar():
+    """Liga a coleta de spans e zera o trace anterior."""
+    global _ATIVO, _INICIO, _INICIO_EPOCA
+    with _LOCK:
+        _SPANS.clear()
+        _FASES.clear()
+        _INICIO = time.perf_counter()
+        _INICIO_EPOCA = time.time()
+        _ATIVO = True
+
+
+def desativar():
+    global _ATIVO
+    _ATIVO = False
+
+
+def ativo():
+    return _ATIVO
+
+
+def contar(nome, n=1):
+    """Incrementa o contador `nome` (sempre ligado)."""
+    with _LOCK:
+        _CONTADORES[nome] += n
+
+
+def contadores():
+    """Cópia dos contadores atuais."""
+    with _LOCK:
+        return dict(_CONTADORES)
+
+
+def zerar_contadores():
+    with _LOCK:
+        _CONTADORES.clear()
+
+
+def trace():
+    """Dict serializável em JSON com spans, totais por fase e contadores."""
+    with _LOCK:
+        spans = [{"nome": n, "inicio_s": round(i, 6), "duracao_s": round(d, 6), "profundidade": p, "thread": t}
+                 for n, i, d, p, t in _SPANS]
+        fases = {n: {"chamadas": c, "total_s": round(tot, 6), "max_s": round(mx, 6)}
+                 for n, (c, tot, mx) in sorted(_FASES.items(), key=lambda kv: -kv[1][1])}
+        return {
+            "inicio_epoca": _INICIO_EPOCA,
+            "duracao_s": round(time.perf_counter() - _INICIO, 6),
+            "fases": fases,
+            "spans": spans,
+            "spans_descartados": max(0, sum(c for c, _, _ in _FASES.values()) - len(_SPANS)),
+            "contadores": dict(_CONTADORES),
+        }
+
+
+def formato_prometheus(prefixo="solar"):
+    """Contadores (e fases, se houver) no formato texto do Prometheus."""
+    linhas = []
+    for nome, valor in sorted(contadores().items()):
+        metrica = f"{prefixo}_{nome.replace('.', '_')}_total"
+        linhas.append(f"# TYPE {metrica} counter")
+        linhas.append(f"{metrica} {valor}")
+    with _LOCK:
+        fases = sorted(_FASES.items())
+    if fases:
+        linhas.append(f"# TYPE {prefixo}_fase_segundos summary")
+        for nome, (c, tot, _) in fases:
+            linhas.append(f'{prefixo}_fase_segundos_count{{fase="{nome}"}} {c}')
+            linhas.append(f'{prefixo}_fase_segundos_sum{{fase="{nome}"}} {tot:.6f}')
+    return "\n".join(linhas) + "\n"
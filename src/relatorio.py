@@ -0,0 +1,213 @@
+"""Relatórios PDF de propostas (campanhas com centenas de páginas).
+
+Cada proposta ocupa duas páginas: o dashboard (viz.RenderizadorDashboard) e
+o datasheet técnico (engineering.datasheet_tecnico) com o resumo financeiro.
+As duas figuras são montadas uma vez por processo e só têm os dados trocados
+a cada proposta; PdfPages grava cada página no arquivo assim que ela é
+desenhada e embute as fontes uma vez por arquivo, então a memória não cresce
+com o número de páginas. `gerar_pdf` junta tudo em um único PDF e
+`gerar_pdfs` grava um PDF por cliente em um pool de processos.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import perf
+from .engineering import DB_HARDWARE, datasheet_tecnico
+from .viz import RenderizadorDashboard, _nome_relatorio, _renderizador_processo
+
+logger = logging.getLogger(__name__)
+
+METADADOS_PADRAO = {"Creator": "SolarMaster Pro", "Title": "Propostas de energia solar"}
+
+
+def proposta_dashboard(cidade, resultado, financiado=False):
+    """Argumentos de RenderizadorDashboard.atualizar para um ResultadoCotacao."""
+    return dict(cidade=cidade, sistema_wp=resultado.pot_wp, conta_antiga=resultado.conta_antiga,
+                custo_novo=resultado.conta_nova, saldo=resultado.saldo, total_sem=resultado.total_sem,
+                total_com=resultado.total_com, parc=resultado.parcela, financiado=financiado)
+
+
+class PaginaDatasheet:
+    """Página do datasheet técnico e resumo financeiro (template reaproveitável, sem pyplot).
+
+    Rótulos, cores e posições são criados uma vez; cada proposta só troca os
+    textos dos valores e as alturas das barras de economia anual.
+    """
+
+    COR_FUNDO = RenderizadorDashboard.COR_FUNDO
+    COR_TEXTO = RenderizadorDashboard.COR_TEXTO
+
+    SECOES = (
+        ("ESTRUTURA E TELHADO", ("modulos", "Módulos"), ("area", "Área necessária"),
+         ("peso", "Peso total (carga)"), ("carga", "Distribuição")),
+        ("CONEXÃO ELÉTRICA", ("inversor", "Inversor selecionado"), ("corrente", "Corrente de saída"),
+         ("disjuntor", "Disjuntor recomendado"), ("cabo", "Cabo CA recomendado")),
+        ("RESUMO FINANCEIRO", ("investimento", "Investimento total"), ("parcela", "Parcela mensal"),
+         ("payback", "Payback"), ("economia", "Economia em 25 anos"), ("vpl", "VPL"), ("tir", "TIR")),
+    )
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import matplotlib.ticker as mtick
+
+        fig = Figure(figsize=(16, 10), facecolor=self.COR_FUNDO)
+        FigureCanvasAgg(fig)
+        gs = fig.add_gridspec(2, 3, height_ratios=[0.2, 1], top=0.97, bottom=0.52, left=0.05, right=0.97)
+        texto = dict(color=self.COR_TEXTO)
+
+        ax_head = fig.add_subplot(gs[0, :]); ax_head.axis('off')
+        self._cabecalho = ax_head.text(0.5, 0.5, "DATASHEET TÉCNICO", ha='center', fontsize=18,
+                                       fontweight='bold', **texto)
+
+        # Três colunas de rótulo/valor na metade superior
+        self._valores = {}
+        for coluna, (titulo, *campos) in enumerate(self.SECOES):
+            ax = fig.add_subplot(gs[1, coluna]); ax.axis('off')
+            ax.set_ylim(0, 1)
+            ax.text(0.0, 1.0, titulo, fontsize=14, fontweight='bold', va='baseline', **texto)
+            for i, (chave, rotulo) in enumerate(campos):
+                y = 0.8 - i * 0.14
+                ax.text(0.0, y, rotulo, fontsize=11, va='baseline', **texto)
+                self._valores[chave] = ax.text(0.95, y, "", fontsize=11, fontweight='bold', ha='right',
+                                               va='baseline', **texto)
+
+        # Economia anual (25 barras) na metade inferior
+        self._ax_anual = ax = fig.add_axes([0.06, 0.07, 0.9, 0.38], facecolor=self.COR_FUNDO)
+        self._barras_anual = ax.bar(np.arange(1, 26), np.ones(25), color='#27AE60')
+        ax.set_title("ECONOMIA ANUAL", fontweight='bold', **texto)
+        ax.set_xlabel("Ano")
+        ax.set_xlim(0.4, 25.6)
+        ax.yaxis.set_major_formatter(mtick.FuncFormatter(lambda x, p: f"{x/1000:,.1f}k"))
+        ax.grid(alpha=0.3, axis='y')
+        self.fig = fig
+
+    def atualizar(self, cidade, resultado, financiado=False):
+        """Preenche a página com o ResultadoCotacao de uma proposta."""
+        d = datasheet_tecnico(resultado.qtd, resultado.inv_w)
+        self._cabecalho.set_text(f"DATASHEET TÉCNICO: {cidade.upper()} ({resultado.pot_wp / 1000.0:.2f} kWp)")
+
+        pb = resultado.payback
+        valores = {
+            "modulos": f"{d.qtd_modulos} x {DB_HARDWARE['MODULO']['W']} Wp",
+            "area": f"{d.area_m2:.1f} m²",
+            "peso": f"{d.peso_kg:.0f} kg",
+            "carga": f"{d.carga_kg_m2:.1f} kg/m²",
+            "inversor": f"{d.inversor_kw:.1f} kW",
+            "corrente": f"{d.corrente_a:.1f} A",
+            "disjuntor": f"{d.disjuntor_a} A (Curva C)",
+            "cabo": d.cabo,
+            "investimento": f"R$ {resultado.capex:,.2f}",
+            "parcela": f"R$ {resultado.parcela:,.2f}" if financiado else "à vista",
+            "payback": "sem retorno" if pb != pb else f"{int(pb)} meses (ano {resultado.ano_equilibrio})",
+            "economia": f"R$ {resultado.economia_total:,.2f}",
+            "vpl": f"R$ {resultado.vpl():,.2f}",
+            "tir": "—" if resultado.tir != resultado.tir else f"{resultado.tir:.1%} a.a.",
+        }
+        for chave, valor in valores.items():
+            self._valores[chave].set_text(valor)
+
+        economia = resultado.economia_anual
+        for barra, valor in zip(self._barras_anual.patches, economia):
+            barra.set_height(valor)
+            barra.set_facecolor('#27AE60' if valor >= 0 else '#F39C12')
+        ymin, ymax = min(0.0, float(economia.min())), max(0.0, float(economia.max()))
+        margem = (ymax - ymin) * 0.05 or 1.0
+        self._ax_anual.set_ylim(ymin - margem, ymax + margem)
+
+
+_PAGINA = None
+
+
+def _pagina_processo():
+    """Template do datasheet do processo atual."""
+    global _PAGINA
+    if _PAGINA is None:
+        _PAGINA = PaginaDatasheet()
+    return _PAGINA
+
+
+class RelatorioPDF:
+    """PDF de várias páginas gravado em streaming (uma proposta por vez).
+
+    Uso:
+        with RelatorioPDF("campanha.pdf") as pdf:
+            for cidade, resultado, financiado in propostas:
+                pdf.adicionar(cidade, resultado, financiado)
+
+    datasheet=False grava só os dashboards.
+    """
+
+    def __init__(self, caminho, datasheet=True, metadados=None):
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        self.caminho = caminho
+        self.datasheet = datasheet
+        self.paginas = 0
+        self._dashboard = _renderizador_processo()
+        self._datasheet = _pagina_processo() if datasheet else None
+        self._pdf = PdfPages(caminho, metadata=dict(METADADOS_PADRAO, **(metadados or {})))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def _gravar(self, fig):
+        with perf.span("relatorio.pagina"):
+            self._pdf.savefig(fig, facecolor=fig.get_facecolor())
+        self.paginas += 1
+
+    def adicionar(self, cidade, resultado, financiado=False):
+        """Acrescenta as páginas de uma proposta (ResultadoCotacao)."""
+        self._dashboard.atualizar(**proposta_dashboard(cidade, resultado, financiado))
+        self._gravar(self._dashboard.fig)
+        if self._datasheet is not None:
+            self._datasheet.atualizar(cidade, resultado, financiado)
+            self._gravar(self._datasheet.fig)
+
+    def fechar(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+            logger.info("Relatório %s: %d páginas", self.caminho, self.paginas)
+
+
+def gerar_pdf(propostas, caminho, datasheet=True, metadados=None):
+    """Grava as propostas (iterável de (cidade, ResultadoCotacao, financiado)) em um único PDF.
+
+    As propostas são consumidas uma a uma (aceita geradores). Retorna o caminho.
+    """
+    with RelatorioPDF(caminho, datasheet=datasheet, metadados=metadados) as pdf:
+        for cidade, resultado, financiado in propostas:
+            pdf.adicionar(cidade, resultado, financiado)
+    return caminho
+
+
+def _gerar_pdf_cliente(args):
+    cidade, resultado, financiado, out_dir, datasheet = args
+    try:
+        caminho = _nome_relatorio(out_dir, cidade, ext="pdf", prefixo="Proposta")
+        return gerar_pdf([(cidade, resultado, financiado)], caminho, datasheet=datasheet)
+    except Exception as e:
+        logger.warning("Falha ao gerar PDF de %s: %s", cidade, e)
+        return None
+
+
+def gerar_pdfs(propostas, out_dir, workers=None, datasheet=True, chunksize=8):
+    """Um PDF por proposta em `out_dir`, em um pool de processos.
+
+    Cada worker monta os templates uma vez; workers=0 ou 1 gera no próprio
+    processo. Retorna os caminhos na ordem de entrada (None para falhas).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tarefas = ((cidade, resultado, financiado, out_dir, datasheet) for cidade, resultado, financiado in propostas)
+    workers = os.cpu_count() if workers is None else int(workers)
+    if workers <= 1:
+        return [_gerar_pdf_cliente(t) for t in tarefas]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_gerar_pdf_cliente, tarefas, chunksize=chunksize))
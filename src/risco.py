@@ -0,0 +1,189 @@
+"""Motor de risco Monte Carlo sobre inflação, degradação, tarifa e irradiação.
+
+O dimensionamento e o financiamento seguem o cenário determinístico de
+`calcular_lote`; o que varia por cenário são os caminhos anuais de
+inflação energética (AR(1)), choques tarifários, degradação dos módulos e
+anomalias de irradiação. Todos os cenários são simulados como uma matriz
+(cenários x 300) usando o mesmo fluxo de caixa de engineering.
+"""
+import logging
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from . import config
+from .engineering import (
+    MESES_SIMULACAO, _ANO, _ANOS, _MES_CAL, _pr_termico, _simular_fluxo, _to_month_array,
+    calcular_lote, calcular_payback,
+)
+
+logger = logging.getLogger(__name__)
+
+N_CENARIOS = 10_000
+PERCENTIS = (10, 50, 90)
+TAMANHO_BLOCO_CENARIOS = 1024   # cenários por bloco no fluxo de caixa (limita os temporários)
+_N_ANOS = MESES_SIMULACAO // 12
+
+
+class ParametrosRisco(NamedTuple):
+    """Distribuições dos cenários. Médias None usam os valores de config."""
+    inflacao_media: Optional[float] = None
+    inflacao_desvio: float = 0.03        # desvio anual da inflação energética
+    inflacao_persistencia: float = 0.6   # coeficiente AR(1) ano a ano
+    degradacao_media: Optional[float] = None
+    degradacao_desvio: float = 0.0015
+    choque_prob: float = 0.05            # probabilidade anual de reajuste extraordinário
+    choque_media: float = 0.10
+    choque_desvio: float = 0.05
+    irradiacao_desvio: float = 0.04      # anomalia anual multiplicativa da irradiação
+
+
+class ResultadoRisco(NamedTuple):
+    """Resultado de simular_cenarios.
+
+    saldo_bandas: (len(percentis), 300) percentis do saldo mês a mês.
+    payback: (cenários,) mês de retorno, NaN quando não há retorno.
+    economia: (cenários,) economia em 25 anos (total sem solar - total com solar).
+    payback_percentis / economia_percentis: (len(percentis),); payback NaN
+    indica que aquele percentil não retorna dentro do horizonte.
+    """
+    percentis: Tuple[float, ...]
+    saldo_bandas: np.ndarray
+    payback: np.ndarray
+    economia: np.ndarray
+    payback_percentis: np.ndarray
+    economia_percentis: np.ndarray
+    prob_sem_retorno: float
+    qtd: int
+    pot_wp: int
+    capex: float
+    parcela: float
+    saldo_base: np.ndarray
+
+
+def _amostrar_inflacao(rng, n, media, desvio, persistencia):
+    """Caminhos anuais (n, 25) de inflação AR(1) em torno de `media`."""
+    inovacao = desvio * np.sqrt(max(0.0, 1.0 - persistencia ** 2))
+    ruido = rng.standard_normal((n, _N_ANOS))
+    inflacao = np.empty((n, _N_ANOS))
+    inflacao[:, 0] = media + desvio * ruido[:, 0]
+    for a in range(1, _N_ANOS):
+        inflacao[:, a] = media + persistencia * (inflacao[:, a - 1] - media) + inovacao * ruido[:, a]
+    return inflacao
+
+
+def _fator_tarifa(rng, n, p):
+    """Fator acumulado (n, 25) da tarifa: inflação composta e choques persistentes.
+
+    O ano 0 usa a tarifa base, como em engineering._tarifa_mensal.
+    """
+    inflacao = _amostrar_inflacao(rng, n, p.inflacao_media, p.inflacao_desvio, p.inflacao_persistencia)
+    reajuste = 1.0 + inflacao
+    if p.choque_prob > 0:
+        ocorre = rng.random((n, _N_ANOS)) < p.choque_prob
+        choque = np.maximum(-0.5, rng.normal(p.choque_media, p.choque_desvio, (n, _N_ANOS)))
+        reajuste *= np.where(ocorre, 1.0 + choque, 1.0)
+    np.maximum(reajuste, 0.0, out=reajuste)
+    fator = np.ones((n, _N_ANOS))
+    np.cumprod(reajuste[:, :-1], axis=1, out=fator[:, 1:])
+    return fator
+
+
+def _fator_geracao(rng, n, p):
+    """Fator anual (n, 25) da geração: degradação linear e anomalia de irradiação."""
+    degradacao = np.maximum(0.0, rng.normal(p.degradacao_media, p.degradacao_desvio, n))
+    fator = 1.0 - degradacao[:, None] * _ANOS
+    if p.irradiacao_desvio > 0:
+        fator *= np.maximum(0.0, rng.normal(1.0, p.irradiacao_desvio, (n, _N_ANOS)))
+    return fator
+
+
+def _percentil_payback(payback, percentis):
+    """Percentis pelo posto mais próximo; cenários sem retorno contam como +inf (viram NaN)."""
+    ordenado = np.sort(np.where(np.isnan(payback), np.inf, payback))
+    n = ordenado.size
+    idx = np.clip(np.ceil(np.asarray(percentis, dtype=float) / 100.0 * n).astype(np.int64) - 1, 0, n - 1)
+    valores = ordenado[idx]
+    return np.where(np.isinf(valores), np.nan, valores)
+
+
+def simular_cenarios(consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal, financiar=False, taxa_aa=0.0, meses=0,
+                     n_cenarios=N_CENARIOS, parametros=None, percentis=PERCENTIS, seed=None,
+                     tamanho_bloco=TAMANHO_BLOCO_CENARIOS, tarifas=None):
+    """Simula `n_cenarios` caminhos de risco para um cliente.
+
+    Os argumentos do cliente seguem calcular_tudo/calcular_lote (escalares;
+    irr_mensal e temp_mensal com 12 meses). `parametros` é um
+    ParametrosRisco; `seed` torna a amostragem reprodutível.
+
+    `tarifas` = (tarifa, fio_b) (300,) da distribuidora, montadas com a
+    inflação média dos parâmetros (tarifas.TabelaTarifas.vetores): são o
+    caminho médio, e cada cenário as escala pelo seu desvio em relação a ele.
+
+    Retorna ResultadoRisco.
+    """
+    p = parametros or ParametrosRisco()
+    p = p._replace(
+        inflacao_media=config.INFLACAO_ENERGETICA_AA if p.inflacao_media is None else p.inflacao_media,
+        degradacao_media=config.DEGRADACAO_ANUAL if p.degradacao_media is None else p.degradacao_media,
+    )
+    n = max(1, int(n_cenarios))
+    irr = _to_month_array(irr_mensal)
+    temp = _to_month_array(temp_mensal)
+
+    # Dimensionamento e financiamento do cenário determinístico
+    base = calcular_lote(consumo_kwh_mes, taxa_min_kwh, irr, temp, financiar, taxa_aa, meses,
+                         inflacao=p.inflacao_media, degradacao=p.degradacao_media, tarifas=tarifas)
+    fin = bool(financiar)
+    meses_fin = int(meses) if fin else 0
+    capex_vista = 0.0 if fin else float(base.capex[0])
+    PR = float(_pr_termico(temp.sum() / 12.0))
+    ger_mes = irr[_MES_CAL] * (float(base.pot_wp[0]) / 1000.0 * 30.0 * PR)   # (300,) sem degradação
+
+    rng = np.random.default_rng(seed)
+    fator_tar = _fator_tarifa(rng, n, p)
+    fator_ger = _fator_geracao(rng, n, p)
+    if tarifas is not None:
+        tar_ref, fio_b_ref = (np.asarray(v, dtype=float) for v in tarifas)
+        fator_tar /= (1.0 + p.inflacao_media) ** _ANOS   # desvio do cenário em relação ao caminho médio
+
+    fio_b_rel = config.FIO_B_COMPONENTE * config.FIO_B_FATOR
+    saldo = np.empty((n, MESES_SIMULACAO))
+    economia = np.empty(n)
+    bloco = max(1, int(tamanho_bloco))
+    conta_antiga = np.empty((min(bloco, n), MESES_SIMULACAO))
+    conta_nova = np.empty_like(conta_antiga)
+    for ini in range(0, n, bloco):
+        b = slice(ini, ini + bloco)
+        m = min(bloco, n - ini)
+        if tarifas is None:
+            tar = config.TARIFA_BASE_R_KWH * fator_tar[b][:, _ANO]
+            fio_b = tar * fio_b_rel
+        else:
+            desvio = fator_tar[b][:, _ANO]
+            tar, fio_b = tar_ref * desvio, fio_b_ref * desvio
+        ger = fator_ger[b][:, _ANO]
+        ger *= ger_mes
+        _simular_fluxo(
+            consumo_kwh_mes, taxa_min_kwh, ger, tar, fio_b,
+            float(base.parcela[0]), meses_fin, -capex_vista,
+            out=(conta_antiga[:m], conta_nova[:m], saldo[b]),
+        )
+        economia[b] = conta_antiga[:m].sum(axis=1) - conta_nova[:m].sum(axis=1) - capex_vista
+
+    percentis = tuple(float(q) for q in percentis)
+    payback = calcular_payback(saldo)
+    return ResultadoRisco(
+        percentis=percentis,
+        saldo_bandas=np.percentile(saldo, percentis, axis=0),
+        payback=payback,
+        economia=economia,
+        payback_percentis=_percentil_payback(payback, percentis),
+        economia_percentis=np.percentile(economia, percentis),
+        prob_sem_retorno=float(np.isnan(payback).mean()),
+        qtd=int(base.qtd[0]),
+        pot_wp=int(base.pot_wp[0]),
+        capex=float(base.capex[0]),
+        parcela=float(base.parcela[0]),
+        saldo_base=base.saldo[0],
+    )
@@ -0,0 +1,331 @@
+"""Servidor HTTP/JSON de cotações de longa duração.
+
+Mantém em memória o clima já consultado e o template do dashboard, e unifica
+pedidos simultâneos da mesma cidade em uma única busca (single-flight). As
+conexões são atendidas por um pool limitado de threads (E/S); os PNGs são
+renderizados em um pool limitado de processos, cada um com seu template.
+
+    POST /cotacao      {"cidade", "consumo", "taxa", "financiar", "taxa_aa", "meses",
+                        "inflacao", "degradacao"} -> JSON
+    POST /cotacao.png  mesmo corpo -> image/png
+    GET  /saude        estado do servidor
+    GET  /metrics      contadores (formato Prometheus)
+
+    python -m src.cli serve --porta 8080
+"""
+import json
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from . import perf
+from .engineering import calcular_tudo
+from .geodata import _VooUnico, _normalizar_cidade, get_data
+from .viz import _renderizador_processo, _renderizar_png
+
+logger = logging.getLogger(__name__)
+
+PORTA_PADRAO = 8080
+WORKERS_IO = 16          # conexões atendidas simultaneamente
+WORKERS_PNG = 2          # processos de renderização (0 = no próprio processo, serializado)
+TTL_MEMORIA_S = 6 * 3600  # idade máxima do clima mantido em memória
+TAMANHO_MAX_CORPO = 64 * 1024
+TAXAS_MINIMAS = (30, 50, 100)
+
+
+def _aquecer_renderizador(dpi):
+    _renderizador_processo(dpi)
+    return True
+
+
+def _numero(dados, campo, padrao=None, tipo=float):
+    """Número finito do campo; com tipo=int, só valores inteiros (50 ou 50.0, nunca 50.7 ou true)."""
+    valor = dados.get(campo, padrao)
+    if valor is None:
+        return None
+    invalido = ValueError(f"campo '{campo}' inválido: {valor!r}")
+    if isinstance(valor, bool):   # bool é int em Python: true não pode virar 1
+        raise invalido
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError, OverflowError):   # OverflowError: inteiros enormes
+        raise invalido
+    if not math.isfinite(numero):
+        raise invalido
+    if tipo is int:
+        if not numero.is_integer():
+            raise invalido
+        return int(valor) if isinstance(valor, int) else int(numero)
+    return numero
+
+
+_VERDADEIRO = {"sim", "s", "true", "1", "yes", "y"}
+_FALSO = {"nao", "não", "n", "false", "0", "no", ""}
+
+
+def _booleano(dados, campo, padrao=False):
+    """true/false do JSON, 0/1 ou os textos de _VERDADEIRO/_FALSO; qualquer outro valor é inválido."""
+    valor = dados.get(campo, padrao)
+    if valor is None:
+        return padrao
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, int) and valor in (0, 1):
+        return bool(valor)
+    if isinstance(valor, str):
+        texto = valor.strip().lower()
+        if texto in _VERDADEIRO or texto in _FALSO:
+            return texto in _VERDADEIRO
+    raise ValueError(f"campo '{campo}' inválido: {valor!r} (use true ou false)")
+
+
+def validar_pedido(dados):
+    """Normaliza o corpo JSON de uma cotação; ValueError com a mensagem para o cliente."""
+    if not isinstance(dados, dict):
+        raise ValueError("o corpo deve ser um objeto JSON")
+    cidade = str(dados.get("cidade") or "").strip()
+    if not cidade:
+        raise ValueError("campo 'cidade' obrigatório")
+    consumo = _numero(dados, "consumo")
+    if consumo is None or consumo <= 0:
+        raise ValueError("campo 'consumo' deve ser > 0")
+    taxa = _numero(dados, "taxa", 50, int)
+    if taxa not in TAXAS_MINIMAS:
+        raise ValueError(f"campo 'taxa' deve ser um de {TAXAS_MINIMAS}")
+    financiar = _booleano(dados, "financiar")
+    taxa_aa = _numero(dados, "taxa_aa", 0.0)
+    meses = _numero(dados, "meses", 0, int)
+    if financiar and (taxa_aa <= 0 or meses <= 0):
+        raise ValueError("para financiar, informe 'taxa_aa' > 0 e 'meses' > 0")
+    return {
+        "cidade": cidade, "consumo": consumo, "taxa": taxa, "financiar": financiar,
+        "taxa_aa": taxa_aa, "meses": meses,
+        "inflacao": _numero(dados, "inflacao"), "degradacao": _numero(dados, "degradacao"),
+    }
+
+
+class ServidorCotacao:
+    """Estado quente do serviço: clima em memória, voo único por cidade e pools limitados.
+
+    obter_clima(cidade) -> (irr, temp) substitui a busca padrão (get_data com
+    stale-while-revalidate, que também atualiza a memória quando o dado novo
+    chega). `kwargs_clima` são repassados a get_data.
+    """
+
+    def __init__(self, host="127.0.0.1", porta=PORTA_PADRAO, workers_io=WORKERS_IO, workers_png=WORKERS_PNG,
+                 ttl_memoria_s=TTL_MEMORIA_S, dpi=150, obter_clima=None, **kwargs_clima):
+        self.endereco = (host, int(porta))
+        self.workers_io = max(1, int(workers_io))
+        self.workers_png = max(0, int(workers_png))
+        self.ttl_memoria_s = ttl_memoria_s
+        self.dpi = dpi
+        self._obter_clima = obter_clima
+        self._kwargs_clima = kwargs_clima
+        self._clima = {}          # cidade normalizada -> (irr, temp, instante)
+        self._clima_lock = threading.Lock()
+        self._voo = _VooUnico()
+        self._png_lock = threading.Lock()
+        self._pool_io = None
+        self._pool_png = None
+        self._http = None
+        self._thread = None
+        self.inicio = time.time()
+
+    # --- clima ---------------------------------------------------------
+
+    def _guardar_clima(self, cidade, irr, temp):
+        with self._clima_lock:
+            self._clima[_normalizar_cidade(cidade)] = (irr, temp, time.monotonic())
+
+    def _buscar_clima(self, cidade):
+        if self._obter_clima is not None:
+            irr, temp = self._obter_clima(cidade)
+        else:
+            irr, temp = get_data(cidade, stale_while_revalidate=True, on_refresh=self._guardar_clima, **self._kwargs_clima)
+        if irr is not None:
+            self._guardar_clima(cidade, irr, temp)
+        return irr, temp
+
+    def clima(self, cidade):
+        """(irr, temp) da memória ou de uma única busca compartilhada pelos pedidos simultâneos."""
+        chave = _normalizar_cidade(cidade)
+        with self._clima_lock:
+            item = self._clima.get(chave)
+        if item is not None and (not self.ttl_memoria_s or time.monotonic() - item[2] <= self.ttl_memoria_s):
+            perf.contar("servidor_clima_memoria")
+            return item[0], item[1]
+        perf.contar("servidor_clima_busca")
+        return self._voo.executar(chave, lambda: self._buscar_clima(cidade))
+
+    # --- cotação -------------------------------------------------------
+
+    def _calcular(self, pedido):
+        irr, temp = self.clima(pedido["cidade"])
+        if irr is None:
+            raise LookupError(f"cidade não encontrada: {pedido['cidade']}")
+        fin_dados = (pedido["taxa_aa"], pedido["meses"]) if pedido["financiar"] else None
+        with perf.span("servidor.calculo"):
+            resultado = calcular_tudo(pedido["consumo"], pedido["taxa"], irr, temp, pedido["financiar"], fin_dados,
+                                      inflacao_override=pedido["inflacao"], degradacao_override=pedido["degradacao"])
+        return resultado
+
+    def cotar(self, dados):
+        """Cotação JSON (dict serializável) para o corpo `dados`."""
+        pedido = validar_pedido(dados)
+        r = self._calcular(pedido)
+        perf.contar("servidor_cotacoes")
+        return {
+            "cidade": pedido["cidade"],
+            "qtd_modulos": int(r.qtd),
+            "potencia_kwp": r.pot_wp / 1000.0,
+            "investimento": float(r.capex),
+            "parcela": float(r.parcela),
+            "total_sem_solar": float(r.total_sem),
+            "total_com_solar": float(r.total_com),
+            "economia_25_anos": float(r.economia_total),
+            "payback_meses": None if math.isnan(r.payback) else int(r.payback),
+            "vpl": round(r.vpl(), 2),
+            "tir_aa": None if math.isnan(r.tir) else round(r.tir, 4),
+            "saldo_anual": [round(float(v), 2) for v in r.saldo_anual],
+        }
+
+    def cotar_png(self, dados):
+        """Bytes PNG do dashboard da cotação."""
+        pedido = validar_pedido(dados)
+        qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com = self._calcular(pedido)
+        proposta = dict(cidade=pedido["cidade"], sistema_wp=pot, conta_antiga=ant, custo_novo=novo, saldo=saldo,
+                        total_sem=tot_sem, total_com=tot_com, parc=parc, financiado=pedido["financiar"])
+        perf.contar("servidor_cotacoes_png")
+        with perf.span("servidor.png"):
+            if self._pool_png is None:
+                with self._png_lock:   # template único do processo: uma renderização por vez
+                    return _renderizar_png((proposta, self.dpi))
+            return self._pool_png.submit(_renderizar_png, (proposta, self.dpi)).result()
+
+    def saude(self):
+        with self._clima_lock:
+            cidades = len(self._clima)
+        return {"status": "ok", "cidades_em_memoria": cidades, "uptime_s": round(time.time() - self.inicio, 1),
+                "workers_io": self.workers_io, "workers_png": self.workers_png}
+
+    # --- ciclo de vida -------------------------------------------------
+
+    def iniciar(self):
+        """Aquece os renderizadores, abre a porta e atende em uma thread de fundo. Retorna a porta."""
+        if self.workers_png:
+            self._pool_png = ProcessPoolExecutor(max_workers=self.workers_png)
+            for f in [self._pool_png.submit(_aquecer_renderizador, self.dpi) for _ in range(self.workers_png)]:
+                f.result()
+        else:
+            _aquecer_renderizador(self.dpi)
+        self._pool_io = ThreadPoolExecutor(max_workers=self.workers_io, thread_name_prefix="cotacao")
+        self._http = _HTTPServidor(self.endereco, _Handler, self._pool_io, self)
+        self.endereco = self._http.server_address[:2]
+        self._thread = threading.Thread(target=self._http.serve_forever, name="servidor-cotacao", daemon=True)
+        self._thread.start()
+        logger.info("Servidor de cotações em http://%s:%d", *self.endereco)
+        return self.endereco[1]
+
+    def parar(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+        for pool in (self._pool_io, self._pool_png):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._pool_io = self._pool_png = None
+
+    def servir(self):
+        """Bloqueia atendendo até Ctrl+C."""
+        self.iniciar()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.parar()
+
+
+class _HTTPServidor(HTTPServer):
+    """HTTPServer que atende cada conexão em um pool de threads limitado."""
+
+    def __init__(self, endereco, handler, pool, cotacao):
+        self.pool = pool
+        self.cotacao = cotacao
+        super().__init__(endereco, handler)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1   # cabeçalho e corpo no mesmo segmento TCP (evita o atraso de ACK de ~40 ms)
+    timeout = 30    # conexões keep-alive ociosas liberam o worker
+
+    def log_message(self, formato, *args):
+        logger.debug("%s " + formato, self.address_string(), *args)
+
+    def _responder(self, status, corpo, tipo="application/json"):
+        if tipo == "application/json":
+            corpo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        if self.path == "/saude":
+            return self._responder(200, self.server.cotacao.saude())
+        if self.path == "/metrics":
+            return self._responder(200, perf.formato_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        self._responder(404, {"erro": "rota não encontrada"})
+
+    def do_POST(self):
+        cotacao = self.server.cotacao
+        rotas = {"/cotacao": cotacao.cotar, "/cotacao.png": cotacao.cotar_png}
+        funcao = rotas.get(self.path)
+        if funcao is None:
+            self.close_connection = True
+            return self._responder(404, {"erro": "rota não encontrada"})
+        try:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0 or tamanho > TAMANHO_MAX_CORPO:
+            # Sem um tamanho válido o corpo não pode ser lido com segurança: descarta a conexão
+            self.close_connection = True
+            perf.contar("servidor_erros_pedido")
+            if tamanho < 0:
+                return self._responder(400, {"erro": "cabeçalho Content-Length inválido"})
+            return self._responder(413, {"erro": "corpo muito grande"})
+        try:
+            dados = json.loads(self.rfile.read(tamanho) or b"{}")
+            resultado = funcao(dados)
+        except ValueError as e:   # inclui JSON malformado
+            perf.contar("servidor_erros_pedido")
+            return self._responder(400, {"erro": str(e)})
+        except LookupError as e:
+            perf.contar("servidor_erros_pedido")
+            return self._responder(404, {"erro": str(e)})
+        except Exception as e:
+            perf.contar("servidor_erros")
+            logger.exception("Falha ao cotar %s", self.path)
+            return self._responder(500, {"erro": f"falha interna: {e}"})
+        if isinstance(resultado, bytes):
+            return self._responder(200, resultado, "image/png")
+        self._responder(200, resultado)
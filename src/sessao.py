@@ -0,0 +1,132 @@
+"""Sessão de cotação com etapas memoizadas.
+
+Numa negociação a cidade e o consumo ficam fixos enquanto o vendedor altera
+taxa, prazo, inflação e degradação. A sessão guarda cada etapa de
+calcular_tudo (PR, dimensionamento, geração, contas, financiamento) chaveada
+pelas suas entradas, e uma nova cotação só recalcula as etapas afetadas:
+mudar `fin_dados`, por exemplo, refaz apenas a parcela e o saldo.
+"""
+import logging
+from collections import Counter
+
+import numpy as np
+
+from . import config
+from .engineering import (
+    _MES, ResultadoCotacao, _capex, _clima_mensal, _dados_financiamento, _dimensionar,
+    _geracao_mensal, _pr_termico, _selecionar_inversor, _simular_fluxo, _tarifas_padrao,
+)
+from .financiamento import parcela_price
+
+logger = logging.getLogger(__name__)
+
+MAX_VARIANTES = 32   # valores guardados por etapa (alternar entre opções não recalcula)
+
+
+def _somente_leitura(*arrays):
+    for a in arrays:
+        a.flags.writeable = False
+    return arrays if len(arrays) > 1 else arrays[0]
+
+
+class SessaoCotacao:
+    """Cotações sucessivas de um mesmo cliente, equivalentes a calcular_tudo.
+
+    `recalculos` conta quantas vezes cada etapa foi de fato calculada. As
+    séries devolvidas são compartilhadas com o cache e somente leitura.
+    """
+
+    def __init__(self, consumo_kwh_mes, taxa_min_kwh, irr_mensal, temp_mensal):
+        self.consumo = float(consumo_kwh_mes)
+        self.taxa_min = float(taxa_min_kwh)
+        self.irr, self.temp = _clima_mensal(irr_mensal, temp_mensal)
+        self.PR = float(_pr_termico(self.temp.sum() / 12.0))
+        self.recalculos = Counter()
+        self._etapas = {}
+
+    def _memo(self, etapa, chave, calcular):
+        cache = self._etapas.setdefault(etapa, {})
+        if chave in cache:
+            return cache[chave]
+        if len(cache) >= MAX_VARIANTES:
+            cache.pop(next(iter(cache)))
+        self.recalculos[etapa] += 1
+        valor = cache[chave] = calcular()
+        return valor
+
+    # --- etapas --------------------------------------------------------
+
+    def _dimensionamento(self, consumo):
+        """(qtd, pot_wp, inv_w, capex)."""
+        def calcular():
+            qtd, pot_wp = _dimensionar(np.array([consumo]), self.irr.sum() / 12.0, self.PR)
+            inv_w = _selecionar_inversor(pot_wp)
+            return int(qtd[0]), int(pot_wp[0]), float(inv_w[0]), float(_capex(qtd, inv_w)[0])
+        return self._memo("dimensionamento", consumo, calcular)
+
+    def _geracao(self, pot_wp, degradacao):
+        return self._memo("geracao", (pot_wp, degradacao), lambda: _somente_leitura(
+            _geracao_mensal(pot_wp, self.irr, self.PR, degradacao)))
+
+    def _contas(self, consumo, taxa_min, pot_wp, degradacao, inflacao, tarifas=None, fator_geracao=None):
+        """(conta_antiga, conta_nova sem parcelas) mês a mês.
+
+        `tarifas` (da distribuidora) entram na chave pelo conteúdo dos vetores;
+        `fator_geracao` escala a geração como em calcular_tudo.
+        """
+        def calcular():
+            tar, fio_b = _tarifas_padrao(inflacao) if tarifas is None else tarifas
+            ger_kwh = self._geracao(pot_wp, degradacao)
+            if fator_geracao is not None:
+                ger_kwh = ger_kwh * fator_geracao
+            antiga, nova, _ = _simular_fluxo(consumo, taxa_min, ger_kwh, tar, fio_b, 0.0, 0, 0.0)
+            return _somente_leitura(antiga, nova)
+        chave_tarifas = inflacao if tarifas is None else tuple(v.tobytes() for v in tarifas)
+        return self._memo("contas", (consumo, taxa_min, pot_wp, degradacao, chave_tarifas, fator_geracao), calcular)
+
+    def _financiamento(self, capex, financiar, taxa_aa, meses):
+        """(parcela, meses com parcela, investimento à vista)."""
+        def calcular():
+            if not financiar:
+                return 0.0, 0, capex
+            return float(parcela_price(capex, taxa_aa, meses)), meses, 0.0
+        return self._memo("financiamento", (capex, financiar, taxa_aa, meses), calcular)
+
+    # --- cotação -------------------------------------------------------
+
+    def cotar(self, financiar=False, fin_dados=None, inflacao_override=None, degradacao_override=None,
+              consumo_kwh_mes=None, taxa_min_kwh=None, tarifas=None, fator_geracao=None):
+        """ResultadoCotacao como o de calcular_tudo, reaproveitando as etapas cujas entradas não mudaram.
+
+        consumo_kwh_mes e taxa_min_kwh, quando informados, substituem os da sessão;
+        `tarifas` = (tarifa, fio_b) (300,) da distribuidora e `fator_geracao`
+        (nível de excedência, ex.: P90) como em calcular_tudo.
+        """
+        consumo = self.consumo if consumo_kwh_mes is None else float(consumo_kwh_mes)
+        taxa_min = self.taxa_min if taxa_min_kwh is None else float(taxa_min_kwh)
+        inflacao = float(config.INFLACAO_ENERGETICA_AA if inflacao_override is None else inflacao_override)
+        degradacao = float(config.DEGRADACAO_ANUAL if degradacao_override is None else degradacao_override)
+        taxa_aa, meses = _dados_financiamento(financiar, fin_dados)
+        if tarifas is not None:
+            tarifas = tuple(np.asarray(v, dtype=float) for v in tarifas)
+        fator_geracao = None if fator_geracao is None else float(fator_geracao)
+
+        qtd, pot_wp, inv_w, capex = self._dimensionamento(consumo)
+        conta_antiga, conta_base = self._contas(consumo, taxa_min, pot_wp, degradacao, inflacao, tarifas,
+                                                fator_geracao)
+        parcela, meses_fin, capex_vista = self._financiamento(capex, bool(financiar), taxa_aa, meses)
+
+        self.recalculos["saldo"] += 1
+        if meses_fin > 0:
+            conta_nova = _somente_leitura(conta_base + (_MES < meses_fin) * parcela)
+        else:
+            conta_nova = conta_base
+        saldo = np.subtract(conta_antiga, conta_nova)
+        np.cumsum(saldo, out=saldo)
+        saldo -= capex_vista
+        _somente_leitura(saldo)
+
+        return ResultadoCotacao(
+            qtd, pot_wp, inv_w, capex, parcela, conta_antiga, conta_nova, saldo,
+            float(conta_antiga.sum()), float(conta_nova.sum()) + capex_vista, capex_vista,
+        )
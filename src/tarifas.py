@@ -0,0 +1,180 @@
+"""Tarifas por distribuidora (TE/TUSD, Fio B, bandeiras e Tarifa Branca).
+
+Lê de data/tarifas/ a tabela de distribuidoras (distribuidoras.csv: TE e
+TUSD convencionais, Fio B, TE/TUSD por posto da Tarifa Branca e alíquota
+de tributos) e a área de concessão (areas.csv: UF -> distribuidora, com
+exceções por município). `TabelaTarifas.vetores` monta as séries mensais
+(300,) de tarifa e Fio B que engineering.calcular_tudo/calcular_lote
+consomem, com bandeiras por mês, reajuste anual e a transição do Fio B da
+Lei 14.300/2022 ano a ano; as séries ficam memoizadas por distribuidora.
+"""
+import csv
+import logging
+import os
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+
+from . import config
+from .geocodificador import normalizar_nome, separar_consulta
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tarifas")
+MESES_SIMULACAO = 300
+
+# Lei 14.300/2022, art. 27: fração do Fio B paga sobre a energia compensada
+# por quem pediu acesso a partir de 2023; de 2029 em diante, 100%
+FIO_B_TRANSICAO = {2023: 0.15, 2024: 0.30, 2025: 0.45, 2026: 0.60, 2027: 0.75, 2028: 0.90}
+# Art. 26: quem pediu acesso até 2022 não paga Fio B até o fim de 2045
+ANO_FIM_DIREITO_ADQUIRIDO = 2045
+
+# Adicional das bandeiras (R$/kWh, sem tributos) e bandeira esperada por mês (JAN..DEZ)
+ADICIONAL_BANDEIRA = {"verde": 0.0, "amarela": 0.01885, "vermelha1": 0.04463, "vermelha2": 0.07877}
+BANDEIRAS_PADRAO = ("verde", "verde", "verde", "verde", "verde", "amarela",
+                    "vermelha1", "vermelha1", "amarela", "amarela", "verde", "verde")
+
+MODALIDADES = ("convencional", "branca")
+# Consumo residencial típico por posto da Tarifa Branca (ponta, intermediário, fora de ponta)
+FRACOES_POSTO_PADRAO = (0.12, 0.10, 0.78)
+
+_ANOS = np.arange(MESES_SIMULACAO) // 12
+_MES_CAL = np.arange(MESES_SIMULACAO) % 12
+
+
+class Distribuidora(NamedTuple):
+    """Tarifas homologadas (R$/kWh, sem tributos) de uma distribuidora."""
+    codigo: str
+    nome: str
+    uf: str
+    te: float
+    tusd: float
+    fio_b: float
+    te_ponta: float
+    tusd_ponta: float
+    te_intermediario: float
+    tusd_intermediario: float
+    te_fora_ponta: float
+    tusd_fora_ponta: float
+    tributos: float   # fração do preço final (ICMS + PIS/COFINS)
+
+
+def fator_fio_b(anos, ano_pedido):
+    """Fração do Fio B paga em cada ano civil de `anos` por quem pediu acesso em `ano_pedido`."""
+    anos = np.asarray(anos)
+    if ano_pedido < min(FIO_B_TRANSICAO):
+        return np.where(anos <= ANO_FIM_DIREITO_ADQUIRIDO, 0.0, 1.0)
+    fator = np.where(anos < min(FIO_B_TRANSICAO), 0.0, 1.0)
+    for ano, fracao in FIO_B_TRANSICAO.items():
+        fator[anos == ano] = fracao
+    return fator
+
+
+class TabelaTarifas:
+    """Distribuidoras indexadas por código e área de concessão (UF e município)."""
+
+    def __init__(self, distribuidoras, areas, municipios=None):
+        self.distribuidoras = {d.codigo: d for d in distribuidoras}
+        self._por_uf = {}          # UF -> código
+        self._por_municipio = {}   # "nome|UF" -> código
+        self._municipios_uf = {}   # nome -> UFs com exceção (consultas sem UF)
+        for uf, municipio, codigo in areas:
+            if codigo not in self.distribuidoras:
+                raise ValueError(f"distribuidora desconhecida na área de concessão: {codigo}")
+            if municipio:
+                nome = normalizar_nome(municipio)
+                self._por_municipio[f"{nome}|{uf}"] = codigo
+                self._municipios_uf.setdefault(nome, []).append(uf)
+            else:
+                self._por_uf[uf] = codigo
+        self.municipios = municipios   # geocodificador.IndiceMunicipios para consultas sem UF
+        self._vetores = {}
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_PADRAO, municipios=None):
+        """Lê distribuidoras.csv e areas.csv de `diretorio`."""
+        campos = Distribuidora._fields
+        with open(os.path.join(diretorio, "distribuidoras.csv"), encoding="utf-8-sig", newline="") as f:
+            distribuidoras = [
+                Distribuidora(*(l[c].strip() for c in campos[:3]), *(float(l[c]) for c in campos[3:]))
+                for l in csv.DictReader(f)
+            ]
+        with open(os.path.join(diretorio, "areas.csv"), encoding="utf-8-sig", newline="") as f:
+            areas = [(l["uf"].strip().upper(), (l.get("municipio") or "").strip(), l["distribuidora"].strip())
+                     for l in csv.DictReader(f)]
+        logger.info("Tarifas %s: %d distribuidoras, %d áreas", diretorio, len(distribuidoras), len(areas))
+        return cls(distribuidoras, areas, municipios)
+
+    def distribuidora(self, codigo):
+        return self.distribuidoras[codigo]
+
+    def localizar(self, cidade):
+        """Distribuidora que atende "Cidade, UF" (UF opcional) ou None."""
+        nome, uf = separar_consulta(cidade)
+        if uf is None:
+            ufs = self._municipios_uf.get(nome, ())
+            if len(ufs) == 1:
+                uf = ufs[0]
+            elif self.municipios is not None:
+                municipio = self.municipios.localizar(cidade)
+                uf = municipio.uf if municipio is not None else None
+                nome = normalizar_nome(municipio.nome) if municipio is not None else nome
+        if uf is None:
+            return None
+        codigo = self._por_municipio.get(f"{nome}|{uf}") or self._por_uf.get(uf)
+        return None if codigo is None else self.distribuidoras[codigo]
+
+    def vetores(self, codigo, inflacao=None, ano_inicio=None, ano_pedido=None, modalidade="convencional",
+                fracoes_posto=FRACOES_POSTO_PADRAO, bandeiras=BANDEIRAS_PADRAO):
+        """(tarifa, fio_b) em R$/kWh com tributos, mês a mês (300,), somente leitura.
+
+        O mês 0 é janeiro de `ano_inicio` (padrão: ano corrente); o reajuste
+        anual usa `inflacao` (padrão config.INFLACAO_ENERGETICA_AA) e a fração
+        do Fio B segue a Lei 14.300 para o pedido de acesso em `ano_pedido`
+        (padrão: `ano_inicio`). Na Tarifa Branca a tarifa é a média dos
+        postos ponderada por `fracoes_posto`.
+        """
+        inflacao = float(config.INFLACAO_ENERGETICA_AA if inflacao is None else inflacao)
+        ano_inicio = int(date.today().year if ano_inicio is None else ano_inicio)
+        ano_pedido = int(ano_inicio if ano_pedido is None else ano_pedido)
+        if modalidade not in MODALIDADES:
+            raise ValueError(f"modalidade deve ser uma de {MODALIDADES}")
+        chave = (codigo, inflacao, ano_inicio, ano_pedido, modalidade, tuple(fracoes_posto), tuple(bandeiras))
+        vetores = self._vetores.get(chave)
+        if vetores is None:
+            vetores = self._vetores[chave] = self._montar(self.distribuidoras[codigo], *chave[1:])
+        return vetores
+
+    @staticmethod
+    def _montar(d, inflacao, ano_inicio, ano_pedido, modalidade, fracoes_posto, bandeiras):
+        if modalidade == "branca":
+            ponta, intermediario, fora = fracoes_posto
+            energia = (ponta * (d.te_ponta + d.tusd_ponta) + intermediario * (d.te_intermediario + d.tusd_intermediario)
+                       + fora * (d.te_fora_ponta + d.tusd_fora_ponta)) / (ponta + intermediario + fora)
+        else:
+            energia = d.te + d.tusd
+        bandeira = np.array([ADICIONAL_BANDEIRA[b] for b in bandeiras])
+        reajuste = (1.0 + inflacao) ** _ANOS / (1.0 - d.tributos)
+        tarifa = (energia + bandeira[_MES_CAL]) * reajuste
+        fio_b = d.fio_b * reajuste * fator_fio_b(ano_inicio + _ANOS, ano_pedido)
+        tarifa.flags.writeable = False
+        fio_b.flags.writeable = False
+        return tarifa, fio_b
+
+    def vetores_cidade(self, cidade, **kwargs):
+        """vetores() da distribuidora de `cidade`; None se a cidade não tiver distribuidora na tabela."""
+        d = self.localizar(cidade)
+        return None if d is None else self.vetores(d.codigo, **kwargs)
+
+
+_TABELAS = {}
+
+
+def carregar_tabela(diretorio=DIRETORIO_PADRAO):
+    """TabelaTarifas de `diretorio`, carregada uma vez por processo (usa o índice de municípios de geodata)."""
+    tabela = _TABELAS.get(diretorio)
+    if tabela is None:
+        from .geodata import _indice_municipios
+        tabela = _TABELAS[diretorio] = TabelaTarifas.carregar(diretorio, municipios=_indice_municipios())
+    return tabela
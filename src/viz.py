@@ -1,8 +1,19 @@
+import io
+import os
+import logging
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
+
+from . import perf
+
+# matplotlib é importado dentro das funções: carregá-lo custa centenas de ms
+# e só é necessário quando um gráfico é de fato gerado.
 
 def plot_monthly_savings(old_costs, new_costs):
+    import matplotlib.pyplot as plt
     dif = old_costs - new_costs
     color = '#27AE60' if dif >= 0 else '#F39C12'
     label = "ECONOMIA" if dif >= 0 else "INVESTIMENTO"
@@ -13,6 +24,7 @@ def plot_monthly_savings(old_costs, new_costs):
     plt.show()
 
 def plot_total_savings(total_without_solar, total_with_solar):
+    import matplotlib.pyplot as plt
     plt.barh([0, 1], [total_without_solar, total_with_solar], color=['#E74C3C', '#27AE60'])
     plt.yticks([0, 1], ['Sem Solar', 'Com Solar'])
     total_savings = total_without_solar - total_with_solar
@@ -22,6 +34,8 @@ def plot_total_savings(total_without_solar, total_with_solar):
     plt.show()
 
 def plot_wealth_growth(wealth_over_time):
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mtick
     years = np.arange(len(wealth_over_time))
     plt.fill_between(years, 0, wealth_over_time, where=(wealth_over_time >= 0), color='#27AE60', alpha=0.5)
     plt.fill_between(years, 0, wealth_over_time, where=(wealth_over_time < 0), color='#F39C12', alpha=0.5)
@@ -31,25 +45,19 @@ def plot_wealth_growth(wealth_over_time):
     plt.grid(alpha=0.3)
     plt.show()
 
-import os
-import logging
-from datetime import datetime
+def _nome_relatorio(out_dir, cidade, ext="png", prefixo="Projeto"):
+    """Caminho único do relatório: timestamp + sufixo aleatório (sem colisão no mesmo segundo)."""
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_city = cidade.split()[0] if cidade.split() else "cidade"
+    return os.path.join(out_dir, f"{prefixo}_{safe_city}_{ts}_{uuid.uuid4().hex[:8]}.{ext}")
 
-def plotar_dashboard_final(cidade, sistema_wp, conta_antiga, custo_novo, saldo, total_sem, total_com, parc, financiado, show=True, out_dir=None):
-    plt.rcParams['text.color'] = '#333333'
-    fig = plt.figure(figsize=(16, 10), facecolor='#F9F9F9')
-    gs = fig.add_gridspec(3, 2, height_ratios=[0.15, 1, 1])
 
-    # Cabeçalho
-    ax_head = fig.add_subplot(gs[0, :]); ax_head.axis('off')
+def _valores_dashboard(sistema_wp, conta_antiga, custo_novo, saldo):
+    """Normaliza as entradas do dashboard: (kWp, 1º mês sem/com solar, saldo em array)."""
     try:
         kWp = sistema_wp/1000.0
     except Exception:
         kWp = sistema_wp
-    ax_head.text(0.5, 0.5, f"PROJETO SOLAR: {cidade.upper()} ({kWp:.2f} kWp)", ha='center', fontsize=18, fontweight='bold')
-
-    # 1. Mensal (usar o primeiro mês como referência)
-    ax1 = fig.add_subplot(gs[1, 0], facecolor='#F9F9F9')
     try:
         old0 = float(conta_antiga[0])
     except Exception:
@@ -58,6 +66,27 @@ def plotar_dashboard_final(cidade, sistema_wp, conta_antiga, custo_novo, saldo,
         new0 = float(custo_novo[0])
     except Exception:
         new0 = float(custo_novo)
+    try:
+        saldo_arr = np.array(saldo, dtype=float)
+    except Exception:
+        saldo_arr = np.array([float(saldo)])
+    return kWp, old0, new0, np.atleast_1d(saldo_arr)
+
+
+def plotar_dashboard_final(cidade, sistema_wp, conta_antiga, custo_novo, saldo, total_sem, total_com, parc, financiado, show=True, out_dir=None):
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mtick
+    plt.rcParams['text.color'] = '#333333'
+    fig = plt.figure(figsize=(16, 10), facecolor='#F9F9F9')
+    gs = fig.add_gridspec(3, 2, height_ratios=[0.15, 1, 1])
+
+    # Cabeçalho
+    ax_head = fig.add_subplot(gs[0, :]); ax_head.axis('off')
+    kWp, old0, new0, saldo_arr = _valores_dashboard(sistema_wp, conta_antiga, custo_novo, saldo)
+    ax_head.text(0.5, 0.5, f"PROJETO SOLAR: {cidade.upper()} ({kWp:.2f} kWp)", ha='center', fontsize=18, fontweight='bold')
+
+    # 1. Mensal (usar o primeiro mês como referência)
+    ax1 = fig.add_subplot(gs[1, 0], facecolor='#F9F9F9')
     dif = old0 - new0
     cor, lbl = ('#27AE60', "ECONOMIA") if dif >= 0 else ('#F39C12', "INVESTIMENTO")
     ax1.bar([0, 1], [old0, new0], color=['#E74C3C', cor], width=0.5)
@@ -74,10 +103,6 @@ def plotar_dashboard_final(cidade, sistema_wp, conta_antiga, custo_novo, saldo,
 
     # 3. Patrimônio (saldo ao longo do tempo)
     ax3 = fig.add_subplot(gs[2, :], facecolor='#F9F9F9')
-    try:
-        saldo_arr = np.array(saldo, dtype=float)
-    except Exception:
-        saldo_arr = np.array([float(saldo)])
     anos = np.arange(len(saldo_arr))/12.0 if len(saldo_arr) > 1 else np.arange(len(saldo_arr))
     ax3.fill_between(anos, 0, saldo_arr, where=(saldo_arr>=0), color='#27AE60', alpha=0.5)
     ax3.fill_between(anos, 0, saldo_arr, where=(saldo_arr<0), color='#F39C12', alpha=0.5)
@@ -93,11 +118,10 @@ def plotar_dashboard_final(cidade, sistema_wp, conta_antiga, custo_novo, saldo,
         os.makedirs(out_dir, exist_ok=True)
     except Exception:
         out_dir = os.getcwd()
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_city = cidade.split()[0]
-    nome_img = os.path.join(out_dir, f"Projeto_{safe_city}_{ts}.png")
+    nome_img = _nome_relatorio(out_dir, cidade)
     try:
-        plt.savefig(nome_img, dpi=150)
+        with perf.span("viz.savefig"):
+            plt.savefig(nome_img, dpi=150)
         logging.info("Dashboard salvo em %s", nome_img)
     except Exception as e:
         logging.warning("Falha ao salvar dashboard: %s", e)
@@ -106,4 +130,209 @@ def plotar_dashboard_final(cidade, sistema_wp, conta_antiga, custo_novo, saldo,
         plt.show()
     else:
         plt.close()
-    return nome_img
\ No newline at end of file
+    return nome_img
+
+
+def plotar_bandas_risco(cidade, saldo_bandas, percentis, saldo_base=None, out_dir=None, dpi=150, ax=None):
+    """Faixas de percentis do saldo acumulado (resultado de risco.simular_cenarios).
+
+    Pares simétricos de percentis (ex.: P10–P90) viram áreas sombreadas e o
+    percentil central, a linha principal. Com `ax`, desenha nesse eixo e o
+    retorna; caso contrário salva um PNG (API orientada a objetos, sem pyplot)
+    e retorna o caminho.
+    """
+    import matplotlib.ticker as mtick
+
+    bandas = np.atleast_2d(np.asarray(saldo_bandas, dtype=float))
+    percentis = [float(q) for q in percentis]
+    anos = np.arange(bandas.shape[1]) / 12.0
+
+    fig = None
+    if ax is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=(12, 6), facecolor='#F9F9F9')
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1, facecolor='#F9F9F9')
+
+    ordem = np.argsort(percentis)
+    n = len(ordem)
+    for k in range(n // 2):
+        lo, hi = ordem[k], ordem[n - 1 - k]
+        ax.fill_between(anos, bandas[lo], bandas[hi], color='#27AE60', alpha=0.15 + 0.15 * k,
+                        label=f"P{percentis[lo]:g}–P{percentis[hi]:g}")
+    if n % 2:
+        meio = ordem[n // 2]
+        ax.plot(anos, bandas[meio], color='#333333', label=f"P{percentis[meio]:g}")
+    if saldo_base is not None:
+        ax.plot(anos, np.asarray(saldo_base, dtype=float), color='#E74C3C', linestyle='--', label="Cenário base")
+    ax.axhline(0.0, color='#333333', linewidth=0.8)
+    ax.set_title(f"RISCO DO PATRIMÔNIO: {cidade.upper()}", color='#333333', fontweight='bold')
+    ax.set_xlabel("Anos")
+    ax.yaxis.set_major_formatter(mtick.FuncFormatter(lambda x, p: f"{int(x/1000):,}k"))
+    ax.grid(alpha=0.3)
+    ax.legend(loc='upper left')
+    if fig is None:
+        return ax
+
+    fig.tight_layout()
+    out_dir = out_dir or os.path.join(os.getcwd(), "reports")
+    os.makedirs(out_dir, exist_ok=True)
+    nome_img = _nome_relatorio(out_dir, cidade, prefixo="Risco")
+    with perf.span("viz.savefig"):
+        fig.savefig(nome_img, dpi=dpi, facecolor=fig.get_facecolor())
+    logging.info("Bandas de risco salvas em %s", nome_img)
+    return nome_img
+
+
+class RenderizadorDashboard:
+    """Dashboard headless e reaproveitável (Agg via API orientada a objetos, sem pyplot).
+
+    A figura, os eixos e os artistas são criados uma única vez; cada
+    relatório apenas atualiza os dados (barras, áreas, linha e textos) e
+    rasteriza. Não altera o estado global do matplotlib.
+    """
+
+    COR_FUNDO = '#F9F9F9'
+    COR_TEXTO = '#333333'
+
+    def __init__(self, dpi=150):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import matplotlib.ticker as mtick
+
+        self.dpi = dpi
+        fig = Figure(figsize=(16, 10), facecolor=self.COR_FUNDO)
+        FigureCanvasAgg(fig)
+        gs = fig.add_gridspec(3, 2, height_ratios=[0.15, 1, 1])
+        texto = dict(color=self.COR_TEXTO, fontweight='bold')
+
+        ax_head = fig.add_subplot(gs[0, :]); ax_head.axis('off')
+        self._cabecalho = ax_head.text(0.5, 0.5, "PROJETO SOLAR", ha='center', fontsize=18, **texto)
+
+        # 1. Mensal
+        self._ax1 = ax1 = fig.add_subplot(gs[1, 0], facecolor=self.COR_FUNDO)
+        self._barras_mes = ax1.bar([0, 1], [1.0, 1.0], color=['#E74C3C', '#27AE60'], width=0.5)
+        ax1.set_xticks([0, 1]); ax1.set_xticklabels(['Hoje', 'Com Solar'])
+        self._titulo_mes = ax1.set_title("FLUXO MENSAL", **texto)
+
+        # 2. Total (25 anos)
+        self._ax2 = ax2 = fig.add_subplot(gs[1, 1], facecolor=self.COR_FUNDO)
+        self._barras_total = ax2.barh([0, 1], [1.0, 1.0], color=['#E74C3C', '#27AE60'])
+        ax2.set_yticks([0, 1]); ax2.set_yticklabels(['Sem Solar', 'Com Solar'])
+        self._texto_total = ax2.text(0.5, 0.5, "", ha='center', fontsize=14, bbox=dict(fc='white', ec='green'), **texto)
+        ax2.set_title("ECONOMIA ACUMULADA (25 ANOS)", **texto)
+
+        # 3. Patrimônio
+        self._ax3 = ax3 = fig.add_subplot(gs[2, :], facecolor=self.COR_FUNDO)
+        t0, y0 = np.array([0.0, 1.0]), np.array([-1.0, 1.0])
+        self._area_pos = ax3.fill_between(t0, 0, y0, where=(y0 >= 0), color='#27AE60', alpha=0.5)
+        self._area_neg = ax3.fill_between(t0, 0, y0, where=(y0 < 0), color='#F39C12', alpha=0.5)
+        self._linha, = ax3.plot(t0, y0, color=self.COR_TEXTO)
+        ax3.set_title("CRESCIMENTO PATRIMONIAL", **texto)
+        ax3.yaxis.set_major_formatter(mtick.FuncFormatter(lambda x, p: f"{int(x/1000):,}k"))
+        ax3.grid(alpha=0.3)
+
+        fig.tight_layout()
+        self.fig = fig
+
+    def _atualizar_area(self, nome, anos, saldo_arr, where, cor):
+        area = getattr(self, nome)
+        if hasattr(area, "set_data"):
+            area.set_data(anos, 0, saldo_arr, where=where)
+        else:
+            # matplotlib < 3.10: recria apenas a coleção
+            area.remove()
+            setattr(self, nome, self._ax3.fill_between(anos, 0, saldo_arr, where=where, color=cor, alpha=0.5))
+
+    def atualizar(self, cidade, sistema_wp, conta_antiga, custo_novo, saldo, total_sem, total_com, parc=0.0, financiado=False):
+        """Atualiza os artistas com os dados de uma proposta (mesmos argumentos de plotar_dashboard_final)."""
+        kWp, old0, new0, saldo_arr = _valores_dashboard(sistema_wp, conta_antiga, custo_novo, saldo)
+        self._cabecalho.set_text(f"PROJETO SOLAR: {cidade.upper()} ({kWp:.2f} kWp)")
+
+        dif = old0 - new0
+        cor, lbl = ('#27AE60', "ECONOMIA") if dif >= 0 else ('#F39C12', "INVESTIMENTO")
+        barra_old, barra_new = self._barras_mes.patches
+        barra_old.set_height(old0)
+        barra_new.set_height(new0)
+        barra_new.set_facecolor(cor)
+        self._titulo_mes.set_text(f"FLUXO MENSAL: {lbl} DE R$ {abs(dif):.2f}")
+        self._ax1.set_ylim(min(0.0, old0, new0), max(old0, new0, 1.0) * 1.05)
+
+        total_sem, total_com = float(total_sem), float(total_com)
+        barra_sem, barra_com = self._barras_total.patches
+        barra_sem.set_width(total_sem)
+        barra_com.set_width(total_com)
+        self._texto_total.set_position((max(total_sem, total_com) * 0.5, 0.5))
+        self._texto_total.set_text(f"VOCÊ DEIXA DE GASTAR:\nR$ {total_sem - total_com:,.2f}")
+        self._ax2.set_xlim(min(0.0, total_sem, total_com), max(total_sem, total_com, 1.0) * 1.05)
+
+        anos = np.arange(len(saldo_arr))/12.0 if len(saldo_arr) > 1 else np.arange(len(saldo_arr), dtype=float)
+        self._atualizar_area("_area_pos", anos, saldo_arr, saldo_arr >= 0, '#27AE60')
+        self._atualizar_area("_area_neg", anos, saldo_arr, saldo_arr < 0, '#F39C12')
+        self._linha.set_data(anos, saldo_arr)
+        ymin, ymax = min(0.0, float(saldo_arr.min())), max(0.0, float(saldo_arr.max()))
+        margem = (ymax - ymin) * 0.05 or 1.0
+        self._ax3.set_xlim(anos[0], anos[-1] if anos[-1] > anos[0] else anos[0] + 1.0)
+        self._ax3.set_ylim(ymin - margem, ymax + margem)
+
+    def salvar(self, caminho):
+        """Grava o PNG em `caminho` (arquivo ou objeto binário, ex.: BytesIO)."""
+        with perf.span("viz.savefig"):
+            self.fig.savefig(caminho, dpi=self.dpi, facecolor=self.fig.get_facecolor())
+        return caminho
+
+    def renderizar(self, cidade, sistema_wp, conta_antiga, custo_novo, saldo, total_sem, total_com, parc=0.0, financiado=False, out_dir=None):
+        """Atualiza e salva um PNG com nome único em `out_dir` (padrão ./reports). Retorna o caminho."""
+        out_dir = out_dir or os.path.join(os.getcwd(), "reports")
+        os.makedirs(out_dir, exist_ok=True)
+        with perf.span("viz.atualizar"):
+            self.atualizar(cidade, sistema_wp, conta_antiga, custo_novo, saldo, total_sem, total_com, parc, financiado)
+        return self.salvar(_nome_relatorio(out_dir, cidade))
+
+
+_RENDERIZADOR = None
+
+
+def _renderizador_processo(dpi=150):
+    """Renderizador do processo atual (um template por worker)."""
+    global _RENDERIZADOR
+    if _RENDERIZADOR is None or _RENDERIZADOR.dpi != dpi:
+        _RENDERIZADOR = RenderizadorDashboard(dpi=dpi)
+    return _RENDERIZADOR
+
+
+def _renderizar_proposta(args):
+    proposta, out_dir, dpi = args
+    try:
+        return _renderizador_processo(dpi).renderizar(out_dir=out_dir, **proposta)
+    except Exception as e:
+        logging.warning("Falha ao renderizar dashboard de %s: %s", proposta.get("cidade"), e)
+        return None
+
+
+def _renderizar_png(args):
+    """Bytes PNG de uma proposta (tarefa de pool: usa o template do processo)."""
+    proposta, dpi = args
+    renderizador = _renderizador_processo(dpi)
+    renderizador.atualizar(**proposta)
+    buf = io.BytesIO()
+    renderizador.salvar(buf)
+    return buf.getvalue()
+
+
+def renderizar_lote(propostas, out_dir, workers=None, dpi=150, chunksize=8):
+    """Renderiza vários dashboards PNG em um pool de processos.
+
+    propostas: iterável de dicts com os argumentos de RenderizadorDashboard.atualizar
+    (cidade, sistema_wp, conta_antiga, custo_novo, saldo, total_sem, total_com,
+    parc, financiado). Cada worker monta o template uma vez e o reaproveita.
+    workers=0 ou 1 renderiza no próprio processo. Retorna os caminhos na
+    ordem de entrada (None para falhas).
+    """
+    tarefas = ((p, out_dir, dpi) for p in propostas)
+    workers = os.cpu_count() if workers is None else int(workers)
+    if workers <= 1:
+        return [_renderizar_proposta(t) for t in tarefas]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_renderizar_proposta, tarefas, chunksize=chunksize))
@@ -0,0 +1,19 @@
+"""Fixtures com o servidor HTTP local que imita Nominatim e NASA POWER."""
+import pytest
+
+from src._testing import StubHTTP, configurar_geodata, iniciar_stub
+
+
+@pytest.fixture
+def servidor_stub():
+    stub, parar = iniciar_stub(StubHTTP())
+    yield stub
+    parar()
+
+
+@pytest.fixture
+def geodata_stub(servidor_stub, tmp_path, monkeypatch):
+    """geodata apontando para o servidor local, com cache em diretório temporário."""
+    from src import geodata
+    configurar_geodata(geodata, servidor_stub, tmp_path, definir=monkeypatch.setattr)
+    return servidor_stub
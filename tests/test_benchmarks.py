@@ -0,0 +1,52 @@
+import json
+
+from benchmarks.suite import CASOS, Contexto, comparar, executar_casos, main, selecionar
+
+
+def _resultado(**tempos):
+    return {"resultados": {nome: {"min_s": t} for nome, t in tempos.items()}}
+
+
+def test_comparar_marca_regressao_acima_do_limite():
+    atual = _resultado(a=1.2, b=1.5, c=0.5)
+    baseline = _resultado(a=1.0, b=1.0)
+    linhas = {l["caso"]: l for l in comparar(atual, baseline, max_lentidao=0.3)}
+    assert linhas["a"]["status"] == "ok" and abs(linhas["a"]["razao"] - 1.2) < 1e-12
+    assert linhas["b"]["status"] == "regressao"
+    assert linhas["c"]["status"] == "novo" and linhas["c"]["baseline_s"] is None
+    assert all(l["status"] == "novo" for l in comparar(atual, None))
+
+
+def test_selecionar_por_prefixo():
+    assert selecionar(["lote"]) == ["lote_1k", "lote_10k", "lote_100k"]
+    assert selecionar(None) == list(CASOS)
+
+
+def test_main_grava_json_e_falha_com_lentidao(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_resultado(cotacao_unica=1e-9)))
+    saida = tmp_path / "atual.json"
+    codigo = main(["--casos", "cotacao_unica", "--rodadas", "1", "--baseline", str(baseline), "--saida", str(saida)])
+    assert codigo == 1
+    gravado = json.loads(saida.read_text())
+    assert set(gravado["resultados"]) == {"cotacao_unica"} and gravado["resultados"]["cotacao_unica"]["min_s"] > 0
+
+    # Baseline folgado: passa
+    baseline.write_text(json.dumps(_resultado(cotacao_unica=10.0)))
+    assert main(["--casos", "cotacao_unica", "--rodadas", "1", "--baseline", str(baseline)]) == 0
+
+
+def test_caso_de_cache_usa_servidor_local(monkeypatch):
+    # Só estrutura e contadores; o tempo fica para o portão do baseline (python -m benchmarks)
+    stubs = []
+    stub_original = Contexto.stub
+
+    def stub(self):
+        stubs.append(stub_original(self))
+        return stubs[-1]
+    monkeypatch.setattr(Contexto, "stub", stub)
+
+    r = executar_casos(["cache_acerto"], rodadas=1)["resultados"]["cache_acerto"]
+    assert r["rodadas"] == 1 and r["chamadas_por_rodada"] == 200 and r["min_s"] > 0
+    # Uma única busca no servidor local (o aquecimento); as 201 chamadas medidas vêm do cache
+    assert len(stubs[0].chamadas["nasa"]) == 1 and len(stubs[0].chamadas["search"]) == 1
@@ -0,0 +1,89 @@
+import multiprocessing
+
+from src.cache import NS_META, CacheStore
+
+
+def test_upsert_e_memo(tmp_path):
+    store = CacheStore(str(tmp_path / "c.sqlite3"))
+    assert store.get("clima", "a") is None
+    store.set("clima", "a", {"irr": [1, 2]}, ts=10.0)
+    store.set("clima", "a", {"irr": [3, 4]}, ts=20.0)
+    assert store.get("clima", "a") == ({"irr": [3, 4]}, 20.0)
+
+    # Outra instância lê do disco (sem a camada em memória)
+    outro = CacheStore(str(tmp_path / "c.sqlite3"))
+    assert outro.get("clima", "a") == ({"irr": [3, 4]}, 20.0)
+    assert len(outro) == 1
+    assert outro.delete("clima", "a") and not outro.delete("clima", "a")
+
+
+def test_despejo_lru(tmp_path):
+    store = CacheStore(str(tmp_path / "c.sqlite3"), max_entradas=3, memo_max=0)
+    for k in "abc":
+        store.set("ns", k, k)
+    store.get("ns", "a")  # "b" passa a ser o menos usado
+    store.set("ns", "d", "d")
+    assert store.despejar() == 1
+    assert store.get("ns", "b") is None
+    assert [store.get("ns", k)[0] for k in "acd"] == ["a", "c", "d"]
+
+
+def test_despejo_preserva_marcadores_meta(tmp_path):
+    store = CacheStore(str(tmp_path / "c.sqlite3"), max_entradas=2, memo_max=0)
+    store.set(NS_META, "migracao_json", {"entradas": 0})   # o acesso mais antigo de todos
+    for k in "abc":
+        store.set("ns", k, k)
+    assert store.despejar() == 1
+    assert store.get(NS_META, "migracao_json") is not None and store.get("ns", "a") is None
+
+
+def test_acertos_na_memoria_contam_para_o_lru(tmp_path):
+    store = CacheStore(str(tmp_path / "c.sqlite3"), max_entradas=3)
+    for k in "abc":
+        store.set("ns", k, k)
+    assert store.get("ns", "a")[0] == "a"   # servido pela memória, sem tocar o banco
+
+    # Leituras frias não gravam nada no banco: o acesso fica pendente até a próxima gravação
+    frio = CacheStore(str(tmp_path / "c.sqlite3"), max_entradas=3)
+    con = frio._conexao()
+    antes = con.total_changes
+    assert frio.get("ns", "c")[0] == "c" and frio.get("ns", "c")[0] == "c"
+    assert con.total_changes == antes
+
+    store.set("ns", "d", "d")
+    assert store.despejar() == 1
+    assert CacheStore(str(tmp_path / "c.sqlite3")).get("ns", "b") is None
+
+
+def test_gravacoes_concorrentes_entre_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src import cache
+    store = CacheStore(str(tmp_path / "c.sqlite3"))
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda k: store.set("ns", str(k), k), range(8 * cache._DESPEJO_A_CADA)))
+    assert store._gravacoes == 8 * cache._DESPEJO_A_CADA and len(store) == 8 * cache._DESPEJO_A_CADA
+
+
+def test_remover_vencidos(tmp_path):
+    store = CacheStore(str(tmp_path / "c.sqlite3"))
+    store.set("ns", "velho", 1, ts=0.0, ttl=10)
+    store.set("ns", "sem_ttl", 2, ts=0.0)
+    assert store.remover_vencidos(agora=100.0) == 1
+    assert store.get("ns", "sem_ttl") is not None
+
+
+def _gravar_varios(args):
+    path, inicio = args
+    store = CacheStore(path)
+    for k in range(inicio, inicio + 50):
+        store.set("ns", str(k % 60), k)
+    return True
+
+
+def test_gravacoes_concorrentes_entre_processos(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    CacheStore(path)
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        assert all(pool.map(_gravar_varios, [(path, i * 50) for i in range(3)]))
+    assert len(CacheStore(path)) == 60
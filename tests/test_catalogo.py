@@ -0,0 +1,102 @@
+import itertools
+import math
+import time
+
+import numpy as np
+import pytest
+
+from src import config
+from src.catalogo import CAMPOS_INVERSOR, CAMPOS_MODULO, Catalogo, buscar_projeto
+
+
+@pytest.fixture(scope="module")
+def catalogo():
+    return Catalogo.carregar()
+
+
+def _catalogo_aleatorio(n_mod, n_inv, seed):
+    rng = np.random.default_rng(seed)
+    w = rng.integers(300, 700, n_mod).astype(float)
+    modulos = {"potencia_w": w, "voc_v": w / rng.uniform(10, 12, n_mod), "vmp_v": w / rng.uniform(12, 14, n_mod),
+               "isc_a": rng.uniform(10, 19, n_mod), "imp_a": rng.uniform(9, 18, n_mod),
+               "coef_v_pct_c": rng.uniform(-0.35, -0.24, n_mod), "area_m2": w / 210, "peso_kg": w / 20,
+               "preco_r": w * rng.uniform(1.0, 1.3, n_mod)}
+    pac = np.sort(rng.integers(2, 100, n_inv) * 1000.0)
+    tri = pac > 7000
+    inversores = {"potencia_ac_w": pac, "vdc_max_v": np.where(tri, 1100.0, 600.0),
+                  "mppt_min_v": np.where(tri, 160.0, 80.0), "mppt_max_v": np.where(tri, 1000.0, 550.0),
+                  "n_mppt": rng.integers(1, 4, n_inv).astype(float), "idc_max_a": rng.choice([16.0, 26.0], n_inv),
+                  "preco_r": pac * rng.uniform(0.6, 1.0, n_inv)}
+    ordem = np.argsort(w, kind="stable")
+    return Catalogo(np.array([f"M{k}" for k in range(n_mod)], dtype=object)[ordem],
+                    {c: v[ordem] for c, v in modulos.items()},
+                    np.array([f"I{k}" for k in range(n_inv)], dtype=object), inversores)
+
+
+def _forca_bruta(cat, alvo):
+    """Menor custo por enumeração explícita de módulo x inversor x strings x módulos por string."""
+    melhor = math.inf
+    for im, ii in itertools.product(range(len(cat.modulos_skus)), range(len(cat.inversores_skus))):
+        m = cat.modulo(cat.modulos_skus[im])
+        inv = cat.inversor(cat.inversores_skus[ii])
+        frio = 1 + m["coef_v_pct_c"] / 100 * (config.TEMP_MINIMA_C - 25)
+        quente = 1 + m["coef_v_pct_c"] / 100 * (config.TEMP_CELULA_MAX_C - 25)
+        strings_max = inv["n_mppt"] * math.floor(inv["idc_max_a"] / m["isc_a"])
+        for s in range(1, 31):
+            if (s * m["voc_v"] * frio > inv["vdc_max_v"] or s * m["vmp_v"] * frio > inv["mppt_max_v"]
+                    or s * m["vmp_v"] * quente < inv["mppt_min_v"]):
+                continue
+            for n in range(1, int(strings_max) + 1):
+                dc = n * s * m["potencia_w"]
+                if dc >= alvo and config.RAZAO_DC_AC_MIN <= dc / inv["potencia_ac_w"] <= config.RAZAO_DC_AC_MAX:
+                    melhor = min(melhor, n * s * m["preco_r"] + inv["preco_r"])
+                    break
+    return melhor
+
+
+def test_carrega_catalogo_ordenado(catalogo):
+    assert set(catalogo.modulos) == set(CAMPOS_MODULO) and set(catalogo.inversores) == set(CAMPOS_INVERSOR)
+    assert np.all(np.diff(catalogo.modulos["potencia_w"]) >= 0)
+    assert np.all(np.diff(catalogo.inversores["potencia_ac_w"]) >= 0)
+    assert catalogo.modulo("MOD-555-MONO")["preco_r"] == 620.0
+    ini, fim = catalogo.faixa_inversores(4000, 8000)
+    assert list(catalogo.inversores_skus[ini:fim]) == ["INV-5K-MONO", "INV-6K-MONO", "INV-8K-TRI"]
+
+
+@pytest.mark.parametrize("alvo", [1500, 3800, 6200, 9000])
+def test_projeto_respeita_limites_eletricos(catalogo, alvo):
+    p = buscar_projeto(catalogo, alvo)
+    m, inv = catalogo.modulo(p.modulo), catalogo.inversor(p.inversor)
+    frio = 1 + m["coef_v_pct_c"] / 100 * (config.TEMP_MINIMA_C - 25)
+    quente = 1 + m["coef_v_pct_c"] / 100 * (config.TEMP_CELULA_MAX_C - 25)
+    assert p.qtd_modulos == p.strings * p.modulos_por_string
+    assert p.pot_dc_wp >= alvo
+    assert config.RAZAO_DC_AC_MIN <= p.razao_dc_ac <= config.RAZAO_DC_AC_MAX
+    assert p.modulos_por_string * m["voc_v"] * frio <= inv["vdc_max_v"]
+    assert inv["mppt_min_v"] <= p.modulos_por_string * m["vmp_v"] * quente
+    assert p.strings <= inv["n_mppt"] * math.floor(inv["idc_max_a"] / m["isc_a"])
+    assert p.capex == pytest.approx(p.custo_hardware * config.FATOR_INSTALACAO)
+    assert p.custo_hardware == pytest.approx(_forca_bruta(catalogo, alvo))
+
+
+def test_sem_combinacao_valida(catalogo):
+    assert buscar_projeto(catalogo, 30000) is None
+    # Nenhum inversor aceita razão DC/AC tão estreita para 1 kW
+    assert buscar_projeto(catalogo, 1000, razao_max=0.3) is None
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_igual_a_forca_bruta_em_catalogo_aleatorio(seed):
+    cat = _catalogo_aleatorio(12, 15, seed)
+    for alvo in (2500, 7000, 15000):
+        p = buscar_projeto(cat, alvo)
+        esperado = _forca_bruta(cat, alvo)
+        assert (p.custo_hardware if p else math.inf) == pytest.approx(esperado)
+
+
+def test_catalogo_com_milhares_de_skus():
+    cat = _catalogo_aleatorio(2000, 1000, 0)
+    inicio = time.perf_counter()
+    p = buscar_projeto(cat, 20000)
+    assert time.perf_counter() - inicio < 2.0
+    assert p is not None and p.pot_dc_wp >= 20000
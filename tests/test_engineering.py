@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from src.engineering import calcular_tudo
 
 
@@ -50,4 +51,182 @@ def test_imprimir_relatorio_tecnico(capfd):
     assert "RELATÓRIO TÉCNICO DE ENGENHARIA" in captured.out
     assert "Área Necessária" in captured.out
     assert "Peso Total" in captured.out
-    assert "Inversor Selecionado" in captured.out
\ No newline at end of file
+    assert "Inversor Selecionado" in captured.out
+
+def _fluxo_referencia(consumo, taxa_min, irr, pot_wp, PR, capex, parcela, meses, financiar, inflacao=0.08, degr=0.006):
+    """Laço mês a mês original, usado como referência para a versão vetorizada."""
+    tarifa_base = 0.92
+    fio_b = (tarifa_base * 0.28) * 0.45
+    ant, novo, saldo = [], [], []
+    acum = -capex if not financiar else 0.0
+    for m in range(300):
+        ano = m // 12
+        tar = tarifa_base * ((1 + inflacao) ** ano)
+        conta_full = consumo * tar
+        ger = (pot_wp / 1000.0) * irr[m % 12] * 30.0 * PR * (1 - degr * ano)
+        inj, auto = ger * 0.65, ger * 0.35
+        cons_rede = max(0.0, consumo - auto)
+        cred = min(inj, cons_rede)
+        taxa_uso = (cons_rede - cred) * tar + (cred * fio_b * ((1 + inflacao) ** ano))
+        desembolso = max(taxa_uso, taxa_min * tar) + (parcela if m < meses else 0.0)
+        acum += conta_full - desembolso
+        ant.append(conta_full); novo.append(desembolso); saldo.append(acum)
+    return ant, novo, saldo
+
+
+def test_calcular_tudo_vetorizado_igual_ao_laco():
+    irr = [5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5, 10.0, 10.5]
+    temp = [25.0] * 12
+    PR = max(0.70, 0.80 - (25.0 + 20 - 25) * 0.0035)
+    for financiar, fin in [(False, None), (True, (12.0, 60))]:
+        qtd, pot, capex, parc, ant, novo, saldo, _, _ = calcular_tudo(450.0, 50, irr, temp, financiar, fin)
+        ref = _fluxo_referencia(450.0, 50, irr, pot, PR, capex, parc, 60 if financiar else 0, financiar)
+        assert isinstance(saldo, np.ndarray)
+        np.testing.assert_allclose(ant, ref[0], rtol=1e-12)
+        np.testing.assert_allclose(novo, ref[1], rtol=1e-12)
+        np.testing.assert_allclose(saldo, ref[2], rtol=1e-9, atol=1e-6)
+
+
+def test_calcular_lote_igual_ao_escalar():
+    from src.engineering import calcular_lote
+    rng = np.random.default_rng(42)
+    n = 7
+    consumo = rng.uniform(150, 2500, n)
+    taxa = rng.choice([30, 50, 100], n)
+    irr = rng.uniform(4.0, 6.5, (n, 12))
+    temp = rng.uniform(20.0, 32.0, (n, 12))
+    fin = np.array([True, False, True, False, True, True, False])
+    taxa_aa = rng.uniform(8.0, 20.0, n)
+    meses = rng.integers(12, 96, n)
+
+    lote = calcular_lote(consumo, taxa, irr, temp, fin, taxa_aa, meses, tamanho_bloco=3)
+    assert lote.conta_antiga.shape == (n, 300) and lote.saldo.shape == (n, 300)
+
+    for k in range(n):
+        fin_dados = (taxa_aa[k], int(meses[k])) if fin[k] else None
+        qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com = calcular_tudo(
+            consumo[k], taxa[k], irr[k], temp[k], bool(fin[k]), fin_dados
+        )
+        assert qtd == lote.qtd[k] and pot == lote.pot_wp[k]
+        assert capex == lote.capex[k] and parc == pytest.approx(lote.parcela[k], rel=1e-13)
+        np.testing.assert_allclose(saldo, lote.saldo[k])
+        np.testing.assert_allclose(tot_com, lote.total_com[k])
+
+
+def test_cotacao_unica_identica_ao_lote_sem_passar_por_ele(monkeypatch):
+    from src import engineering
+    from src.engineering import calcular_lote
+    rng = np.random.default_rng(7)
+    casos = []
+    for k in range(40):
+        irr, temp = rng.uniform(3.5, 6.5, 12), rng.uniform(18.0, 34.0, 12)
+        kwargs = dict(financiar=bool(k % 2), fin_dados=(float(rng.uniform(0.0, 25.0)), int(rng.integers(1, 120))),
+                      inflacao_override=[None, 0.03][k % 3 == 0], degradacao_override=[None, 0.008][k % 4 == 0],
+                      fator_geracao=[None, 0.9][k % 5 == 0])
+        casos.append((float(rng.uniform(80, 4000)), [30, 50, 100][k % 3], irr, temp, kwargs))
+    # Com tarifa da distribuidora (vetores (300,))
+    tar = np.linspace(0.9, 2.5, 300)
+    casos.append((600.0, 50, casos[0][2], casos[0][3], dict(tarifas=(tar, tar * 0.3))))
+
+    lotes = []
+    for consumo, taxa, irr, temp, kw in casos:
+        taxa_aa, meses = kw.get("fin_dados") or (0.0, 0)
+        lotes.append(calcular_lote(consumo, taxa, irr, temp, kw.get("financiar", False), taxa_aa,
+                                   meses if kw.get("financiar") else 0, inflacao=kw.get("inflacao_override"),
+                                   degradacao=kw.get("degradacao_override"), tarifas=kw.get("tarifas"),
+                                   fator_geracao=kw.get("fator_geracao")))
+
+    def proibido(*a, **k):
+        raise AssertionError("cotação escalar não deve passar por calcular_lote")
+    monkeypatch.setattr(engineering, "calcular_lote", proibido)
+    for (consumo, taxa, irr, temp, kw), lote in zip(casos, lotes):
+        r = calcular_tudo(consumo, taxa, irr, temp, **kw)
+        assert (r.qtd, r.pot_wp, r.inv_w, r.capex) == (lote.qtd[0], lote.pot_wp[0], lote.inv_w[0], lote.capex[0])
+        assert r.saldo.shape == (300,)
+        if r.parcela == 0.0:
+            # Sem parcela as operações são as mesmas do lote, bit a bit
+            for campo in ("conta_antiga", "conta_nova", "saldo"):
+                np.testing.assert_array_equal(getattr(r, campo), getattr(lote, campo)[0])
+            assert (r.total_sem, r.total_com) == (lote.total_sem[0], lote.total_com[0])
+        else:
+            # A parcela escalar usa o pow da libm; o ufunc vetorizado pode diferir no último bit
+            assert r.parcela == pytest.approx(lote.parcela[0], rel=1e-13)
+            np.testing.assert_allclose(r.saldo, lote.saldo[0], rtol=1e-12, atol=1e-8)
+
+
+def test_calcular_payback_mes_do_retorno():
+    from src.engineering import calcular_payback
+
+    saldo = np.array([[-300.0, -100.0, 50.0, 200.0], [10.0, 20.0, 30.0, 40.0], [-5.0, -4.0, -3.0, -2.0]])
+    pb = calcular_payback(saldo)
+    assert pb[0] == 3 and pb[1] == 0 and np.isnan(pb[2])
+
+
+def test_resultado_cotacao_compativel_com_tupla():
+    from src.engineering import ResultadoCotacao, calcular_lote
+    irr = [5.0] * 12
+    temp = [26.0] * 12
+    r = calcular_tudo(450.0, 50, irr, temp)
+    assert isinstance(r, ResultadoCotacao) and len(r) == 9
+    qtd, pot, capex, parc, ant, novo, saldo, tot_sem, tot_com = r
+    lote = calcular_lote([450.0], 50, irr, temp)
+    assert qtd == r.qtd == lote.qtd[0] and capex == r[2] and r[-1] == tot_com
+    assert r[4:7] == (ant, novo, saldo)
+    assert isinstance(saldo, np.ndarray) and saldo.dtype == np.float64 and saldo.shape == (300,)
+    np.testing.assert_array_equal(saldo, lote.saldo[0])
+    assert not hasattr(r, "__dict__")
+
+
+def test_resultado_cotacao_metricas_sob_demanda():
+    from src.engineering import calcular_payback
+    from src.financiamento import vpl
+    irr = [5.0] * 12
+    temp = [26.0] * 12
+    r = calcular_tudo(450.0, 50, irr, temp)
+    assert r.payback == calcular_payback(r.saldo)
+    assert r.ano_equilibrio == int(np.ceil(r.payback / 12))
+    # Sem desconto, o VPL é o saldo final; a TIR zera o VPL
+    assert r.vpl(0.0) == pytest.approx(r.saldo[-1])
+    assert r.vpl() == pytest.approx(vpl(r.conta_antiga - r.conta_nova, 0.10, r.capex))
+    assert r.vpl(r.tir) == pytest.approx(0.0, abs=1e-4)
+    assert r.economia_anual.shape == (25,) and r.economia_anual.sum() - r.capex == pytest.approx(r.economia_total)
+    np.testing.assert_allclose(r.saldo_anual, r.saldo[11::12])
+    assert r.economia_anual is r.economia_anual   # memoizado
+    financiado = calcular_tudo(450.0, 50, irr, temp, financiar=True, fin_dados=(15.0, 60))
+    assert np.isnan(financiado.tir) and financiado.capex_vista == 0.0
+
+
+def test_resultado_cotacao_ocupa_fracao_das_listas():
+    import tracemalloc
+    from src.engineering import ResultadoCotacao, calcular_lote
+    lote = calcular_lote(np.linspace(200, 2000, 500), 50, [5.0] * 12, [26.0] * 12)
+    copias = [np.array(s) for s in (lote.conta_antiga, lote.conta_nova, lote.saldo)]
+
+    tracemalloc.start()
+    listas = [(int(lote.qtd[k]), float(lote.pot_wp[k]), *(s[k].tolist() for s in copias)) for k in range(500)]
+    mem_listas = tracemalloc.get_traced_memory()[0]
+    del listas
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    series = [np.array(s) for s in copias]
+    resultados = [ResultadoCotacao(int(lote.qtd[k]), float(lote.pot_wp[k]), 0.0, 0.0, 0.0,
+                                   series[0][k], series[1][k], series[2][k], 0.0, 0.0) for k in range(500)]
+    mem_resultados = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    assert len(resultados) == 500 and mem_resultados < 0.5 * mem_listas
+
+
+def test_tarifas_padrao_acompanham_config(monkeypatch):
+    from src import config
+    from src.engineering import _tarifas_padrao
+    irr, temp = [5.0] * 12, [25.0] * 12
+    tar, _ = _tarifas_padrao(0.05)
+    antes = calcular_tudo(450.0, 50, irr, temp, inflacao_override=0.05)
+
+    monkeypatch.setattr(config, "TARIFA_BASE_R_KWH", config.TARIFA_BASE_R_KWH * 2)
+    monkeypatch.setattr(config, "FIO_B_FATOR", 0.0)
+    tar2, fio_b2 = _tarifas_padrao(0.05)
+    np.testing.assert_allclose(tar2, 2 * tar)
+    assert not fio_b2.any()
+    np.testing.assert_allclose(calcular_tudo(450.0, 50, irr, temp, inflacao_override=0.05).conta_antiga,
+                               2 * antes.conta_antiga)
@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src import geodata
+from src.engineering import calcular_tudo, calcular_payback
+from src.excedencia import geracao_especifica, niveis_excedencia, simular_niveis
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "power_mensal_fortaleza.json")
+ROTA_MENSAL = "/api/temporal/monthly/point"
+
+
+@pytest.fixture
+def serie_stub(geodata_stub):
+    with open(FIXTURE, encoding="utf-8") as f:
+        geodata_stub.respostas[ROTA_MENSAL] = json.load(f)
+    geodata_stub.cidades["Fortaleza, CE"] = (-3.73, -38.52)
+    return geodata_stub
+
+
+def test_niveis_empirico_normal_e_vetorizado():
+    rng = np.random.default_rng(3)
+    irr = 5.0 * rng.uniform(0.9, 1.1, (2, 20, 1)) * np.ones((2, 20, 12))
+    temp = np.full((2, 20, 12), 26.0)
+    anual = geracao_especifica(irr, temp).sum(axis=-1)
+
+    n = niveis_excedencia(irr, temp)
+    assert n.fator.shape == n.geracao_anual.shape == (2, 3) and n.geracao_mensal.shape == (2, 3, 12)
+    np.testing.assert_allclose(n.geracao_anual[:, 0], np.median(anual, axis=-1))
+    np.testing.assert_allclose(n.geracao_anual[:, 2], np.quantile(anual, 0.10, axis=-1))
+    np.testing.assert_allclose(n.geracao_mensal.sum(axis=-1), n.geracao_anual)
+    assert np.all(np.diff(n.geracao_anual, axis=-1) < 0)   # P50 > P75 > P90
+    # Cada célula equivale ao cálculo isolado
+    np.testing.assert_allclose(niveis_excedencia(irr[1], temp[1]).fator, n.fator[1])
+
+    normal = niveis_excedencia(irr, temp, niveis=(50, 90), metodo="normal")
+    np.testing.assert_allclose(normal.fator[:, 0], 1.0)
+    esperado = anual.mean(axis=-1) - 1.2815515655 * anual.std(axis=-1, ddof=1)
+    np.testing.assert_allclose(normal.geracao_anual[:, 1], esperado)
+
+
+def test_anos_incompletos_ficam_de_fora():
+    irr = np.full((5, 12), 5.0)
+    irr[:, 0] = [4.0, 5.0, 6.0, np.nan, 5.5]
+    temp = np.full((5, 12), 26.0)
+    n = niveis_excedencia(irr, temp, niveis=(50,))
+    assert n.anos_validos == 4 and n.irr_mensal[0] == pytest.approx(5.125)
+    with pytest.raises(ValueError):
+        niveis_excedencia(irr[2:4], temp[2:4])
+    with pytest.raises(ValueError):
+        niveis_excedencia(irr, temp, niveis=(100,))
+
+
+def test_serie_mensal_do_stub_em_cache_compacto(serie_stub):
+    serie = geodata.get_serie_mensal("Fortaleza, CE", ano_inicio=2001, ano_fim=2022)
+    assert serie.irr.shape == serie.temp.shape == (22, 12) and serie.irr.dtype == np.float32
+    assert serie.anos[0] == 2001 and serie.anos[-1] == 2022
+    assert np.isnan(serie.irr[-1, 11]) and np.isfinite(serie.irr[:-1]).all()   # -999 da NASA vira NaN
+    assert [c[0] for c in serie_stub.chamadas["nasa"]] == [ROTA_MENSAL]
+
+    # Segunda consulta vem do cache, gravado como float32 (não como 528 pares "AAAAMM": valor)
+    de_novo = geodata.get_serie_mensal("Fortaleza, CE", ano_inicio=2001, ano_fim=2022)
+    assert len(serie_stub.chamadas["nasa"]) == 1
+    np.testing.assert_array_equal(de_novo.irr, serie.irr)
+    chave = f"{geodata._chave_celula(*geodata._celula_grade(-3.73, -38.52))}|2001-2022"
+    valor, _ = geodata._store().get(geodata.NS_SERIE, chave)
+    assert len(json.dumps(valor)) < 3500
+
+    n = niveis_excedencia(serie.irr, serie.temp)
+    assert n.anos_validos == 21 and n.fator[0] > n.fator[1] > n.fator[2] > 0.85
+
+
+def test_nivel_alimenta_a_simulacao(serie_stub):
+    serie = geodata.get_serie_mensal("Fortaleza, CE", ano_inicio=2001, ano_fim=2022)
+    n, r = simular_niveis(450, 50, serie, financiar=True, taxa_aa=15.0, meses=60)
+    assert len(set(r.qtd.tolist())) == 1                            # mesma instalação em todos os níveis
+    economia = r.total_sem - r.total_com
+    assert economia[0] > economia[1] > economia[2]
+    pb = calcular_payback(r.saldo)
+    assert pb[0] <= pb[2]
+
+    base = calcular_tudo(450, 50, n.irr_mensal, n.temp_mensal)
+    p90 = calcular_tudo(450, 50, n.irr_mensal, n.temp_mensal, fator_geracao=n.fator[2])
+    assert calcular_tudo(450, 50, n.irr_mensal, n.temp_mensal, fator_geracao=1.0).total_com == base.total_com
+    assert p90.qtd == base.qtd and p90.economia_total < base.economia_total
+
+
+def test_cli_excedencia(serie_stub, tmp_path, capsys):
+    from src.cli import main
+    main(["--cidade", "Fortaleza, CE", "--consumo", "450", "--taxa", "50", "--no-show", "--output", str(tmp_path),
+          "--excedencia", "90"])
+    saida = capsys.readouterr().out
+    assert "P50:" in saida and "P75:" in saida and "◀" in saida.split("P90:")[1].splitlines()[0]
+    assert [c[0] for c in serie_stub.chamadas["nasa"]].count(ROTA_MENSAL) == 1
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.engineering import calcular_lote, calcular_payback, calcular_tudo
+from src.exportacao import (
+    GravadorResultados, ResultadosColunares, exportar_arrow, exportar_npz, exportar_parquet, salvar_npz,
+)
+from src.lote import processar_lote
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+IRR = [5.2] * 12
+TEMP = [26.0] * 12
+
+
+@pytest.fixture
+def diretorio(tmp_path):
+    caminho = tmp_path / "resultados"
+    with GravadorResultados(str(caminho)) as gravador:
+        for ini in range(0, 500, 200):
+            consumo = np.arange(ini, min(ini + 200, 500)) + 200.0
+            gravador.acrescentar(calcular_lote(consumo, 50, IRR, TEMP))
+    return str(caminho)
+
+
+def test_append_em_blocos_e_leitura_mapeada(diretorio):
+    dados = ResultadosColunares(diretorio)
+    esperado = calcular_lote(np.arange(500) + 200.0, 50, IRR, TEMP)
+    assert len(dados) == 500
+    assert isinstance(dados["saldo"], np.memmap) and dados["saldo"].shape == (500, 300)
+    assert np.array_equal(dados["linha"], np.arange(500))
+    assert np.array_equal(dados["saldo"], esperado.saldo)
+    assert np.array_equal(dados["payback"], calcular_payback(esperado.saldo), equal_nan=True)
+    caros = dados.selecionar(dados["capex"] > 40000, colunas=("linha", "conta_nova"))
+    assert caros["conta_nova"].shape == (int((esperado.capex > 40000).sum()), 300)
+    assert np.array_equal(caros["conta_nova"], esperado.conta_nova[esperado.capex > 40000])
+
+
+def test_series_float32(tmp_path):
+    with GravadorResultados(str(tmp_path / "f32"), dtype_series=np.float32) as gravador:
+        gravador.acrescentar(calcular_lote([300.0, 400.0], 50, IRR, TEMP))
+    dados = ResultadosColunares(str(tmp_path / "f32"))
+    assert dados["saldo"].dtype == np.float32 and dados["qtd"].dtype == np.int64
+
+
+def test_nao_apaga_diretorio_alheio(diretorio, tmp_path):
+    dados = tmp_path / "dados"
+    dados.mkdir()
+    (dados / "importante.txt").write_text("não apagar")
+    with pytest.raises(FileExistsError):
+        GravadorResultados(str(dados))
+    assert (dados / "importante.txt").read_text() == "não apagar"
+    assert not (tmp_path / "dados.tmp").exists()
+
+    # Uma exportação anterior só é trocada em fechar(): até lá continua legível
+    gravador = GravadorResultados(diretorio)
+    gravador.acrescentar(calcular_lote([300.0], 50, IRR, TEMP))
+    assert len(ResultadosColunares(diretorio)) == 500
+    gravador.fechar()
+    assert len(ResultadosColunares(diretorio)) == 1 and not os.path.exists(diretorio + ".tmp")
+
+
+def test_falha_no_meio_mantem_a_exportacao_anterior(diretorio, tmp_path, monkeypatch):
+    with pytest.raises(RuntimeError):
+        with GravadorResultados(diretorio) as gravador:
+            gravador.acrescentar(calcular_lote([300.0], 50, IRR, TEMP))
+            raise RuntimeError("lote interrompido")
+    assert len(ResultadosColunares(diretorio)) == 500 and not os.path.exists(diretorio + ".tmp")
+
+    from src import lote
+    entrada = tmp_path / "entrada.csv"
+    entrada.write_text("cidade,consumo_medio,taxa_minima,financiar,taxa_juros,meses\n"
+                       + "Natal,300,50,nao,,\n" * 4, encoding="utf-8")
+    escrever = lote._escrever
+    chamadas = []
+
+    def escrever_e_falhar(*args):
+        chamadas.append(1)
+        if len(chamadas) == 2:
+            raise OSError("disco cheio")
+        return escrever(*args)
+
+    monkeypatch.setattr(lote, "_escrever", escrever_e_falhar)
+    with pytest.raises(OSError):
+        processar_lote(str(entrada), str(tmp_path / "saida.csv"), workers=1, tamanho_chunk=2, exportar=diretorio,
+                       obter_clima=lambda cidade: ({m: 5.2 for m in MESES}, {m: 26.0 for m in MESES}))
+    assert len(ResultadosColunares(diretorio)) == 500 and not os.path.exists(diretorio + ".tmp")
+
+
+def test_npz_streaming_e_cotacao_unica(diretorio, tmp_path):
+    caminho = exportar_npz(diretorio, str(tmp_path / "lote.npz"))
+    with np.load(caminho) as npz:
+        assert np.array_equal(npz["saldo"], ResultadosColunares(diretorio)["saldo"])
+    tupla = calcular_tudo(450, 50, IRR, TEMP)
+    with np.load(salvar_npz(str(tmp_path / "unica.npz"), tupla)) as npz:
+        assert npz["saldo"].shape == (1, 300) and npz["qtd"][0] == tupla[0]
+        assert np.array_equal(npz["conta_antiga"][0], tupla[4])
+
+
+def test_lote_exporta_linhas_validas(tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    with open(entrada, "w", encoding="utf-8") as f:
+        f.write("cidade,consumo_medio,taxa_minima,financiar,taxa_juros,meses\n")
+        for k in range(7):
+            f.write("Fortaleza,abc,50,nao,,\n" if k == 2 else f"Fortaleza,{300 + k * 10},50,nao,,\n")
+    clima = ({m: 5.2 for m in MESES}, {m: 26.0 for m in MESES})
+    processar_lote(str(entrada), str(tmp_path / "saida.csv"), workers=1, tamanho_chunk=3,
+                   obter_clima=lambda cidade: clima, exportar=str(tmp_path / "series"))
+    dados = ResultadosColunares(str(tmp_path / "series"))
+    assert dados["linha"].tolist() == [0, 1, 3, 4, 5, 6]
+    assert np.array_equal(dados["saldo"][2], calcular_tudo(330, 50, IRR, TEMP)[6])
+
+
+def test_parquet_e_arrow(diretorio, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    tabela = pq.read_table(exportar_parquet(diretorio, str(tmp_path / "r.parquet"), tamanho=128))
+    assert tabela.num_rows == 500
+    assert np.array_equal(np.asarray(tabela.column("saldo").combine_chunks().flatten()).reshape(500, 300),
+                          ResultadosColunares(diretorio)["saldo"])
+    with pa.memory_map(exportar_arrow(diretorio, str(tmp_path / "r.arrow"))) as fonte:
+        assert pa.ipc.open_file(fonte).read_all().num_rows == 500
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from src.engineering import calcular_lote
+from src.finance import calcular_custos
+from src.financiamento import (
+    avaliar_ofertas, cronograma, grade_financiamento, parcela_price, payback_descontado, tir, vpl,
+)
+
+
+def _reconcilia(cr, valor):
+    saldo_ant = np.concatenate([np.broadcast_to(valor, cr.saldo_devedor.shape[:-1])[..., None],
+                                cr.saldo_devedor[..., :-1]], axis=-1)
+    np.testing.assert_allclose(saldo_ant - cr.saldo_devedor, cr.amortizacao, atol=1e-8)
+    np.testing.assert_allclose(cr.parcela, cr.juros + cr.amortizacao, atol=1e-8)
+
+
+def test_price_igual_a_formula_escalar():
+    cr = cronograma(10000.0, 12.0, 24)
+    np.testing.assert_allclose(cr.parcela, calcular_custos(10000.0, 12.0, 24))
+    assert cr.saldo_devedor[-1] == pytest.approx(0.0, abs=1e-8)
+    _reconcilia(cr, 10000.0)
+
+
+def test_sac_com_carencia_capitalizada():
+    cr = cronograma(12000.0, 10.0, 24, "sac", carencia=6)
+    assert cr.parcela.shape == (30,)
+    assert np.all(cr.parcela[:6] == 0) and np.all(np.diff(cr.amortizacao[6:]) == pytest.approx(0.0))
+    i = 1.1 ** (1 / 12) - 1
+    assert cr.saldo_devedor[5] == pytest.approx(12000.0 * (1 + i) ** 6)
+    assert np.all(np.diff(cr.parcela[6:]) < 0)
+    _reconcilia(cr, 12000.0)
+
+
+def test_carencia_pagando_juros_e_taxa_zero():
+    cr = cronograma(10000.0, 12.0, 12, carencia=3, pagar_juros_carencia=True)
+    np.testing.assert_allclose(cr.parcela[:3], cr.juros[:3])
+    np.testing.assert_allclose(cr.parcela[3:], calcular_custos(10000.0, 12.0, 12))
+    np.testing.assert_allclose(cronograma(1200.0, 0.0, 12).parcela, 100.0)
+    assert parcela_price(1000.0, 12.0, 0) == 0.0
+
+
+def test_grade_varia_prazo_e_taxa():
+    g = grade_financiamento([10000.0, 20000.0], [10.0, 20.0], [12, 60], "sac", carencia=2)
+    assert g.parcela.shape == (2, 2, 2, 62)
+    for a, valor in enumerate([10000.0, 20000.0]):
+        for b, taxa in enumerate([10.0, 20.0]):
+            for c, prazo in enumerate([12, 60]):
+                ref = cronograma(valor, taxa, prazo, "sac", carencia=2)
+                np.testing.assert_allclose(g.parcela[a, b, c, :prazo + 2], ref.parcela)
+                assert np.all(g.parcela[a, b, c, prazo + 2:] == 0)
+    _reconcilia(g, np.array([10000.0, 20000.0])[:, None, None])
+
+
+def test_vpl_tir_e_payback_descontado():
+    fluxos = np.full(120, 150.0)
+    taxa = tir(fluxos, 10000.0)
+    assert vpl(fluxos, taxa, 10000.0) == pytest.approx(0.0, abs=1e-6)
+    assert vpl(fluxos, 0.0, 10000.0) == pytest.approx(8000.0)
+
+    rng = np.random.default_rng(0)
+    lote = rng.uniform(50, 300, (500, 300))
+    inv = rng.uniform(5000, 20000, 500)
+    taxas = tir(lote, inv)
+    np.testing.assert_allclose(vpl(lote, taxas, inv), 0.0, atol=1e-6)
+    # Sem troca de sinal não há TIR
+    assert np.isnan(tir(np.full(10, -5.0), 100.0))
+
+    assert payback_descontado(fluxos, 0.0, 1500.0) == 10
+    assert np.isnan(payback_descontado(fluxos, 0.10, 1e6))
+
+
+def test_avaliar_ofertas_igual_ao_calculo_individual():
+    r = calcular_lote([300.0, 600.0, 900.0], 50, [5.5] * 12, [26.0] * 12)
+    economia = r.conta_antiga - r.conta_nova
+    taxas, prazos = [12.0, 18.0], [36, 60, 96]
+    of = avaliar_ofertas(economia, r.capex, taxas, prazos, tamanho_bloco=2)
+    assert of.vpl.shape == (3, 2, 3)
+    for n in range(3):
+        for a, taxa in enumerate(taxas):
+            for b, prazo in enumerate(prazos):
+                cr = cronograma(r.capex[n], taxa, prazo, horizonte=300)
+                fluxo = economia[n] - cr.parcela
+                assert of.vpl[n, a, b] == pytest.approx(vpl(fluxo))
+                assert of.parcela_inicial[n, a, b] == pytest.approx(cr.parcela[0])
+                np.testing.assert_equal(of.payback_descontado[n, a, b], payback_descontado(fluxo))
@@ -0,0 +1,92 @@
+import os
+import time
+
+import pytest
+
+from src.geocodificador import IndiceMunicipios, Municipio, normalizar_nome, separar_consulta
+
+TABELA = """codigo_ibge,nome,latitude,longitude,capital,codigo_uf
+1600303,Macapá,0.034934,-51.0694,1,16
+2304400,Fortaleza,-3.71664,-38.5423,1,23
+2201903,Bom Jesus,-9.07124,-44.359,0,22
+4302303,Bom Jesus,-28.6697,-50.4295,0,43
+3547809,Santa Bárbara d'Oeste,-22.7553,-47.4143,0,35
+3515103,Embu-Guaçu,-23.8297,-46.8136,0,35
+"""
+
+
+@pytest.fixture
+def indice(tmp_path):
+    caminho = tmp_path / "municipios.csv"
+    caminho.write_text(TABELA, encoding="utf-8")
+    return IndiceMunicipios.carregar(str(caminho))
+
+
+def test_normalizacao_e_separacao_da_uf():
+    assert normalizar_nome("  Santa Bárbara  d'Oeste ") == "santa barbara d oeste"
+    assert separar_consulta("Macapa , AP") == ("macapa", "AP")
+    assert separar_consulta("Fortaleza - Ceará, Brasil") == ("fortaleza", "CE")
+    assert separar_consulta("Embu-Guaçu/SP") == ("embu guacu", "SP")
+    assert separar_consulta("Bom Jesus") == ("bom jesus", None)
+
+
+def test_localizar_sem_acento_e_com_espacos(indice):
+    assert indice.localizar("Macapa") == Municipio("Macapá", "AP", 0.034934, -51.0694)
+    assert indice.localizar(" FORTALEZA,ce ").uf == "CE"
+    assert indice.localizar("santa barbara doeste, SP").nome == "Santa Bárbara d'Oeste"
+
+
+def test_homonimos_respeitam_uf(indice):
+    assert indice.localizar("Bom Jesus, RS").lat == pytest.approx(-28.6697)
+    assert indice.localizar("Bom Jesus, Piauí").lat == pytest.approx(-9.07124)
+    assert indice.localizar("Bom Jesus, CE") is None
+
+
+def test_aproximado_e_prefixo(indice):
+    assert indice.localizar("Fortaleja, CE").nome == "Fortaleza"
+    assert indice.localizar("Fortaleja, CE", aproximado=False) is None
+    assert indice.localizar("Fortaleja") is None   # sem UF, só nomes exatos
+    assert [m.uf for m in indice.buscar("bom")] == ["PI", "RS"]
+    assert [m.nome for m in indice.buscar("Bo", uf="rs")] == ["Bom Jesus"]
+
+
+def test_lote_de_5570_municipios_sem_rede():
+    municipios = [Municipio(f"Município {k}", "SP", -20.0 - k / 1000, -47.0) for k in range(5570)]
+    indice = IndiceMunicipios(municipios)
+    consultas = [f"Municipio {k}, SP" for k in range(5570)]
+    inicio = time.perf_counter()
+    resultado = indice.localizar_lote(consultas)
+    assert time.perf_counter() - inicio < 0.5
+    assert all(r is not None for r in resultado) and resultado[123].lat == pytest.approx(-20.123)
+
+
+def test_get_data_consulta_indice_antes_do_nominatim(geodata_stub, indice, monkeypatch, tmp_path):
+    from src import geodata
+    caminho = tmp_path / "municipios.csv"
+    monkeypatch.setattr(geodata, "MUNICIPIOS_CSV", str(caminho))
+    irr, _ = geodata.get_data("Macapa ")
+    assert irr is not None
+    assert geodata_stub.chamadas["search"] == []
+    assert geodata_stub.chamadas["nasa"][0][1:] == (0.0, -51.0)
+
+
+def test_nome_parecido_nao_sobrepoe_o_cache(geodata_stub, indice, monkeypatch, tmp_path, caplog):
+    from src import geodata
+    monkeypatch.setattr(geodata, "MUNICIPIOS_CSV", str(tmp_path / "municipios.csv"))
+    geodata._store().set(geodata.NS_GEOCODE, geodata._normalizar_cidade("Fortaleja, CE"),
+                         {"lat": -1.0, "lon": -2.0, "address": "Fortaleja"})
+    assert geodata._geocodificar("Fortaleja, CE") == (-1.0, -2.0, "Fortaleja")
+
+    with caplog.at_level("INFO", logger="src.geodata"):
+        assert geodata._geocodificar("Fortalezza, CE")[2] == "Fortaleza, CE"
+    assert "Fortaleza, CE" in caplog.text
+    assert geodata_stub.chamadas["search"] == []
+
+
+def test_municipio_fora_da_tabela_vai_ao_nominatim(geodata_stub, monkeypatch):
+    from src import geodata
+    monkeypatch.setattr(geodata, "MUNICIPIOS_CSV", os.path.join(os.path.dirname(__file__), "..", "data", "municipios.csv"))
+    geodata_stub.cidades["Palma"] = (-21.37, -42.31)   # Palma/MG, parecido com Palmas/TO (capital)
+    assert geodata._geocodificar("Palma")[:2] == (-21.37, -42.31)
+    assert geodata._geocodificar("Teresinha") is None
+    assert set(geodata_stub.chamadas["search"]) == {"Palma", "Teresinha"}
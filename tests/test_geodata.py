@@ -0,0 +1,151 @@
+import json
+import os
+import time
+
+import pytest
+
+from src import geodata
+
+MESES = geodata.MESES
+
+
+@pytest.fixture
+def cache_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(geodata, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(geodata.time, "sleep", lambda s: None)
+    monkeypatch.setattr(geodata, "_LIMITE_NOMINATIM", geodata._LimitadorTaxa(1000.0))
+    monkeypatch.setattr(geodata, "MUNICIPIOS_CSV", None)
+    return tmp_path
+
+
+class _GeoFalso:
+    """Geocodificador em memória: nome normalizado -> (lat, lon)."""
+    coords = {"fortaleza, ce": (-3.7319, -38.5267), "caucaia, ce": (-3.7361, -38.6531)}
+    chamadas = []
+
+    def __init__(self, user_agent=None, **kwargs):
+        pass
+
+    def geocode(self, cidade, timeout=None):
+        _GeoFalso.chamadas.append(cidade)
+        lat_lon = self.coords.get(geodata._normalizar_cidade(cidade))
+        if lat_lon is None:
+            return None
+        return type("Loc", (), {"latitude": lat_lon[0], "longitude": lat_lon[1], "address": cidade})()
+
+
+def test_normalizar_cidade():
+    assert geodata._normalizar_cidade("Fortaleza, CE") == "fortaleza, ce"
+    assert geodata._normalizar_cidade("  fortaleza,CE ") == "fortaleza, ce"
+    assert geodata._normalizar_cidade("Macapá ,  AP") == "macapa, ap"
+
+
+def test_cidades_vizinhas_compartilham_celula(cache_tmp, monkeypatch):
+    nasa = []
+
+    def nasa_falsa(lat, lon, timeout=10):
+        nasa.append((lat, lon))
+        return {"ALLSKY_SFC_SW_DWN": {m: 5.5 for m in MESES}, "T2M": {m: 27.0 for m in MESES}}
+
+    _GeoFalso.chamadas = []
+    monkeypatch.setattr(geodata, "Nominatim", _GeoFalso)
+    monkeypatch.setattr(geodata, "get_nasa_data", nasa_falsa)
+
+    irr, temp = geodata.get_data("Fortaleza, CE")
+    assert irr["JAN"] == 5.5 and temp["DEC"] == 27.0
+    assert geodata.get_data("fortaleza,CE") == (irr, temp)
+    assert geodata.get_data("Caucaia, CE") == (irr, temp)
+
+    assert nasa == [(-3.5, -38.5)]
+    assert _GeoFalso.chamadas == ["Fortaleza, CE", "Caucaia, CE"]
+
+    store = geodata._store()
+    assert geodata.clear_cache("FORTALEZA, CE") is True
+    assert store.get(geodata.NS_CLIMA, geodata._chave_celula(-3.5, -38.5)) is None
+    assert store.get(geodata.NS_GEOCODE, "fortaleza, ce") is None
+    assert store.get(geodata.NS_GEOCODE, "caucaia, ce") is not None
+
+
+def test_cache_json_legado_e_migrado(cache_tmp, monkeypatch):
+    monkeypatch.setattr(geodata, "Nominatim", _GeoFalso)
+    with open(cache_tmp / "geo_Recife__PE.json", "w", encoding="utf-8") as f:
+        json.dump({"irr": {m: 5.0 for m in MESES}, "temp": {m: 26.0 for m in MESES}, "ts": 0}, f)
+
+    irr, temp = geodata.get_data("Recife, PE", ttl_seconds=0)
+    assert irr["JAN"] == 5.0
+    assert os.listdir(cache_tmp) and (cache_tmp / geodata.CACHE_DB).exists()
+    # ts = 0 é um instante válido (não vira o mtime do arquivo)
+    assert geodata._store().get(geodata.NS_LEGADO, geodata._chave_legado("Recife__PE"))[1] == 0.0
+
+
+def test_limitador_taxa():
+    limitador = geodata._LimitadorTaxa(20.0)
+    inicio = time.monotonic()
+    for _ in range(5):
+        limitador.aguardar()
+    assert time.monotonic() - inicio >= 4 / 20.0 * 0.9
+
+
+def test_get_data_many_paralelo_contra_stub(geodata_stub):
+    stub = geodata_stub
+    stub.atraso_nasa = 0.2
+    cidades = [f"Cidade {k}, XX" for k in range(12)]
+    for k, nome in enumerate(cidades):
+        stub.cidades[nome] = (-10.0 - k, -40.0)  # uma célula por cidade
+    stub.cidades["Vizinha, XX"] = (-10.1, -40.1)   # mesma célula de "Cidade 0"
+
+    inicio = time.monotonic()
+    res = geodata.get_data_many(cidades + ["Vizinha, XX", cidades[0]], workers=8)
+    decorrido = time.monotonic() - inicio
+
+    assert len(res) == 13 and all(irr is not None for irr, _ in res.values())
+    assert res["Vizinha, XX"] == res[cidades[0]]
+    assert len(stub.chamadas["nasa"]) == 12
+    assert decorrido < 12 * 0.2  # bem abaixo da soma das latências em série
+
+
+def test_falha_na_nasa_nao_repete_geocodificacao(geodata_stub):
+    stub = geodata_stub
+    stub.cidades["Natal, RN"] = (-5.79, -35.21)
+    stub.falhas_nasa = 2
+
+    irr, temp = geodata.get_data("Natal, RN", retries=3)
+    assert irr is not None
+    assert stub.chamadas["search"] == ["Natal, RN"]
+    assert len(stub.chamadas["nasa"]) == 3
+
+
+def test_stale_while_revalidate(geodata_stub):
+    stub = geodata_stub
+    stub.cidades["Sobral, CE"] = (-3.69, -40.35)
+    stub.atraso_nasa = 0.3
+    store = geodata._store()
+    store.set(geodata.NS_GEOCODE, "sobral, ce", {"lat": -3.69, "lon": -40.35, "address": "Sobral"})
+    celula = geodata._chave_celula(*geodata._celula_grade(-3.69, -40.35))
+    velho = {"irr": {m: 1.0 for m in MESES}, "temp": {m: 20.0 for m in MESES}}
+    store.set(geodata.NS_CLIMA, celula, velho, ts=0.0)
+
+    avisos = []
+    inicio = time.monotonic()
+    irr, _ = geodata.get_data("Sobral, CE", stale_while_revalidate=True, on_refresh=lambda c, i, t: avisos.append((c, i["JAN"])))
+    irr2, _ = geodata.get_data("Sobral, CE", stale_while_revalidate=True)
+    assert time.monotonic() - inicio < 0.3
+    assert irr["JAN"] == 1.0 and irr2["JAN"] == 1.0
+
+    geodata.aguardar_revalidacoes(timeout=5)
+    assert len(stub.chamadas["nasa"]) == 1
+    assert avisos and avisos[0][0] == "Sobral, CE" and avisos[0][1] != 1.0
+    assert geodata.get_data("Sobral, CE")[0]["JAN"] == avisos[0][1]
+
+
+def test_sem_revalidacao_vencido_so_apos_falha(geodata_stub):
+    stub = geodata_stub
+    stub.falhas_nasa = 10
+    store = geodata._store()
+    store.set(geodata.NS_GEOCODE, "crato, ce", {"lat": -7.23, "lon": -39.41, "address": "Crato"})
+    celula = geodata._chave_celula(*geodata._celula_grade(-7.23, -39.41))
+    store.set(geodata.NS_CLIMA, celula, {"irr": {m: 2.0 for m in MESES}, "temp": {m: 20.0 for m in MESES}}, ts=0.0)
+
+    assert geodata.get_data("Crato, CE", retries=2)[0]["JAN"] == 2.0
+    assert len(stub.chamadas["nasa"]) == 2
+    assert geodata.get_data("Crato, CE", retries=1, allow_stale_fallback=False) == (None, None)
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.gradeclima import MESES, GradeClima, Limites, construir_grade
+
+LIMITES = Limites(-10.0, -8.0, -40.0, -38.0)
+
+
+def _irr(lat, lon, k):
+    return 5.0 + 0.1 * lat + 0.05 * lon + 0.01 * k
+
+
+def _temp(lat, lon, k):
+    return 25.0 - 0.2 * lat + 0.1 * k
+
+
+@pytest.fixture
+def grade(tmp_path):
+    """Grade 5x5 sintética: JSON de ponto por nó, uma linha CSV regional e um nó sem dados."""
+    fontes = tmp_path / "power"
+    fontes.mkdir()
+    for lat in np.arange(-10.0, -7.9, 0.5):
+        for lon in np.arange(-40.0, -37.9, 0.5):
+            if (lat, lon) == (-8.0, -38.0):
+                continue   # coberto pelo CSV
+            irr = {m: _irr(lat, lon, k) for k, m in enumerate(MESES)}
+            temp = {m: _temp(lat, lon, k) for k, m in enumerate(MESES)}
+            if (lat, lon) == (-10.0, -40.0):
+                irr = {m: -999.0 for m in MESES}
+            payload = {"geometry": {"coordinates": [lon, lat, 10.0]},
+                       "properties": {"parameter": {"ALLSKY_SFC_SW_DWN": irr, "T2M": temp}}}
+            (fontes / f"p_{lat}_{lon}.json").write_text(json.dumps(payload))
+    linhas = ["-BEGIN HEADER-", "NASA/POWER Climatology", "-END HEADER-",
+              "PARAMETER,LAT,LON," + ",".join(MESES) + ",ANN"]
+    for nome, f in (("ALLSKY_SFC_SW_DWN", _irr), ("T2M", _temp)):
+        linhas.append(f"{nome},-8.0,-38.0," + ",".join(str(f(-8.0, -38.0, k)) for k in range(12)) + ",0")
+    (fontes / "regional.csv").write_text("\n".join(linhas))
+    return construir_grade([str(fontes)], str(tmp_path / "grade"), passo=0.5, limites=LIMITES)
+
+
+def test_arquivos_e_mmap(grade, tmp_path):
+    assert (tmp_path / "grade.npy").exists() and (tmp_path / "grade.json").exists()
+    reaberta = GradeClima(str(tmp_path / "grade"))
+    assert isinstance(reaberta.dados, np.memmap)
+    assert reaberta.dados.shape == (5, 5, 24) and reaberta.dados.dtype == np.float32
+
+
+def test_no_mais_proximo_e_bilinear(grade):
+    irr, temp = grade.consultar(-8.1, -38.1, metodo="proximo")
+    assert irr["JAN"] == pytest.approx(_irr(-8.0, -38.0, 0), abs=1e-4)
+    assert temp["DEC"] == pytest.approx(_temp(-8.0, -38.0, 11), abs=1e-4)
+
+    # Campo linear: a interpolação bilinear reproduz o valor exato entre os nós
+    irr, temp = grade.consultar(-8.8, -38.35)
+    assert irr["JUN"] == pytest.approx(_irr(-8.8, -38.35, 5), abs=1e-4)
+    assert temp["MAR"] == pytest.approx(_temp(-8.8, -38.35, 2), abs=1e-4)
+
+
+def test_no_sem_dados_e_fora_da_grade(grade):
+    assert grade.consultar(-10.0, -40.0, metodo="proximo") is None
+    irr, _ = grade.consultar(-9.9, -39.9)   # pesos renormalizados nos nós válidos
+    assert np.isfinite(irr["JAN"])
+    assert grade.consultar(-3.7, -38.5) is None
+    with pytest.raises(ValueError):
+        grade.consultar(-9.0, -39.0, metodo="cubico")
+
+
+def test_get_data_usa_grade_antes_da_nasa(grade, geodata_stub, monkeypatch):
+    from src import geodata
+    monkeypatch.setattr(geodata, "GRADE_CLIMA_PATH", grade.caminho)
+    geodata_stub.cidades["Interior, XX"] = (-8.8, -38.35)
+    geodata_stub.cidades["Litoral, XX"] = (-3.7, -38.5)   # fora da grade
+
+    irr, _ = geodata.get_data("Interior, XX")
+    assert irr["JAN"] == pytest.approx(_irr(-8.8, -38.35, 0), abs=1e-4)
+    assert geodata_stub.chamadas["nasa"] == []
+
+    assert geodata.get_data("Litoral, XX")[0] is not None
+    assert len(geodata_stub.chamadas["nasa"]) == 1
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from src import config
+from src.engineering import (
+    FRACAO_INJECAO, ResultadoCotacao, _geracao_mensal, _pr_termico, _simular_fluxo, _tarifas_padrao, calcular_payback,
+    calcular_tudo,
+)
+from src.horario import (
+    DIAS_MES, HORAS_ANO, calcular_lote_horario, calcular_tudo_horario, ler_serie_horaria, perfil_carga,
+    sintetizar_irradiancia,
+)
+
+IRR = [5.5, 5.8, 5.2, 4.9, 5.1, 5.3, 5.6, 6.0, 6.2, 6.1, 6.0, 5.7]
+TEMP = [27.0] * 12
+INICIO_MES = np.concatenate(([0], np.cumsum(DIAS_MES * 24)[:-1]))
+
+
+def test_sintese_preserva_hsp_mensal():
+    g = sintetizar_irradiancia(IRR, latitude=-3.7)
+    assert g.shape == (HORAS_ANO,)
+    np.testing.assert_allclose(np.add.reduceat(g, INICIO_MES) / DIAS_MES, IRR)
+    dia = g.reshape(365, 24)
+    assert np.all(dia[:, :5] == 0) and np.all(dia[:, 20:] == 0) and np.all(dia[:, 11] > 0)
+
+
+def test_perfil_carga_soma_o_consumo_mensal():
+    carga = perfil_carga("comercial", [300.0, 900.0])
+    np.testing.assert_allclose(np.add.reduceat(carga, INICIO_MES, axis=1), [[300.0] * 12, [900.0] * 12])
+    with pytest.raises(ValueError):
+        perfil_carga("industrial", 300.0)
+
+
+def test_injecao_explicita_igual_a_divisao_fixa():
+    ger = np.linspace(300.0, 500.0, 300)[None, :]
+    tar, fio_b = _tarifas_padrao(0.08)
+    padrao = _simular_fluxo(400.0, 50.0, ger, tar, fio_b, 0.0, 0, -10000.0)
+    explicito = _simular_fluxo(400.0, 50.0, ger, tar, fio_b, 0.0, 0, -10000.0, injecao_kwh=ger * FRACAO_INJECAO)
+    for a, b in zip(padrao, explicito):
+        np.testing.assert_allclose(a, b)
+
+
+def test_autoconsumo_depende_do_perfil_e_balanco_fecha():
+    res = calcular_lote_horario(400.0, 50, IRR, TEMP, -3.7, "residencial")
+    com = calcular_lote_horario(400.0, 50, IRR, TEMP, -3.7, "comercial")
+    assert com.fracao_autoconsumo[0] > res.fracao_autoconsumo[0]
+    assert com.total_com[0] < res.total_com[0]
+    np.testing.assert_allclose(res.autoconsumo_kwh + res.injecao_kwh, res.geracao_kwh)
+    assert np.all(res.injecao_kwh >= 0) and np.all(res.autoconsumo_kwh <= 400.0 + 1e-9)
+    # Mesmo dimensionamento e investimento do modo mensal
+    qtd, pot, capex, _, ant, _, _, tot_sem, _ = calcular_tudo(400.0, 50, IRR, TEMP)
+    assert (res.qtd[0], res.pot_wp[0], res.capex[0]) == (qtd, pot, capex)
+    np.testing.assert_allclose(res.conta_antiga[0], ant)
+
+
+def test_mesmas_convencoes_do_modo_mensal():
+    temp = [24.0, 25.0, 26.0, 27.0, 28.0, 29.0, 30.0, 29.0, 28.0, 27.0, 26.0, 25.0]
+    carga_solar = sintetizar_irradiancia(IRR, latitude=-3.7)   # carga com o formato da geração
+    r = calcular_lote_horario(400.0, 50, IRR, temp, -3.7, carga_solar)
+    # Geração mensal igual à de engineering: PR da temperatura média e meses de 30 dias
+    esperado = _geracao_mensal(float(r.pot_wp[0]), np.asarray(IRR), float(_pr_termico(np.mean(temp))),
+                              config.DEGRADACAO_ANUAL)
+    np.testing.assert_allclose(r.geracao_kwh[0], esperado, rtol=1e-12)
+    # Com a carga no formato do sol, só o excedente do mês é injetado; o faturamento é o mensal
+    injecao = np.maximum(esperado - 400.0, 0.0)
+    np.testing.assert_allclose(r.injecao_kwh[0], injecao, rtol=1e-9, atol=1e-9)
+    tar, fio_b = _tarifas_padrao(config.INFLACAO_ENERGETICA_AA)
+    _, conta_nova, _ = _simular_fluxo(400.0, 50.0, esperado, tar, fio_b, 0.0, 0, -r.capex[0], injecao_kwh=injecao)
+    np.testing.assert_allclose(r.conta_nova[0], conta_nova, rtol=1e-9)
+    # A única diferença para calcular_tudo é a divisão fixa FRACAO_INJECAO
+    mensal = calcular_tudo(400.0, 50, IRR, temp)
+    _, conta_fixa, _ = _simular_fluxo(400.0, 50.0, esperado, tar, fio_b, 0.0, 0, -r.capex[0])
+    np.testing.assert_allclose(mensal.conta_nova, conta_fixa, rtol=1e-9)
+
+
+def test_lote_float32_e_escalar_coincidem():
+    consumo = np.array([250.0, 600.0, 1500.0])
+    lote = calcular_lote_horario(consumo, [30, 50, 100], IRR, TEMP, [-3.7, -23.5, -30.0], "comercial",
+                                 financiar=[False, True, False], taxa_aa=15.0, meses=48, tamanho_bloco=2)
+    compacto = calcular_lote_horario(consumo, [30, 50, 100], IRR, TEMP, [-3.7, -23.5, -30.0], "comercial",
+                                     financiar=[False, True, False], taxa_aa=15.0, meses=48, dtype=np.float32)
+    np.testing.assert_allclose(compacto.saldo, lote.saldo, rtol=1e-4, atol=1.0)
+    for k, lat in enumerate([-3.7, -23.5, -30.0]):
+        fin = k == 1
+        r = calcular_tudo_horario(consumo[k], [30, 50, 100][k], IRR, TEMP, fin, (15.0, 48) if fin else None,
+                                  latitude=lat, perfil="comercial")
+        np.testing.assert_allclose(r[6], lote.saldo[k])
+        assert isinstance(r, ResultadoCotacao) and r.payback == calcular_payback(lote.saldo[k])
+
+
+def test_ler_serie_horaria_csv_w_m2_bissexto(tmp_path):
+    dia = np.r_[np.zeros(6), np.sin(np.linspace(0, np.pi, 12)) * 800.0, np.zeros(6)]
+    serie = np.tile(dia, 366)
+    caminho = tmp_path / "ghi.csv"
+    caminho.write_text("data;ghi_w_m2\n" + "\n".join(f"h{k};{v:.3f}".replace(".", ",") for k, v in enumerate(serie)))
+    lida = ler_serie_horaria(str(caminho))
+    assert lida.shape == (HORAS_ANO,)
+    np.testing.assert_allclose(lida[:24], dia / 1000.0, atol=1e-6)
+    r = calcular_lote_horario(400.0, 50, None, TEMP, irr_horaria=lida)
+    assert r.geracao_kwh.sum() > 0
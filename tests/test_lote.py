@@ -0,0 +1,70 @@
+import csv
+import os
+
+from src.lote import processar_lote, COLUNAS_SAIDA
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+AMOSTRA = os.path.join(os.path.dirname(__file__), "..", "data", "sample_inputs.csv")
+
+
+def _clima_fixo(chamadas):
+    def obter(cidade):
+        chamadas.append(cidade)
+        if cidade == "Atlantida":
+            return None, None
+        return {m: 5.2 for m in MESES}, {m: 26.0 for m in MESES}
+    return obter
+
+
+def test_processar_lote_amostra(tmp_path):
+    chamadas = []
+    saida = tmp_path / "resultado.csv"
+    stats = processar_lote(AMOSTRA, str(saida), workers=1, tamanho_chunk=2, obter_clima=_clima_fixo(chamadas))
+
+    with open(saida, encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert list(linhas[0].keys()) == COLUNAS_SAIDA
+    assert [l["cidade"] for l in linhas] == ["Macapa", "Belem", "Rio de Janeiro", "Sao Paulo", "Curitiba"]
+    assert stats == {"linhas": 5, "ok": 5, "erros": 0, "cidades": 5}
+    assert all(float(l["capex"]) > 0 and l["erro"] == "" for l in linhas)
+    assert float(linhas[0]["parcela"]) > 0 and float(linhas[1]["parcela"]) == 0
+
+
+def test_processar_lote_pool_agrupa_cidades(tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    with open(entrada, "w", encoding="utf-8") as f:
+        f.write("cidade,consumo_medio,taxa_minima,financiar,taxa_juros,meses\n")
+        for k in range(30):
+            f.write(f"Fortaleza, {200 + k * 10}, 50, {'sim' if k % 2 else 'nao'}, 12, 48\n")
+        f.write("Atlantida, 300, 30, nao, , \n")
+        f.write("Fortaleza, abc, 30, nao, , \n")
+    chamadas = []
+    saida = tmp_path / "resultado.csv"
+    stats = processar_lote(str(entrada), str(saida), workers=2, tamanho_chunk=8, obter_clima=_clima_fixo(chamadas))
+
+    assert sorted(chamadas) == ["Atlantida", "Fortaleza"]
+    assert stats["ok"] == 30 and stats["erros"] == 2
+    with open(saida, encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert len(linhas) == 32
+    assert [float(l["consumo_medio"]) for l in linhas[:30]] == [200 + k * 10 for k in range(30)]
+    assert linhas[30]["erro"] and linhas[31]["erro"]
+
+
+def test_falha_de_clima_afeta_so_a_cidade(tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    with open(entrada, "w", encoding="utf-8") as f:
+        f.write("cidade,consumo_medio,taxa_minima,financiar,taxa_juros,meses\n")
+        f.write("Natal,300,50,nao,,\nQuebrada,400,50,nao,,\nNatal,500,50,nao,,\nQuebrada,600,50,nao,,\n")
+
+    def obter(cidade):
+        if cidade == "Quebrada":
+            raise RuntimeError("database is locked")
+        return {m: 5.2 for m in MESES}, {m: 26.0 for m in MESES}
+
+    saida = tmp_path / "resultado.csv"
+    stats = processar_lote(str(entrada), str(saida), workers=1, obter_clima=obter)
+    assert stats["ok"] == 2 and stats["erros"] == 2
+    with open(saida, encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert [bool(l["erro"]) for l in linhas] == [False, True, False, True]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src.engineering import _selecionar_inversor, calcular_tudo
+from src.otimizacao import otimizar_dimensionamento
+
+IRR = [5.5, 5.8, 5.2, 4.9, 5.1, 5.3, 5.6, 6.0, 6.2, 6.1, 6.0, 5.7]
+TEMP = [27.0] * 12
+
+
+@pytest.mark.parametrize("consumo,taxa,financiar", [(400, 50, False), (150, 100, False), (900, 50, True)])
+def test_candidato_da_formula_igual_a_calcular_tudo(consumo, taxa, financiar):
+    r = otimizar_dimensionamento(consumo, taxa, IRR, TEMP, financiar, 18.0, 60)
+    qtd, pot, capex, parc, _, _, _, tot_sem, tot_com = calcular_tudo(consumo, taxa, IRR, TEMP, financiar, (18.0, 60))
+    f = r.formula()
+    assert (f["qtd"], f["pot_wp"]) == (qtd, pot)
+    assert f["capex"] == pytest.approx(capex) and f["parcela"] == pytest.approx(parc)
+    assert f["economia"] == pytest.approx(tot_sem - tot_com)
+
+
+def test_otimo_e_o_maior_vpl_da_fronteira():
+    r = otimizar_dimensionamento(900, 50, IRR, TEMP)
+    fr = r.fronteira
+    assert r.melhor()["vpl"] == fr.vpl.max() >= r.formula()["vpl"]
+    assert fr.pareto[r.indice] and fr.pareto.sum() >= 1
+    # Um candidato por quantidade de módulos, com o inversor da escada de calcular_tudo
+    assert np.all(np.diff(fr.qtd) == 2)
+    assert np.array_equal(fr.inv_w, _selecionar_inversor(fr.pot_wp))
+    # Pareto: ordenados por capex, o VPL é estritamente crescente
+    ordem = np.argsort(fr.capex[fr.pareto])
+    assert np.all(np.diff(fr.vpl[fr.pareto][ordem]) > 0)
+
+
+def test_criterio_payback():
+    r = otimizar_dimensionamento(400, 50, IRR, TEMP, criterio="payback")
+    pb = np.where(np.isnan(r.fronteira.payback), np.inf, r.fronteira.payback)
+    assert r.melhor()["payback"] == pb.min()
+    with pytest.raises(ValueError):
+        otimizar_dimensionamento(400, 50, IRR, TEMP, criterio="tir")
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from src import perf
+
+
+@pytest.fixture(autouse=True)
+def perf_limpo():
+    perf.desativar()
+    perf.zerar_contadores()
+    yield
+    perf.desativar()
+    perf.zerar_contadores()
+
+
+def test_span_desativado_nao_registra():
+    assert perf.span("x") is perf.span("y")   # contexto nulo compartilhado
+    with perf.span("x"):
+        pass
+    perf.ativar()
+    perf.desativar()
+    assert perf.trace()["spans"] == []
+
+
+def test_spans_aninhados_e_fases():
+    perf.ativar()
+    with perf.span("externo"):
+        for _ in range(3):
+            with perf.span("interno"):
+                pass
+    t = perf.trace()
+    assert [s["profundidade"] for s in t["spans"] if s["nome"] == "interno"] == [1, 1, 1]
+    assert t["fases"]["interno"]["chamadas"] == 3
+    assert t["fases"]["externo"]["total_s"] >= t["fases"]["interno"]["total_s"]
+    json.dumps(t)
+
+
+def test_contadores_de_cache_e_retentativas(geodata_stub):
+    from src import geodata
+    geodata_stub.cidades["Natal, RN"] = (-5.79, -35.21)
+    geodata_stub.falhas_nasa = 1
+
+    geodata.get_data("Natal, RN", retries=3)
+    geodata.get_data("Natal, RN")
+    c = perf.contadores()
+    assert c["retentativas"] == 1
+    assert c["nasa_consultas"] == 2
+    assert c["nominatim_consultas"] == 1
+    assert c["cache_faltas"] == 2   # entrada legada + célula climática
+    assert c["cache_acertos"] == 1
+    assert c["geocode_cache_acertos"] == 1
+
+    texto = perf.formato_prometheus()
+    assert "solar_cache_acertos_total 1" in texto
+
+
+def test_cli_profile_grava_trace_por_fase(geodata_stub, tmp_path):
+    from src.cli import main
+    geodata_stub.cidades["Natal, RN"] = (-5.79, -35.21)
+    trace = tmp_path / "trace.json"
+    prof = tmp_path / "run.prof"
+
+    main(["--cidade", "Natal, RN", "--consumo", "450", "--taxa", "50", "--no-show", "--output", str(tmp_path),
+          "--profile", str(trace), "--cprofile", str(prof)])
+
+    fases = json.loads(trace.read_text())["fases"]
+    for nome in ("cli.total", "geodata.nasa", "geodata.nominatim", "engineering.simulacao", "viz.savefig"):
+        assert nome in fases
+    assert prof.stat().st_size > 0
+    assert not perf.ativo()
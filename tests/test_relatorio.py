@@ -0,0 +1,67 @@
+import csv
+import os
+import re
+import tracemalloc
+
+from src.engineering import calcular_tudo, datasheet_tecnico
+from src.lote import processar_lote
+from src.relatorio import RelatorioPDF, _pagina_processo, gerar_pdf, gerar_pdfs
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+IRR = [5.2] * 12
+TEMP = [26.0] * 12
+
+
+def _paginas(caminho):
+    with open(caminho, "rb") as f:
+        return len(re.findall(rb"/Type /Page\b(?!s)", f.read()))
+
+
+def test_pdf_unico_com_dashboard_e_datasheet(tmp_path):
+    vista = calcular_tudo(450, 50, IRR, TEMP)
+    financiado = calcular_tudo(900, 50, IRR, TEMP, financiar=True, fin_dados=(15.0, 60))
+    caminho = gerar_pdf([("Natal, RN", vista, False), ("Recife, PE", financiado, True)], str(tmp_path / "campanha.pdf"))
+    assert _paginas(caminho) == 4
+    # O template do datasheet ficou com a última proposta
+    pagina = _pagina_processo()
+    d = datasheet_tecnico(financiado.qtd, financiado.inv_w)
+    assert "RECIFE" in pagina._cabecalho.get_text()
+    assert pagina._valores["cabo"].get_text() == d.cabo
+    assert pagina._valores["parcela"].get_text() == f"R$ {financiado.parcela:,.2f}"
+    assert pagina._valores["tir"].get_text() == "—"
+
+    so_dashboard = gerar_pdf([("Natal, RN", vista, False)], str(tmp_path / "dash.pdf"), datasheet=False)
+    assert _paginas(so_dashboard) == 1
+
+
+def test_memoria_estavel_por_pagina(tmp_path):
+    resultados = [calcular_tudo(300 + 50 * k, 50, IRR, TEMP) for k in range(4)]
+    with RelatorioPDF(str(tmp_path / "longo.pdf"), datasheet=False) as pdf:
+        for r in resultados:
+            pdf.adicionar("Natal, RN", r)
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        for k in range(8):
+            pdf.adicionar("Natal, RN", resultados[k % 4])
+        crescimento = tracemalloc.get_traced_memory()[0] - antes
+        tracemalloc.stop()
+    assert pdf.paginas == 12
+    assert crescimento < 8 * 50_000
+
+
+def test_pdfs_por_cliente_e_no_lote(tmp_path):
+    propostas = [("Natal, RN", calcular_tudo(400 + k, 50, IRR, TEMP), False) for k in range(2)]
+    caminhos = gerar_pdfs(propostas, str(tmp_path / "clientes"), workers=1)
+    assert len(set(caminhos)) == 2 and all(_paginas(c) == 2 for c in caminhos)
+
+    entrada = tmp_path / "entrada.csv"
+    with open(entrada, "w", encoding="utf-8") as f:
+        f.write("cidade,consumo_medio,taxa_minima,financiar,taxa_juros,meses\n")
+        f.write("Natal,350,50,nao,,\nNatal,abc,50,nao,,\nNatal,500,50,sim,14,48\n")
+    clima = ({m: 5.2 for m in MESES}, {m: 26.0 for m in MESES})
+    processar_lote(str(entrada), str(tmp_path / "saida.csv"), workers=1, obter_clima=lambda cidade: clima,
+                   pdf=str(tmp_path / "lote.pdf"), out_dir_pdfs=str(tmp_path / "lote_pdfs"))
+    assert _paginas(tmp_path / "lote.pdf") == 4
+    with open(tmp_path / "saida.csv", encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert linhas[1]["pdf"] == "" and all(os.path.isfile(linhas[k]["pdf"]) for k in (0, 2))
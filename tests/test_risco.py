@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.engineering import calcular_tudo
+from src.risco import ParametrosRisco, simular_cenarios
+from src.viz import plotar_bandas_risco
+
+IRR = [5.5, 5.8, 5.2, 4.9, 5.1, 5.3, 5.6, 6.0, 6.2, 6.1, 6.0, 5.7]
+TEMP = [27.0] * 12
+SEM_INCERTEZA = ParametrosRisco(inflacao_desvio=0, degradacao_desvio=0, choque_prob=0, irradiacao_desvio=0)
+
+
+def test_sem_incerteza_reproduz_cenario_deterministico():
+    for financiar in (False, True):
+        r = simular_cenarios(400, 50, IRR, TEMP, financiar, 18.0, 60, n_cenarios=8, parametros=SEM_INCERTEZA)
+        _, _, capex, parc, _, _, saldo, tot_sem, tot_com = calcular_tudo(400, 50, IRR, TEMP, financiar, (18.0, 60))
+        assert r.capex == capex and r.parcela == parc
+        np.testing.assert_allclose(r.saldo_bandas, np.broadcast_to(saldo, r.saldo_bandas.shape), atol=1e-6)
+        np.testing.assert_allclose(r.economia, tot_sem - tot_com)
+
+
+def test_bandas_ordenadas_e_reprodutiveis():
+    r = simular_cenarios(400, 50, IRR, TEMP, n_cenarios=2000, seed=7)
+    r2 = simular_cenarios(400, 50, IRR, TEMP, n_cenarios=2000, seed=7)
+    np.testing.assert_array_equal(r.saldo_bandas, r2.saldo_bandas)
+    assert r.saldo_bandas.shape == (3, 300) and r.payback.shape == (2000,)
+    assert np.all(np.diff(r.saldo_bandas, axis=0) >= 0)
+    assert r.payback_percentis[0] <= r.payback_percentis[1] <= r.payback_percentis[2]
+    assert r.economia_percentis[0] < r.economia_percentis[2]
+
+
+def test_payback_sem_retorno_vira_nan():
+    # Deflação tarifária e degradação alta: parte dos cenários não retorna
+    p = ParametrosRisco(inflacao_media=-0.25, inflacao_desvio=0.05, degradacao_media=0.04)
+    r = simular_cenarios(400, 100, IRR, TEMP, n_cenarios=500, parametros=p, seed=1)
+    assert 0 < r.prob_sem_retorno < 1
+    assert not np.isnan(r.payback_percentis[0])
+    assert np.isnan(r.payback_percentis[-1])
+
+
+def test_plotar_bandas_risco(tmp_path):
+    r = simular_cenarios(400, 50, IRR, TEMP, n_cenarios=200, seed=3)
+    caminho = plotar_bandas_risco("Natal, RN", r.saldo_bandas, r.percentis, r.saldo_base, out_dir=str(tmp_path), dpi=40)
+    assert caminho.startswith(str(tmp_path)) and "Risco_Natal" in caminho
@@ -0,0 +1,130 @@
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.engineering import calcular_tudo
+from src.servidor import ServidorCotacao, validar_pedido
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+IRR = {m: 5.5 for m in MESES}
+TEMP = {m: 27.0 for m in MESES}
+
+
+@pytest.fixture
+def servidor(geodata_stub):
+    geodata_stub.cidades["Natal, RN"] = (-5.79, -35.21)
+    srv = ServidorCotacao(porta=0, workers_io=4, workers_png=0)
+    porta = srv.iniciar()
+    yield srv, f"http://127.0.0.1:{porta}"
+    srv.parar()
+
+
+def _post(url, corpo):
+    dados = corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode()
+    req = urllib.request.Request(url, data=dados, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, resp.headers["Content-Type"], resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers["Content-Type"], e.read()
+
+
+def test_pedidos_simultaneos_da_mesma_cidade_buscam_uma_vez():
+    chamadas = []
+
+    def obter_clima(cidade):
+        chamadas.append(cidade)
+        time.sleep(0.2)
+        return IRR, TEMP
+
+    srv = ServidorCotacao(obter_clima=obter_clima)
+    threads = [threading.Thread(target=srv.clima, args=(nome,)) for nome in ["Natal, RN", "natal, rn", "Natal,  RN"] * 3]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(chamadas) == 1
+    assert srv.clima("NATAL, RN") == (IRR, TEMP)
+    assert len(chamadas) == 1
+
+
+def test_cotacao_json_igual_a_calcular_tudo(servidor):
+    srv, url = servidor
+    status, tipo, corpo = _post(url + "/cotacao", {"cidade": "Natal, RN", "consumo": 450, "taxa": 50})
+    assert status == 200 and tipo == "application/json"
+    r = json.loads(corpo)
+
+    irr, temp = srv.clima("Natal, RN")
+    qtd, pot, capex, _, _, _, saldo, tot_sem, tot_com = calcular_tudo(450, 50, irr, temp)
+    assert r["qtd_modulos"] == qtd
+    assert r["investimento"] == pytest.approx(capex)
+    assert r["economia_25_anos"] == pytest.approx(tot_sem - tot_com)
+    assert len(r["saldo_anual"]) == 25
+
+    _post(url + "/cotacao", {"cidade": "natal, rn", "consumo": 300, "taxa": 30})
+    with urllib.request.urlopen(url + "/metrics", timeout=10) as resp:
+        metricas = resp.read().decode()
+    assert "solar_servidor_clima_memoria_total" in metricas
+    with urllib.request.urlopen(url + "/saude", timeout=10) as resp:
+        assert json.loads(resp.read())["cidades_em_memoria"] == 1
+
+
+def test_cotacao_png(servidor):
+    _, url = servidor
+    status, tipo, corpo = _post(url + "/cotacao.png", {"cidade": "Natal, RN", "consumo": 450, "taxa": 50,
+                                                       "financiar": True, "taxa_aa": 14.5, "meses": 60})
+    assert status == 200 and tipo == "image/png"
+    assert corpo.startswith(b"\x89PNG")
+
+
+def test_erros_de_pedido(servidor):
+    _, url = servidor
+    assert _post(url + "/cotacao", {"cidade": "Natal, RN", "consumo": 450, "taxa": 40})[0] == 400
+    assert _post(url + "/cotacao", b"{nao e json")[0] == 400
+    assert _post(url + "/cotacao", b'{"cidade": "Natal, RN", "consumo": 450, "taxa": 1e999}')[0] == 400
+    assert _post(url + "/cotacao", {"cidade": "Lugar Nenhum, XX", "consumo": 450})[0] == 404
+    assert _post(url + "/outra", {})[0] == 404
+
+
+def test_content_length_invalido(servidor):
+    _, url = servidor
+    porta = int(url.rsplit(":", 1)[1])
+    for valor in ("abc", "-1"):
+        conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=5)
+        conexao.putrequest("POST", "/cotacao")
+        conexao.putheader("Content-Length", valor)
+        conexao.endheaders()
+        resposta = conexao.getresponse()   # responde em vez de derrubar a conexão ou travar na leitura
+        assert resposta.status == 400 and "Content-Length" in json.loads(resposta.read())["erro"]
+        conexao.close()
+
+
+def test_validar_pedido_financiamento():
+    with pytest.raises(ValueError):
+        validar_pedido({"cidade": "Natal, RN", "consumo": 450, "financiar": True})
+    for campo in ("taxa", "meses", "taxa_aa", "consumo"):
+        with pytest.raises(ValueError, match=campo):
+            validar_pedido({"cidade": "Natal, RN", "consumo": 450, "financiar": True, "taxa_aa": 12, "meses": 60,
+                            campo: float("inf")})
+    base = {"cidade": "Natal, RN", "consumo": 450, "taxa_aa": 12, "meses": 60}
+    for valor, esperado in ((True, True), ("false", False), ("nao", False), ("Sim", True), (0, False), (None, False)):
+        assert validar_pedido(dict(base, financiar=valor))["financiar"] is esperado
+    for valor in ("talvez", 2, [], {}):
+        with pytest.raises(ValueError, match="financiar"):
+            validar_pedido(dict(base, financiar=valor))
+    p = validar_pedido({"cidade": " Natal, RN ", "consumo": "450", "taxa": "100"})
+    assert p["cidade"] == "Natal, RN" and p["consumo"] == 450.0 and p["taxa"] == 100
+
+
+def test_campos_inteiros_rejeitam_fracao_e_booleano():
+    base = {"cidade": "Natal, RN", "consumo": 450, "financiar": True, "taxa_aa": 12, "meses": 60}
+    for campo, valor in (("meses", 50.7), ("meses", True), ("taxa", 50.5), ("taxa", "49.9"), ("consumo", True)):
+        with pytest.raises(ValueError, match=campo):
+            validar_pedido(dict(base, **{campo: valor}))
+    p = validar_pedido(dict(base, taxa=50.0, meses="36"))
+    assert (p["taxa"], p["meses"]) == (50, 36) and type(p["meses"]) is int
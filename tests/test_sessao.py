@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.engineering import _tarifas_padrao, calcular_tudo
+from src.sessao import SessaoCotacao
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+IRR = dict(zip(MESES, [5.5, 5.8, 5.2, 4.9, 5.1, 5.3, 5.6, 6.0, 6.2, 6.1, 6.0, 5.7]))
+TEMP = {m: 27.0 for m in MESES}
+
+VARIANTES = [
+    dict(),
+    dict(financiar=True, fin_dados=(14.5, 60)),
+    dict(financiar=True, fin_dados=(9.9, 36)),
+    dict(financiar=True, fin_dados=(9.9, 36), inflacao_override=0.08),
+    dict(financiar=True, fin_dados=(9.9, 36), inflacao_override=0.08, degradacao_override=0.01),
+    dict(financiar=True, fin_dados=(0, 0)),
+    dict(inflacao_override=0.02),
+    dict(fator_geracao=0.92),
+    dict(financiar=True, fin_dados=(9.9, 36), tarifas=_tarifas_padrao(0.05), fator_geracao=0.9),
+]
+
+
+@pytest.mark.parametrize("kwargs", VARIANTES)
+def test_sessao_equivale_a_calcular_tudo(kwargs):
+    sessao = SessaoCotacao(450.0, 50, IRR, TEMP)
+    sessao.cotar(financiar=True, fin_dados=(20.0, 120))   # estado anterior não interfere
+    obtido = sessao.cotar(**kwargs)
+    esperado = calcular_tudo(450.0, 50, IRR, TEMP, **kwargs)
+    for o, e in zip(obtido, esperado):
+        np.testing.assert_allclose(o, e, rtol=1e-12)
+
+
+def test_mudar_financiamento_so_recalcula_parcela_e_saldo():
+    sessao = SessaoCotacao(450.0, 50, IRR, TEMP)
+    sessao.cotar()
+    antes = dict(sessao.recalculos)
+    sessao.cotar(financiar=True, fin_dados=(14.5, 60))
+    sessao.cotar(financiar=True, fin_dados=(12.0, 48))
+    depois = sessao.recalculos
+    assert depois["financiamento"] == antes["financiamento"] + 2
+    assert depois["saldo"] == antes["saldo"] + 2
+    for etapa in ("dimensionamento", "geracao", "contas"):
+        assert depois[etapa] == antes[etapa] == 1
+
+    sessao.cotar(inflacao_override=0.09)
+    assert sessao.recalculos["contas"] == 2 and sessao.recalculos["geracao"] == 1
+    sessao.cotar()   # volta à opção anterior: tudo em cache
+    assert sessao.recalculos["contas"] == 2 and sessao.recalculos["financiamento"] == 3
+
+    # Nível de excedência (P90) e tarifa da distribuidora só refazem as contas
+    sessao.cotar(fator_geracao=0.9)
+    sessao.cotar(fator_geracao=0.9, tarifas=_tarifas_padrao(0.05))
+    sessao.cotar(fator_geracao=0.9)
+    assert sessao.recalculos["contas"] == 4 and sessao.recalculos["geracao"] == 1
+
+
+def test_series_compartilhadas_sao_somente_leitura():
+    conta_antiga = SessaoCotacao(450.0, 50, IRR, TEMP).cotar()[4]
+    with pytest.raises(ValueError):
+        conta_antiga[0] = 0.0
@@ -0,0 +1,54 @@
+"""Guarda o orçamento de inicialização medido com `python -X importtime`."""
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos pesados que não podem ser carregados só por importar o pacote ou pedir --help
+PESADOS = ("numpy", "matplotlib", "requests", "geopy", "sqlite3")
+
+# Orçamento (µs) do tempo acumulado de importação dos módulos do pacote
+ORCAMENTO_IMPORT_US = 150_000
+
+
+def _importtime(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=RAIZ, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    tempos = {}
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, cumulativo, nome = linha.split("|")
+        try:
+            tempos[nome.strip()] = int(cumulativo)
+        except ValueError:
+            continue  # cabeçalho
+    return tempos
+
+
+def _pesados(tempos):
+    return sorted(n for n in tempos if n.split(".")[0] in PESADOS)
+
+
+def test_import_do_pacote_e_leve():
+    tempos = _importtime("-c", "import src, src.finance, src.config, src.cli")
+    assert _pesados(tempos) == []
+    total = sum(t for n, t in tempos.items() if n == "src" or (n.startswith("src.") and n.count(".") == 1))
+    assert total < ORCAMENTO_IMPORT_US, tempos
+
+
+def test_cli_help_nao_carrega_dependencias_pesadas():
+    tempos = _importtime("-m", "src.cli", "--help")
+    assert _pesados(tempos) == []
+
+
+def test_exports_preguicosos():
+    proc = subprocess.run(
+        [sys.executable, "-c", "import sys, src; f = src.calcular_tudo; print('numpy' in sys.modules, 'matplotlib' in sys.modules)"],
+        cwd=RAIZ, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.stdout.split() == ["True", "False"]
@@ -0,0 +1,107 @@
+import csv
+
+import numpy as np
+import pytest
+
+from src.engineering import _tarifas_padrao, calcular_lote, calcular_tudo
+from src.geocodificador import IndiceMunicipios, Municipio
+from src.lote import processar_lote
+from src.tarifas import ADICIONAL_BANDEIRA, TabelaTarifas, fator_fio_b
+
+MESES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+IRR = {m: 5.2 for m in MESES}
+TEMP = {m: 26.0 for m in MESES}
+
+
+@pytest.fixture(scope="module")
+def tabela():
+    municipios = IndiceMunicipios([Municipio("Belém", "PA", -1.45, -48.49), Municipio("Campinas", "SP", -22.9, -47.1)])
+    return TabelaTarifas.carregar(municipios=municipios)
+
+
+def test_transicao_do_fio_b_lei_14300():
+    anos = np.arange(2022, 2031)
+    assert fator_fio_b(anos, 2024).tolist() == [0.0, 0.15, 0.30, 0.45, 0.60, 0.75, 0.90, 1.0, 1.0]
+    # Direito adquirido: pedidos até 2022 não pagam Fio B até 2045
+    assert fator_fio_b(np.array([2030, 2045, 2046]), 2022).tolist() == [0.0, 0.0, 1.0]
+
+
+def test_localizar_por_uf_municipio_e_indice(tabela):
+    assert tabela.localizar("Fortaleza, CE").codigo == "ENEL-CE"
+    assert tabela.localizar("Rio de Janeiro, RJ").codigo == "LIGHT"
+    assert tabela.localizar("Niterói - RJ").codigo == "ENEL-RJ"
+    assert tabela.localizar("Sao Paulo").codigo == "ENEL-SP"        # exceção municipal sem UF
+    assert tabela.localizar("Campinas").codigo == "CPFL-PAULISTA"   # UF pelo índice de municípios
+    assert tabela.localizar("Belem").codigo == "EQUATORIAL-PA"
+    assert tabela.localizar("Atlantida") is None
+
+
+def test_vetores_mensais_com_bandeiras_reajuste_e_fio_b(tabela):
+    d = tabela.distribuidora("ENEL-CE")
+    tar, fio_b = tabela.vetores("ENEL-CE", inflacao=0.05, ano_inicio=2025)
+    assert tar.shape == fio_b.shape == (300,)
+    assert tar[0] == pytest.approx((d.te + d.tusd) / (1 - d.tributos))
+    assert tar[6] == pytest.approx((d.te + d.tusd + ADICIONAL_BANDEIRA["vermelha1"]) / (1 - d.tributos))
+    assert tar[12] == pytest.approx(tar[0] * 1.05)
+    fio_b_bruto = d.fio_b / (1 - d.tributos) * 1.05 ** np.arange(25)
+    assert fio_b[::12] == pytest.approx(fio_b_bruto * fator_fio_b(2025 + np.arange(25), 2025))
+    # Memoizado por distribuidora e somente leitura
+    assert tabela.vetores("ENEL-CE", inflacao=0.05, ano_inicio=2025)[0] is tar
+    assert not tar.flags.writeable
+    branca, _ = tabela.vetores("ENEL-CE", inflacao=0.05, ano_inicio=2025, modalidade="branca",
+                               fracoes_posto=(0.0, 0.0, 1.0))
+    assert branca[0] == pytest.approx((d.te_fora_ponta + d.tusd_fora_ponta) / (1 - d.tributos))
+
+
+def test_calcular_tudo_consome_vetores(tabela):
+    assert np.array_equal(calcular_tudo(450, 50, IRR, TEMP, tarifas=_tarifas_padrao(0.08))[6],
+                          calcular_tudo(450, 50, IRR, TEMP)[6])
+    ce = tabela.vetores("ENEL-CE", ano_inicio=2025)
+    rj = tabela.vetores("LIGHT", ano_inicio=2025)
+    r_ce, r_rj = calcular_tudo(450, 50, IRR, TEMP, tarifas=ce), calcular_tudo(450, 50, IRR, TEMP, tarifas=rj)
+    assert r_ce[7] != r_rj[7]
+    # Lote com uma série por cliente equivale às cotações individuais
+    lote = calcular_lote([450, 450], 50, [IRR[m] for m in MESES], [TEMP[m] for m in MESES],
+                         tarifas=(np.stack([ce[0], rj[0]]), np.stack([ce[1], rj[1]])), tamanho_bloco=1)
+    assert lote.saldo[0] == pytest.approx(r_ce[6]) and lote.saldo[1] == pytest.approx(r_rj[6])
+
+
+def test_otimizacao_risco_e_sessao_usam_a_distribuidora(tabela):
+    from src.otimizacao import otimizar_dimensionamento
+    from src.risco import ParametrosRisco, simular_cenarios
+    from src.sessao import SessaoCotacao
+
+    ce = tabela.vetores("ENEL-CE", ano_inicio=2025)
+    esperado = calcular_tudo(450, 50, IRR, TEMP, tarifas=ce)
+    assert esperado[7] != calcular_tudo(450, 50, IRR, TEMP)[7]
+
+    f = otimizar_dimensionamento(450, 50, IRR, TEMP, tarifas=ce).formula()
+    assert f["economia"] == pytest.approx(esperado[7] - esperado[8])
+
+    sem_incerteza = ParametrosRisco(inflacao_desvio=0, degradacao_desvio=0, choque_prob=0, irradiacao_desvio=0)
+    r = simular_cenarios(450, 50, IRR, TEMP, n_cenarios=4, parametros=sem_incerteza, tarifas=ce)
+    np.testing.assert_allclose(r.saldo_bandas, np.broadcast_to(esperado[6], r.saldo_bandas.shape), rtol=1e-12)
+
+    sessao = SessaoCotacao(450, 50, IRR, TEMP)
+    sessao.cotar()
+    np.testing.assert_allclose(sessao.cotar(tarifas=ce)[6], esperado[6], rtol=1e-12)
+    sessao.cotar(tarifas=ce)
+    assert sessao.recalculos["contas"] == 2
+
+
+def test_lote_usa_a_distribuidora_de_cada_cidade(tabela, tmp_path):
+    entrada = tmp_path / "entrada.csv"
+    with open(entrada, "w", encoding="utf-8") as f:
+        f.write("cidade,consumo_medio,taxa_minima,financiar,taxa_juros,meses\n")
+        for cidade in ("Fortaleza - CE", "Rio de Janeiro - RJ", "Fortaleza - CE", "Atlantida"):
+            f.write(f"{cidade},450,50,nao,,\n")
+    saida = tmp_path / "saida.csv"
+    stats = processar_lote(str(entrada), str(saida), workers=1, tamanho_chunk=10,
+                           obter_clima=lambda cidade: (IRR, TEMP), tarifas=tabela)
+    with open(saida, encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert stats["ok"] == 4
+    totais = [float(l["total_sem_solar"]) for l in linhas]
+    assert totais[0] == totais[2] != totais[1]
+    # Cidade fora da tabela usa a tarifa de config
+    assert totais[3] == pytest.approx(calcular_tudo(450, 50, IRR, TEMP)[7], abs=0.01)
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from src.engineering import calcular_tudo
+from src.viz import RenderizadorDashboard, renderizar_lote
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _proposta(cidade, consumo):
+    qtd, pot, capex, parc, antiga, nova, saldo, tot_sem, tot_com = calcular_tudo(consumo, 50, [5.0] * 12, [25.0] * 12)
+    return dict(cidade=cidade, sistema_wp=pot, conta_antiga=antiga, custo_novo=nova, saldo=saldo,
+                total_sem=tot_sem, total_com=tot_com, parc=parc, financiado=False)
+
+
+def test_renderizador_reaproveita_template(tmp_path):
+    r = RenderizadorDashboard(dpi=40)
+    eixos = list(r.fig.axes)
+    caminhos = [r.renderizar(out_dir=str(tmp_path), **_proposta("Natal, RN", c)) for c in (200, 800, 200)]
+    assert len(set(caminhos)) == 3 and all(os.path.getsize(c) > 0 for c in caminhos)
+    assert r.fig.axes == eixos
+    assert "NATAL" in r._cabecalho.get_text()
+    np.testing.assert_allclose(r._linha.get_ydata(), _proposta("Natal", 200)["saldo"])
+
+
+def test_renderizar_lote_nomes_unicos(tmp_path):
+    propostas = [_proposta("Recife, PE", 300 + i) for i in range(4)]
+    caminhos = renderizar_lote(propostas, str(tmp_path), workers=1, dpi=40)
+    assert len(set(caminhos)) == 4 and sorted(os.listdir(tmp_path)) == sorted(os.path.basename(c) for c in caminhos)
+
+
+def test_renderizador_nao_usa_pyplot():
+    codigo = (
+        "import sys; from src.viz import RenderizadorDashboard; "
+        "RenderizadorDashboard(dpi=20).atualizar('X', 1000, [1.0], [0.5], [-1.0, 2.0], 10.0, 5.0); "
+        "print('matplotlib.pyplot' in sys.modules)"
+    )
+    proc = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip() == "False"